@@ -0,0 +1,197 @@
+"""
+AI benchmark - Latency and throughput of every AIJobMatcher call path
+Point it at the local stand-in to run offline and reproducibly:
+Usage: OPENAI_FAKE_MODE=replay python manage.py benchmark_ai --requests 200 --concurrency 50
+"""
+import asyncio
+import contextlib
+import json
+import os
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from core.utils.ai_matcher import AIJobMatcher
+from core.utils.model_router import model_router, CALL_TYPES
+from .benchmark_parser import percentile
+
+
+SAMPLE_CV = {
+    'skills': 'Python, Django, SQL, Pandas, Machine Learning, Git, Communication',
+    'experience_years': '3',
+    'education': 'B.Tech in Computer Science',
+    'job_titles': 'Data Analyst, Python Developer',
+    'achievements': 'Cut report generation time by 60%',
+    'industries': 'Technology, Finance',
+}
+JOB_TITLES = ['Python Developer', 'Data Analyst', 'Backend Developer', 'Data Scientist', 'DevOps Engineer']
+LOCATIONS = ['India', 'United Kingdom', 'United States', 'Canada', 'Germany']
+QUESTIONS = [
+    'Which roles fit my profile best?',
+    'How should I prepare for a data analyst interview?',
+    'What salary can I expect with 3 years of experience?',
+    'Which skills should I learn next?',
+    'How do I write a good cover letter?',
+]
+
+
+def _request_inputs(index):
+    """Inputs for the index-th request; they cycle so replays hit recorded requests"""
+    return {
+        'job_title': JOB_TITLES[index % len(JOB_TITLES)],
+        'location': LOCATIONS[index % len(LOCATIONS)],
+        'question': QUESTIONS[index % len(QUESTIONS)],
+    }
+
+
+async def _match(matcher, inputs):
+    result = await matcher.amatch_jobs(SAMPLE_CV, {
+        'job_type': 'all', 'job_title': inputs['job_title'], 'location': inputs['location'],
+        'experience_level': 'mid'
+    })
+    return bool(result.get('suitable_job_titles')), None
+
+
+async def _company_listings(matcher, inputs):
+    jobs = await matcher.agenerate_job_listings({
+        'country': inputs['location'], 'state': '', 'job_title': inputs['job_title'],
+        'experience_level': 'mid', 'company': ''
+    })
+    return bool(jobs), None
+
+
+async def _government_listings(matcher, inputs):
+    jobs = await matcher.agenerate_government_jobs({
+        'country': inputs['location'], 'state': '', 'job_title': inputs['job_title']
+    })
+    return bool(jobs), None
+
+
+async def _chat(matcher, inputs):
+    reply = await matcher.agenerate_chatbot_response(inputs['question'], SAMPLE_CV, [])
+    return bool(reply) and not reply.startswith('Error:'), None
+
+
+async def _chat_stream(matcher, inputs):
+    """Returns time to first token as well"""
+    started = time.perf_counter()
+    first_token = None
+    parts = []
+    async for delta in matcher.astream_general_chat_response(inputs['question'], []):
+        if first_token is None:
+            first_token = time.perf_counter() - started
+        parts.append(delta)
+    return bool(''.join(parts).strip()), first_token
+
+
+PATHS = {
+    'match': _match,
+    'company': _company_listings,
+    'government': _government_listings,
+    'chat': _chat,
+    'chat_stream': _chat_stream,
+}
+
+
+class Command(BaseCommand):
+    help = 'Benchmark latency and throughput of the AIJobMatcher calls (use OPENAI_FAKE_MODE to run offline)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--paths', default=','.join(PATHS),
+                            help=f"Comma-separated call paths to run ({', '.join(PATHS)})")
+        parser.add_argument('--requests', type=int, default=50, help='Requests per path')
+        parser.add_argument('--concurrency', type=int, default=20, help='Requests in flight at once per path')
+        parser.add_argument('--json', dest='json_path', help='Also write the report to this JSON file')
+        parser.add_argument('--verbose-matcher', action='store_true',
+                            help="Keep AIJobMatcher's debug output instead of discarding it")
+
+    def handle(self, *args, **options):
+        paths = [path.strip() for path in options['paths'].split(',') if path.strip()]
+        unknown = [path for path in paths if path not in PATHS]
+        if unknown:
+            raise CommandError(f"Unknown paths: {', '.join(unknown)}")
+        if not settings.OPENAI_FAKE_MODE:
+            self.stdout.write(self.style.WARNING(
+                'OPENAI_FAKE_MODE is not set: these requests go to OpenAI and are billed'
+            ))
+
+        report = {
+            'mode': settings.OPENAI_FAKE_MODE or 'openai',
+            'requests': options['requests'],
+            'concurrency': options['concurrency'],
+            'paths': {}
+        }
+        with open(os.devnull, 'w') as devnull:
+            redirect = contextlib.nullcontext() if options['verbose_matcher'] else contextlib.redirect_stdout(devnull)
+            with redirect:
+                for path in paths:
+                    report['paths'][path] = asyncio.run(
+                        self._run_path(PATHS[path], options['requests'], max(1, options['concurrency']))
+                    )
+
+        report['routing'] = model_router.stats()
+        self._print_report(report)
+        if options['json_path']:
+            with open(options['json_path'], 'w', encoding='utf-8') as file:
+                json.dump(report, file, indent=2)
+
+    async def _run_path(self, call, requests, concurrency):
+        matcher = AIJobMatcher()
+        slots = asyncio.Semaphore(concurrency)
+        latencies = []
+        first_tokens = []
+        failures = 0
+
+        async def one(index):
+            nonlocal failures
+            async with slots:
+                started = time.perf_counter()
+                try:
+                    ok, first_token = await call(matcher, _request_inputs(index))
+                except Exception as e:
+                    print(f"[ERROR] Benchmark request failed: {e}")
+                    ok, first_token = False, None
+                latencies.append(time.perf_counter() - started)
+                if first_token is not None:
+                    first_tokens.append(first_token)
+                if not ok:
+                    failures += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(index) for index in range(requests)))
+        elapsed = time.perf_counter() - started
+
+        stats = {
+            'failures': failures,
+            'p50_ms': percentile(latencies, 50) * 1000,
+            'p90_ms': percentile(latencies, 90) * 1000,
+            'p99_ms': percentile(latencies, 99) * 1000,
+            'requests_per_sec': requests / elapsed if elapsed else 0.0,
+        }
+        if first_tokens:
+            stats['first_token_p50_ms'] = percentile(first_tokens, 50) * 1000
+            stats['first_token_p90_ms'] = percentile(first_tokens, 90) * 1000
+        return stats
+
+    def _print_report(self, report):
+        self.stdout.write(
+            f"{report['requests']} requests per path, {report['concurrency']} in flight, mode {report['mode']}"
+        )
+        for path, stats in report['paths'].items():
+            line = (
+                f"  {path:<11} p50 {stats['p50_ms']:.0f}ms  p90 {stats['p90_ms']:.0f}ms  "
+                f"p99 {stats['p99_ms']:.0f}ms  {stats['requests_per_sec']:.1f} req/sec"
+            )
+            if 'first_token_p50_ms' in stats:
+                line += f"  first token p50 {stats['first_token_p50_ms']:.0f}ms"
+            self.stdout.write(line)
+            if stats['failures']:
+                self.stdout.write(self.style.WARNING(f"    {stats['failures']} requests failed"))
+        routing = report['routing']
+        for call_type in CALL_TYPES:
+            p95s = ', '.join(
+                f"{model} {p95:.1f}s" if p95 is not None else f"{model} -"
+                for model, p95 in routing[call_type]['p95'].items()
+            )
+            self.stdout.write(f"  routing {call_type:<11} -> {routing[call_type]['model']}  (p95 {p95s})")
+        if routing['hedges']:
+            self.stdout.write(f"  {routing['hedges']} hedged requests, {routing['hedge_wins']} won by the hedge")
@@ -0,0 +1,154 @@
+"""
+CVParser benchmark - Parse latency, throughput and extraction accuracy on a synthetic corpus
+Usage: python manage.py benchmark_parser /tmp/cv_corpus --repeat 3
+"""
+import contextlib
+import json
+import os
+import time
+from django.core.management.base import BaseCommand, CommandError
+from core.utils.cv_corpus import load_manifest, score_parse, MANIFEST_NAME
+from core.utils.cv_parser import CVParser
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def _ratio(numerator, denominator):
+    return numerator / denominator if denominator else 0.0
+
+
+class Command(BaseCommand):
+    help = 'Benchmark CVParser speed and accuracy against a generate_cv_corpus corpus'
+
+    def add_arguments(self, parser):
+        parser.add_argument('corpus_dir', help=f'Directory containing {MANIFEST_NAME}')
+        parser.add_argument('--repeat', type=int, default=1,
+                            help='Parse every file this many times (latency uses all runs)')
+        parser.add_argument('--limit', type=int, default=0, help='Only use the first N files (0 = all)')
+        parser.add_argument('--json', dest='json_path', help='Also write the report to this JSON file')
+        parser.add_argument('--verbose-parser', action='store_true',
+                            help="Keep the parser's debug output instead of discarding it")
+
+    def handle(self, *args, **options):
+        try:
+            manifest = load_manifest(options['corpus_dir'])
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Could not read {MANIFEST_NAME}: {e}')
+
+        entries = manifest['files']
+        if options['limit']:
+            entries = entries[:options['limit']]
+
+        runs = {}
+        for entry in entries:
+            path = os.path.join(options['corpus_dir'], entry['file'])
+            for attempt in range(max(1, options['repeat'])):
+                elapsed, result, pages = self._parse(path, options['verbose_parser'])
+                runs.setdefault(entry['format'], []).append((elapsed, pages))
+                if attempt == 0:
+                    entry['_result'] = result
+
+        report = {'files': len(entries), 'repeat': options['repeat'], 'formats': {}}
+        for file_format, timings in sorted(runs.items()):
+            latencies = [elapsed for elapsed, pages in timings]
+            total_time = sum(latencies)
+            report['formats'][file_format] = {
+                'parses': len(timings),
+                'p50_ms': percentile(latencies, 50) * 1000,
+                'p90_ms': percentile(latencies, 90) * 1000,
+                'p99_ms': percentile(latencies, 99) * 1000,
+                'files_per_sec': _ratio(len(timings), total_time),
+            }
+            if file_format == 'pdf':
+                # Only PDFs have pages; DOCX and TXT are compared by files/sec
+                total_pages = sum(pages for elapsed, pages in timings)
+                report['formats'][file_format]['pages_per_sec'] = _ratio(total_pages, total_time)
+        all_timings = [timing for timings in runs.values() for timing in timings]
+        report['files_per_sec'] = _ratio(len(all_timings), sum(elapsed for elapsed, pages in all_timings))
+        report['accuracy'] = self._accuracy(entries)
+
+        self._print_report(report)
+        if options['json_path']:
+            with open(options['json_path'], 'w', encoding='utf-8') as file:
+                json.dump(report, file, indent=2)
+
+    def _parse(self, path, verbose):
+        """Parse one file with a fresh parser; returns (seconds, result, pages read)"""
+        parser = CVParser()
+        with open(os.devnull, 'w') as devnull:
+            redirect = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(devnull)
+            with redirect:
+                started = time.perf_counter()
+                result = parser.parse_cv(path)
+                elapsed = time.perf_counter() - started
+        pages = result.get('pages_read', 0) if 'error' not in result else 0
+        return elapsed, result, pages
+
+    def _accuracy(self, entries):
+        totals = {}
+        errors = 0
+        experience_errors = []
+        education_ok = 0
+        for entry in entries:
+            result = entry.pop('_result')
+            if 'error' in result:
+                errors += 1
+                continue
+            score = score_parse(entry, result)
+            for key in ('skills_tp', 'skills_fp', 'skills_fn', 'titles_tp', 'titles_fp', 'titles_fn'):
+                totals[key] = totals.get(key, 0) + score[key]
+            experience_errors.append(score['experience_error'])
+            education_ok += score['education_ok']
+
+        scored = len(entries) - errors
+        accuracy = {'parse_errors': errors}
+        for field in ('skills', 'titles'):
+            tp, fp, fn = (totals.get(f'{field}_{kind}', 0) for kind in ('tp', 'fp', 'fn'))
+            precision = _ratio(tp, tp + fp)
+            recall = _ratio(tp, tp + fn)
+            accuracy[field] = {
+                'precision': precision,
+                'recall': recall,
+                'f1': _ratio(2 * precision * recall, precision + recall),
+            }
+        accuracy['experience'] = {
+            'mean_abs_error_years': _ratio(sum(experience_errors), len(experience_errors)),
+            'within_1_year': _ratio(sum(1 for error in experience_errors if error <= 1.0), len(experience_errors)),
+        }
+        accuracy['education_accuracy'] = _ratio(education_ok, scored)
+        return accuracy
+
+    def _print_report(self, report):
+        self.stdout.write(
+            f"Parsed {report['files']} files x {report['repeat']}, {report['files_per_sec']:.1f} files/sec overall"
+        )
+        for file_format, stats in report['formats'].items():
+            line = (
+                f"  {file_format:<5} p50 {stats['p50_ms']:.1f}ms  p90 {stats['p90_ms']:.1f}ms  "
+                f"p99 {stats['p99_ms']:.1f}ms  {stats['files_per_sec']:.1f} files/sec"
+            )
+            if 'pages_per_sec' in stats:
+                line += f"  {stats['pages_per_sec']:.1f} pages/sec"
+            self.stdout.write(line)
+        accuracy = report['accuracy']
+        for field in ('skills', 'titles'):
+            stats = accuracy[field]
+            self.stdout.write(
+                f"  {field:<10} precision {stats['precision']:.3f}  recall {stats['recall']:.3f}  "
+                f"f1 {stats['f1']:.3f}"
+            )
+        experience = accuracy['experience']
+        self.stdout.write(
+            f"  experience mean abs error {experience['mean_abs_error_years']:.2f} years, "
+            f"{experience['within_1_year']:.1%} within 1 year"
+        )
+        self.stdout.write(f"  education  accuracy {accuracy['education_accuracy']:.1%}")
+        if accuracy['parse_errors']:
+            self.stdout.write(self.style.WARNING(f"  {accuracy['parse_errors']} files failed to parse"))
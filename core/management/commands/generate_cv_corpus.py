@@ -0,0 +1,33 @@
+"""
+Synthetic CV corpus - Writes PDF/DOCX CVs and their ground truth for benchmark_parser
+Usage: python manage.py generate_cv_corpus /tmp/cv_corpus --count 200 --max-pages 5
+"""
+from django.core.management.base import BaseCommand, CommandError
+from core.utils.cv_corpus import write_corpus, MANIFEST_NAME
+
+
+class Command(BaseCommand):
+    help = 'Generate synthetic CVs with known skills, roles, dates and education'
+
+    def add_arguments(self, parser):
+        parser.add_argument('out_dir', help='Directory to write the corpus into')
+        parser.add_argument('--count', type=int, default=100, help='Number of CVs')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed (same seed, same corpus)')
+        parser.add_argument('--formats', default='pdf,docx', help='Comma-separated formats: pdf, docx')
+        parser.add_argument('--max-pages', type=int, default=3, help='Upper bound on pages per CV')
+
+    def handle(self, *args, **options):
+        formats = tuple(f.strip().lower() for f in options['formats'].split(',') if f.strip())
+        if not formats or any(f not in ('pdf', 'docx') for f in formats):
+            raise CommandError('--formats must list pdf and/or docx')
+        if options['count'] < 1 or options['max_pages'] < 1:
+            raise CommandError('--count and --max-pages must be at least 1')
+
+        manifest = write_corpus(
+            options['out_dir'], options['count'], seed=options['seed'],
+            formats=formats, max_pages=options['max_pages']
+        )
+        pages = sum(entry['pages'] for entry in manifest['files'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {len(manifest['files'])} CVs ({pages} pages) and {MANIFEST_NAME} to {options['out_dir']}"
+        ))
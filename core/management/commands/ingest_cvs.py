@@ -0,0 +1,182 @@
+"""
+Bulk CV ingestion - Parses every CV in a directory into the cv_data collection
+Usage: python manage.py ingest_cvs /shared/cvs --workers 8 --batch-size 200
+"""
+import itertools
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from pymongo.errors import BulkWriteError
+from core.utils.mongo import get_collection
+from core.utils.parse_cache import ParseCache
+from core.utils.parse_pool import CVParsePool
+
+
+SOURCE = 'ingest_cvs'
+CV_EXTENSIONS = ('.pdf', '.docx', '.doc')
+
+
+class Command(BaseCommand):
+    help = 'Parse every CV under a directory into MongoDB using a pool of worker processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory', help='Directory to scan recursively for PDF/DOCX files')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 2,
+                            help='Parser processes (default: one per CPU core)')
+        parser.add_argument('--batch-size', type=int, default=100,
+                            help='Documents per insert_many call')
+        parser.add_argument('--timeout', type=float, default=None,
+                            help='Seconds allowed per file (default: CV_PARSE_TIMEOUT)')
+        parser.add_argument('--limit', type=int, default=0,
+                            help='Stop after this many new files (0 = all)')
+
+    def handle(self, *args, **options):
+        directory = os.path.abspath(options['directory'])
+        if not os.path.isdir(directory):
+            raise CommandError(f'Not a directory: {directory}')
+
+        cv_collection = get_collection('cv_data')
+        if cv_collection is None:
+            raise CommandError('MongoDB is not available; ingestion needs the cv_data collection')
+
+        paths = self._find_cvs(directory)
+        done = self._already_ingested(cv_collection, directory)
+        pending = [path for path in paths if path not in done]
+        skipped = len(paths) - len(pending)
+        if options['limit']:
+            pending = pending[:options['limit']]
+
+        self.stdout.write(
+            f'Found {len(paths)} CVs, {skipped} already ingested, '
+            f'{len(pending)} to parse with {options["workers"]} workers'
+        )
+        if not pending:
+            return
+
+        parse_pool = CVParsePool(max_workers=options['workers'], timeout=options['timeout'], isolated=True)
+        parse_cache = ParseCache(get_collection('cv_parse_cache'))
+        batch = []
+        stats = {'parsed': 0, 'failed': 0, 'inserted': 0}
+        started = time.monotonic()
+
+        # Only a window of files is queued at a time, so an interrupt has little left to cancel
+        executor = ThreadPoolExecutor(max_workers=options['workers'])
+        window = max(1, options['workers']) * 2
+        remaining = iter(pending)
+        in_flight = {}
+        try:
+            while True:
+                for path in itertools.islice(remaining, window - len(in_flight)):
+                    in_flight[executor.submit(self._parse_file, parse_pool, parse_cache, path)] = path
+                if not in_flight:
+                    break
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    self._collect(future, in_flight.pop(future), batch, stats)
+                if len(batch) >= options['batch_size']:
+                    self._flush(cv_collection, batch, stats)
+                    self._report(stats, started, len(pending))
+
+        except KeyboardInterrupt:
+            self.stderr.write('Interrupted - saving parsed CVs; run the command again to resume')
+            # Keep files that finished parsing while we were interrupted
+            for future, path in in_flight.items():
+                if future.done() and not future.cancelled():
+                    self._collect(future, path, batch, stats)
+        finally:
+            # Queued files are dropped; ones still parsing are picked up again by the next run
+            executor.shutdown(wait=False, cancel_futures=True)
+            self._flush(cv_collection, batch, stats)
+            parse_pool.shutdown()
+
+        self._report(stats, started, len(pending), final=True)
+
+    def _collect(self, future, path, batch, stats):
+        """Add a finished parse to the batch, or count it as failed"""
+        try:
+            document = future.result()
+        except Exception as e:
+            document = {'error': str(e)}
+
+        if 'error' in document:
+            stats['failed'] += 1
+            self.stderr.write(f'[ERROR] {path}: {document["error"]}')
+            return
+        stats['parsed'] += 1
+        batch.append(document)
+
+    def _find_cvs(self, directory):
+        paths = []
+        for root, dirs, files in os.walk(directory):
+            dirs.sort()
+            for name in sorted(files):
+                if name.lower().endswith(CV_EXTENSIONS):
+                    paths.append(os.path.join(root, name))
+        return paths
+
+    def _already_ingested(self, cv_collection, directory):
+        """Paths stored by earlier runs, so an interrupted ingestion resumes where it stopped"""
+        cursor = cv_collection.find(
+            # Trailing separator: /data/cvs must not match /data/cvs2
+            {'source': SOURCE, 'file_path': {'$regex': '^' + re.escape(os.path.join(directory, ''))}},
+            {'file_path': 1, '_id': 0}
+        )
+        return {doc['file_path'] for doc in cursor}
+
+    def _parse_file(self, parse_pool, parse_cache, path):
+        """Read, hash and parse one file; runs on a thread that waits on a parser process"""
+        with open(path, 'rb') as file:
+            data = file.read()
+        content_hash = ParseCache.hash_bytes(data)
+
+        cached = parse_cache.get(content_hash)
+        if cached:
+            cv_data = cached['cv_data']
+        else:
+            cv_data = parse_pool.parse(data, os.path.basename(path))
+            if 'error' in cv_data:
+                return cv_data
+            parse_cache.set(content_hash, cv_data, path)
+
+        return {
+            'filename': os.path.basename(path),
+            'file_path': path,
+            'content_hash': content_hash,
+            'cv_data': cv_data,
+            'uploaded_at': datetime.now().isoformat(),
+            'source': SOURCE
+        }
+
+    def _flush(self, cv_collection, batch, stats):
+        if not batch:
+            return
+        try:
+            result = cv_collection.insert_many(batch, ordered=False)
+            stats['inserted'] += len(result.inserted_ids)
+        except BulkWriteError as e:
+            # Unordered: everything but the failed documents (e.g. duplicates) was inserted
+            errors = e.details.get('writeErrors', [])
+            stats['inserted'] += e.details.get('nInserted', 0)
+            stats['failed'] += len(errors)
+            self.stderr.write(f'[ERROR] {len(errors)} of {len(batch)} CVs not inserted: '
+                              f'{errors[0].get("errmsg") if errors else e}')
+        except Exception as e:
+            stats['failed'] += len(batch)
+            self.stderr.write(f'[ERROR] insert_many failed for {len(batch)} CVs: {e}')
+        batch.clear()
+
+    def _report(self, stats, started, total, final=False):
+        elapsed = max(time.monotonic() - started, 1e-6)
+        processed = stats['parsed'] + stats['failed']
+        message = (
+            f'{processed}/{total} files, {processed / elapsed:.1f} files/sec, '
+            f'{stats["inserted"]} inserted, {stats["failed"]} failed'
+        )
+        if final:
+            self.stdout.write(self.style.SUCCESS(f'Done in {elapsed:.1f}s: {message}'))
+        else:
+            self.stdout.write(message)
+
@@ -0,0 +1,116 @@
+"""
+Listing cache warm-up - Generates government and company listings for common filters ahead of time
+Usage: python manage.py warm_listing_cache --concurrency 3
+       python manage.py warm_listing_cache --interval 1500   (keep running, e.g. under a process manager)
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from django.core.management.base import BaseCommand, CommandError
+from core.forms import GovernmentJobSearchForm, CompanyJobSearchForm
+from core.utils.job_listings import (
+    government_filters, company_filters, government_listing_cache, company_listing_cache
+)
+from core.utils.listing_cache import normalize_filters
+
+
+class Command(BaseCommand):
+    help = 'Pre-generate cached job listings for the search form choices with bounded concurrency'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kinds', default='government,company',
+                            help='Comma-separated listing types to warm: government, company')
+        parser.add_argument('--concurrency', type=int, default=2,
+                            help='Listings generated at the same time (each is one model call)')
+        parser.add_argument('--companies', type=int, default=0,
+                            help='Also warm the first N companies of the company form for every country')
+        parser.add_argument('--job-titles', default='',
+                            help='Comma-separated job titles to warm in addition to the untitled default')
+        parser.add_argument('--force', action='store_true',
+                            help='Regenerate entries that are still fresh')
+        parser.add_argument('--interval', type=int, default=0,
+                            help='Repeat every N seconds instead of running once')
+
+    def handle(self, *args, **options):
+        kinds = {kind.strip() for kind in options['kinds'].split(',') if kind.strip()}
+        if not kinds or kinds - {'government', 'company'}:
+            raise CommandError('--kinds must list government and/or company')
+        if government_listing_cache.collection is None:
+            raise CommandError(
+                'Warm-up needs the shared MongoDB listing cache (MongoDB available and LISTING_CACHE_SHARED on); '
+                'entries warmed in this process would not reach the web server'
+            )
+
+        titles = [''] + [title.strip() for title in options['job_titles'].split(',') if title.strip()]
+        jobs = []
+        if 'government' in kinds:
+            jobs += [(government_listing_cache, filters) for filters in self._government_combinations(titles)]
+        if 'company' in kinds:
+            jobs += [(company_listing_cache, filters)
+                     for filters in self._company_combinations(titles, options['companies'])]
+
+        while True:
+            self._warm(jobs, options['concurrency'], options['force'])
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
+
+    def _government_combinations(self, titles):
+        return _unique(
+            government_filters(code, '', title)
+            for code, label in GovernmentJobSearchForm.COUNTRY_CHOICES
+            for title in titles
+        )
+
+    def _company_combinations(self, titles, company_count):
+        countries = [code for code, label in CompanyJobSearchForm.COUNTRY_CHOICES]
+        levels = [code for code, label in CompanyJobSearchForm.EXPERIENCE_CHOICES]
+        companies = [code for code, label in CompanyJobSearchForm.COMPANY_CHOICES if code][:company_count]
+
+        combinations = []
+        for country in countries:
+            for title in titles:
+                # The company page only generates once a filter is set, so skip the all-empty search
+                combinations += [
+                    company_filters(country, '', title, level, '')
+                    for level in levels if country or title or level
+                ]
+                combinations += [company_filters(country, '', title, '', company) for company in companies]
+        return _unique(combinations)
+
+    def _warm(self, jobs, concurrency, force):
+        started = time.monotonic()
+        pending = [(cache, filters) for cache, filters in jobs if force or not cache.is_fresh(filters)]
+        self.stdout.write(f'{len(jobs)} filter combinations, {len(jobs) - len(pending)} already fresh, '
+                          f'generating {len(pending)} with concurrency {concurrency}')
+
+        warmed = failed = 0
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+            futures = {executor.submit(cache.refresh, filters): (cache, filters) for cache, filters in pending}
+            for future in as_completed(futures):
+                cache, filters = futures[future]
+                try:
+                    listings = future.result()
+                except Exception as e:
+                    listings = []
+                    self.stderr.write(f'[ERROR] {cache.kind} {filters}: {e}')
+                if listings:
+                    warmed += 1
+                else:
+                    failed += 1
+                    self.stderr.write(f'[WARNING] No {cache.kind} listings generated for {filters}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Warmed {warmed} entries in {time.monotonic() - started:.1f}s, {failed} failed'
+        ))
+
+
+def _unique(filters_list):
+    """Drop combinations that map to the same cache key (e.g. no country and 'UK')"""
+    seen = set()
+    unique = []
+    for filters in filters_list:
+        key = normalize_filters(filters)
+        if key not in seen:
+            seen.add(key)
+            unique.append(filters)
+    return unique
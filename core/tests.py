@@ -1,3 +1,555 @@
-from django.test import TestCase
+import asyncio
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+import httpx
+import openai
+from django.conf import settings
+from django.contrib.sessions.backends.signed_cookies import SessionStore
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+from .utils.ai_deadline import ai_deadline, remaining
+from .utils.ai_dispatcher import AIBusy, AIDispatcher, SessionTokenBucket, BACKGROUND, INTERACTIVE
+from .utils.ai_matcher import AIJobMatcher
+from .utils.chat_memory import ChatMemory
+from .utils.circuit_breaker import CircuitBreaker, CircuitOpen
+from .utils.cv_parser import CVParser, DateRange
+from .utils.listing_cache import ListingCache
+from .utils.match_cache import MatchCache
+from .utils.model_router import model_router, CHAT
+from .utils.single_flight import SingleFlight
+from .utils.skill_matcher import get_skill_matcher
+
+
+class SkillMatcherTests(SimpleTestCase):
+    def setUp(self):
+        self.matcher = get_skill_matcher()
+
+    def test_js_suffix_of_dotted_framework_is_not_javascript(self):
+        self.assertEqual(self.matcher.find_skills("Built APIs with Node.js and React.js"), ['Node.js', 'React'])
+        self.assertEqual(self.matcher.find_skills("Vue.js frontends"), ['Vue'])
+
+    def test_standalone_js_is_javascript(self):
+        self.assertEqual(self.matcher.find_skills("Skills: JS, Python."), ['JavaScript', 'Python'])
+        self.assertEqual(self.matcher.find_skills("Experience in ML. JS too"), ['Machine Learning', 'JavaScript'])
+
+    def test_partial_words_do_not_match(self):
+        self.assertEqual(self.matcher.find_skills("JavaScript and GitHub"), ['JavaScript'])
+
+
+def _month(year, month):
+    return year * 12 + month - 1
+
+
+class DateRangeTests(SimpleTestCase):
+    def setUp(self):
+        self.parser = CVParser()
+
+    def test_month_name_to_present(self):
+        today = datetime.now()
+        ranges = self.parser._extract_date_ranges("Data Analyst, Acme  Sep 2024 – Present")
+        self.assertEqual(ranges, [DateRange(_month(2024, 9), _month(today.year, today.month), 'Sep 2024 – Present')])
+
+    def test_numeric_months(self):
+        ranges = self.parser._extract_date_ranges("Engineer (09/2021 to 03/2023)")
+        self.assertEqual(ranges, [DateRange(_month(2021, 9), _month(2023, 3), '09/2021 to 03/2023')])
+
+    def test_years_only(self):
+        ranges = self.parser._extract_date_ranges("Intern 2019–2021")
+        self.assertEqual(ranges, [DateRange(_month(2019, 1), _month(2021, 1), '2019–2021')])
+
+    def test_overlapping_ranges_are_merged(self):
+        text = "Developer Jan 2020 - Dec 2021\nConsultant Jun 2021 - Mar 2022\nLead 2023 - 2024"
+        merged = self.parser._merge_date_ranges(self.parser._extract_date_ranges(text))
+        self.assertEqual([(r.start, r.end) for r in merged], [
+            (_month(2020, 1), _month(2022, 3)),
+            (_month(2023, 1), _month(2024, 1)),
+        ])
+        self.assertEqual(self.parser._count_months_in_text(text), 26 + 12)
+
+
+@override_settings(SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies')
+class PendingParsePreferencesTests(SimpleTestCase):
+    PREFERENCES = {
+        'job_type': 'private', 'job_title': 'Data Analyst', 'location': 'London',
+        'experience_level': 'mid', 'date_posted': 'week'
+    }
+
+    def _set_session(self, **values):
+        session = SessionStore()
+        session.update(values)
+        session.save()
+        self.client.cookies[settings.SESSION_COOKIE_NAME] = session.session_key
+
+    def _session(self):
+        return SessionStore(self.client.cookies[settings.SESSION_COOKIE_NAME].value)
+
+    def test_post_while_parsing_keeps_preferences_for_when_the_cv_is_ready(self):
+        self._set_session(cv_parse_job='job1')
+        response = self.client.post(reverse('job_preferences'), self.PREFERENCES)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['preferences_queued'])
+        self.assertEqual(response.context['form'].data['job_title'], 'Data Analyst')
+        self.assertEqual(self._session()['pending_job_preferences'], self.PREFERENCES)
+
+        # The parse finished: the next page load searches with the saved preferences
+        session = self._session()
+        session['cv_data'] = {'skills': 'Python, SQL', 'experience_years': '3'}
+        session.save()
+        self.client.cookies[settings.SESSION_COOKIE_NAME] = session.session_key
+        gather = mock.AsyncMock(return_value=({'suitable_job_titles': ['Data Analyst']}, []))
+        with mock.patch('core.views._agather_matches', gather):
+            response = self.client.get(reverse('job_preferences'))
+
+        self.assertRedirects(response, reverse('job_results'), fetch_redirect_response=False)
+        self.assertEqual(gather.call_args.args[1], self.PREFERENCES)
+        session = self._session()
+        self.assertEqual(session['job_preferences'], self.PREFERENCES)
+        self.assertNotIn('pending_job_preferences', session)
+
+
+class SingleFlightTests(SimpleTestCase):
+    KEY = 'ab' + 'c' * 62
+
+    def setUp(self):
+        self.lock_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.lock_dir)
+        self.flight = SingleFlight('test', lock_dir=self.lock_dir, wait=5, result_ttl=30, sweep_interval=3600)
+
+    def _run_together(self, func, callers=5):
+        """run() from several threads at once; returns their results or exceptions"""
+        results = [None] * callers
+        started = threading.Barrier(callers)
+
+        def caller(index):
+            started.wait()
+            try:
+                results[index] = self.flight.run(self.KEY, func)
+            except Exception as e:
+                results[index] = e
+
+        threads = [threading.Thread(target=caller, args=(index,)) for index in range(callers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_concurrent_callers_share_one_call(self):
+        calls = []
+
+        def generate():
+            calls.append(1)
+            time.sleep(0.1)
+            return ['job']
+
+        self.assertEqual(self._run_together(generate), [['job']] * 5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(self.flight.stats()['coalesced'], 4)
+
+    def test_error_reaches_every_waiting_caller_and_is_not_cached(self):
+        def fail():
+            time.sleep(0.1)
+            raise ValueError('generation failed')
+
+        results = self._run_together(fail)
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+        self.assertEqual(self.flight.stats()['calls'], 1)
+        # The next call runs again instead of reusing the failure
+        self.assertEqual(self.flight.run(self.KEY, lambda: ['job']), ['job'])
+
+    def test_async_callers_share_one_call(self):
+        calls = []
+
+        async def generate():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return ['job']
+
+        async def scenario():
+            return await asyncio.gather(*[self.flight.arun(self.KEY, generate) for _ in range(5)])
+
+        self.assertEqual(asyncio.run(scenario()), [['job']] * 5)
+        self.assertEqual(len(calls), 1)
+
+    def test_other_process_reuses_a_recent_result(self):
+        self.flight.run(self.KEY, lambda: ['job'])
+        other = SingleFlight('test', lock_dir=self.lock_dir, wait=5, result_ttl=30, sweep_interval=3600)
+        self.assertEqual(other.run(self.KEY, lambda: self.fail('should reuse the result')), ['job'])
+        self.assertEqual(other.stats()['shared'], 1)
+
+    def test_lock_file_swept_while_waiting_is_not_used(self):
+        path = self.flight._path(self.KEY, 'lock')
+        # Opened before the sweep deletes it; locking it afterwards would make a second leader
+        stale = self.flight._open_lock(path)
+        self.assertTrue(self.flight._remove_idle_lock(path))
+        open_lock = SingleFlight._open_lock
+        with mock.patch.object(SingleFlight, '_open_lock', side_effect=[stale, open_lock(path)]):
+            lock_file, result = self.flight._acquire(self.KEY)
+        self.addCleanup(lock_file.close)
+        self.assertIsNone(result)
+        self.assertTrue(stale.closed)
+        self.assertTrue(self.flight._is_current(lock_file, path))
+
+    def test_held_lock_is_not_swept(self):
+        lock_file, _ = self.flight._acquire(self.KEY)
+        self.addCleanup(lock_file.close)
+        self.assertFalse(self.flight._remove_idle_lock(self.flight._path(self.KEY, 'lock')))
+
+
+class ChatMemoryTests(SimpleTestCase):
+    HISTORY = [
+        {'role': 'user' if i % 2 == 0 else 'assistant', 'content': f'Turn {i} about data analyst roles. ' * 5}
+        for i in range(8)
+    ]
+
+    def setUp(self):
+        self.calls = []
+        self.memory = ChatMemory(self._summarize, history_tokens=60, summary_tokens=100)
+
+    def _summarize(self, summary, messages):
+        self.calls.append(remaining())
+        return 'Summary of the earlier turns.'
+
+    def _wait_for_summaries(self):
+        self.memory._executor.shutdown(wait=True)
+        self.memory._executor = None
+
+    def test_summary_is_skipped_when_not_allowed(self):
+        self.assertTrue(self.memory.summary_due(self.HISTORY))
+        messages = self.memory.build(self.HISTORY, summarize=False)
+        self.assertEqual(messages[0]['role'], 'system')
+        self.assertIsNone(self.memory._executor)
+        self.assertEqual(self.calls, [])
+
+    def test_summary_runs_under_the_request_deadline(self):
+        with ai_deadline(5):
+            self.memory.build(self.HISTORY)
+        self._wait_for_summaries()
+        self.assertEqual(len(self.calls), 1)
+        self.assertIsNotNone(self.calls[0])
+        self.assertLessEqual(self.calls[0], 5)
+        # Cached now: the next message with the same history makes no call
+        self.assertFalse(self.memory.summary_due(self.HISTORY))
+
+
+def _upstream_error():
+    return openai.APIConnectionError(request=httpx.Request('POST', 'https://api.openai.com/v1/chat/completions'))
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch('core.utils.circuit_breaker.time.monotonic', lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = CircuitBreaker('test-model', failure_threshold=2, reset_timeout=30)
+
+    def _fail(self):
+        with self.assertRaises(openai.APIConnectionError):
+            with self.breaker.guard():
+                raise _upstream_error()
+
+    def _succeed(self):
+        with self.breaker.guard():
+            pass
+
+    def test_opens_after_consecutive_failures_and_fails_fast(self):
+        self._fail()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self._fail()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertTrue(self.breaker.is_open())
+        with self.assertRaises(CircuitOpen):
+            self._succeed()
+
+    def test_success_resets_the_failure_count(self):
+        self._fail()
+        self._succeed()
+        self._fail()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_other_errors_do_not_count(self):
+        for _ in range(3):
+            with self.assertRaises(ValueError):
+                with self.breaker.guard():
+                    raise ValueError('bad request')
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_half_open_probe_success_closes(self):
+        self._fail()
+        self._fail()
+        self.now += 31
+        self.assertFalse(self.breaker.is_open())
+        with self.breaker.guard():
+            self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+            # Only one probe at a time
+            with self.assertRaises(CircuitOpen):
+                self._succeed()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self._succeed()
+
+    def test_half_open_probe_failure_reopens(self):
+        self._fail()
+        self._fail()
+        self.now += 31
+        self._fail()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertTrue(self.breaker.is_open())
+        self.now += 31
+        self._succeed()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+
+class SessionTokenBucketTests(SimpleTestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch('core.utils.ai_dispatcher.time.time', lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.bucket = SessionTokenBucket(burst=3, refill_per_minute=6)
+        self.bucket.enabled = True
+        self.session = {}
+
+    def test_burst_then_wait_until_refilled(self):
+        self.assertEqual([self.bucket.take(self.session) for _ in range(3)], [0, 0, 0])
+        # One token every 10 seconds
+        self.assertEqual(self.bucket.take(self.session), 10)
+        self.now += 4
+        self.assertEqual(self.bucket.take(self.session), 6)
+        self.now += 6
+        self.assertEqual(self.bucket.take(self.session), 0)
+        self.assertEqual(self.bucket.take(self.session), 10)
+
+    def test_refused_request_spends_nothing(self):
+        self.bucket.take(self.session, cost=2)
+        self.assertEqual(self.bucket.take(self.session, cost=2), 10)
+        self.assertEqual(self.bucket.take(self.session, cost=1), 0)
+
+    def test_refill_is_capped_at_the_burst(self):
+        self.bucket.take(self.session, cost=3)
+        self.now += 3600
+        self.assertEqual(self.bucket.take(self.session, cost=3), 0)
+        self.assertGreater(self.bucket.take(self.session), 0)
+
+
+class AIDispatcherTests(SimpleTestCase):
+    def setUp(self):
+        self.slot_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.slot_dir)
+        self.dispatcher = AIDispatcher(slots=2, reserved=1, slot_dir=self.slot_dir, wait=0.05)
+        self.addCleanup(self._close_slot_files)
+
+    def _close_slot_files(self):
+        for lock_file in self.dispatcher._files.values():
+            lock_file.close()
+
+    def test_background_calls_leave_the_reserved_slot_free(self):
+        with self.dispatcher.slot(BACKGROUND):
+            with self.assertRaises(AIBusy):
+                with self.dispatcher.slot(BACKGROUND):
+                    pass
+            with self.dispatcher.slot(INTERACTIVE) as slot:
+                self.assertEqual(slot, 0)
+        self.assertEqual(self.dispatcher.stats()['held_here'], 0)
+
+    def test_slots_are_shared_across_processes_through_lock_files(self):
+        # Another process on the host holding the shared slot looks like this
+        other = AIDispatcher(slots=2, reserved=1, slot_dir=self.slot_dir, wait=0)
+        self.addCleanup(lambda: [lock_file.close() for lock_file in other._files.values()])
+        with other.slot(BACKGROUND):
+            with self.assertRaises(AIBusy):
+                with self.dispatcher.slot(BACKGROUND, wait=0):
+                    pass
+
+    def test_waiting_call_gets_a_released_slot(self):
+        async def scenario():
+            async def holder():
+                async with self.dispatcher.aslot(BACKGROUND):
+                    await asyncio.sleep(0.02)
+
+            task = asyncio.ensure_future(holder())
+            await asyncio.sleep(0)
+            async with self.dispatcher.aslot(BACKGROUND, wait=1) as slot:
+                await task
+                return slot
+
+        self.assertEqual(asyncio.run(scenario()), 1)
+        self.assertEqual(self.dispatcher.stats()['waited'], 1)
+
+
+class _FakeCompletions:
+    """chat.completions stand-in: call n answers after delays[n] seconds (or raises it if an exception)"""
+
+    def __init__(self, *delays):
+        self.delays = delays
+        self.calls = 0
+        self.cancelled = []
+
+    async def create(self, **request):
+        index = self.calls
+        self.calls += 1
+        try:
+            if isinstance(self.delays[index], Exception):
+                raise self.delays[index]
+            await asyncio.sleep(self.delays[index])
+        except asyncio.CancelledError:
+            self.cancelled.append(index)
+            raise
+        return f'reply {index}'
+
+
+class HedgedCallTests(SimpleTestCase):
+    REQUEST = {'model': 'hedge-test-model', 'messages': []}
+
+    def setUp(self):
+        slot_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, slot_dir)
+        dispatcher = AIDispatcher(slots=4, reserved=0, slot_dir=slot_dir)
+        patcher = mock.patch('core.utils.ai_matcher.ai_dispatcher', dispatcher)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(lambda: [lock_file.close() for lock_file in dispatcher._files.values()])
+        self.matcher = AIJobMatcher()
+
+    def _run(self, completions, delay=0.05):
+        client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+        return asyncio.run(self.matcher._ahedged(client, CHAT, dict(self.REQUEST), delay))
+
+    def test_fast_reply_is_not_hedged(self):
+        completions = _FakeCompletions(0)
+        self.assertEqual(self._run(completions), 'reply 0')
+        self.assertEqual(completions.calls, 1)
+
+    def test_hedge_winner_cancels_the_slow_request(self):
+        wins = model_router.stats()['hedge_wins']
+        completions = _FakeCompletions(5, 0)
+        self.assertEqual(self._run(completions), 'reply 1')
+        self.assertEqual(completions.cancelled, [0])
+        self.assertEqual(model_router.stats()['hedge_wins'], wins + 1)
+
+    def test_failed_hedge_waits_for_the_first_request(self):
+        completions = _FakeCompletions(0.1, ValueError('hedge failed'))
+        self.assertEqual(self._run(completions), 'reply 0')
+        self.assertEqual(completions.cancelled, [])
+
+    def test_both_failing_raises_the_first_error(self):
+        completions = _FakeCompletions(ValueError('first failed'), ValueError('hedge failed'))
+        with self.assertRaisesMessage(ValueError, 'first failed'):
+            self._run(completions, delay=0)
+
+
+class MatchCacheTests(SimpleTestCase):
+    CV = {'skills': 'Python, SQL', 'experience_years': '5', 'job_titles': 'Backend Developer'}
+    PREFERENCES = {'job_type': 'Full-time', 'location': 'Berlin'}
+    RESULT = {'suitable_job_titles': ['Backend Developer'], 'recommended_sectors': ['Software']}
+
+    def setUp(self):
+        self.cache = MatchCache(max_entries=2, ttl=60)
+
+    def test_hit_for_an_equivalent_profile_returns_a_copy(self):
+        self.cache.set(self.CV, self.PREFERENCES, self.RESULT)
+        same_profile = dict(self.CV, skills='sql,  python')
+        cached = self.cache.get(same_profile, {'job_type': 'full-time', 'location': ' Berlin'})
+        self.assertEqual(cached, self.RESULT)
+
+        cached['suitable_job_titles'].clear()
+        self.assertEqual(self.cache.get(self.CV, self.PREFERENCES), self.RESULT)
+        self.assertEqual(self.cache.stats()['hits'], 2)
+
+    def test_different_preferences_miss(self):
+        self.cache.set(self.CV, self.PREFERENCES, self.RESULT)
+        self.assertIsNone(self.cache.get(self.CV, dict(self.PREFERENCES, location='Munich')))
+        self.assertEqual(self.cache.stats()['misses'], 1)
+
+    def test_entry_expires_after_the_ttl(self):
+        with mock.patch('core.utils.match_cache.time.monotonic', return_value=1000):
+            self.cache.set(self.CV, self.PREFERENCES, self.RESULT)
+        with mock.patch('core.utils.match_cache.time.monotonic', return_value=1059):
+            self.assertEqual(self.cache.get(self.CV, self.PREFERENCES), self.RESULT)
+        with mock.patch('core.utils.match_cache.time.monotonic', return_value=1060):
+            self.assertIsNone(self.cache.get(self.CV, self.PREFERENCES))
+        self.assertEqual(self.cache.stats()['size'], 0)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        locations = ('Berlin', 'Munich', 'Hamburg')
+        self.cache.set(self.CV, {'location': locations[0]}, self.RESULT)
+        self.cache.set(self.CV, {'location': locations[1]}, self.RESULT)
+        self.cache.get(self.CV, {'location': locations[0]})
+        self.cache.set(self.CV, {'location': locations[2]}, self.RESULT)
+
+        self.assertIsNone(self.cache.get(self.CV, {'location': locations[1]}))
+        self.assertIsNotNone(self.cache.get(self.CV, {'location': locations[0]}))
+        self.assertIsNotNone(self.cache.get(self.CV, {'location': locations[2]}))
+        self.assertEqual(self.cache.stats()['evictions'], 1)
+
+    def test_empty_fallback_result_is_not_cached(self):
+        self.cache.set(self.CV, self.PREFERENCES, {'suitable_job_titles': [], 'recommended_sectors': []})
+        self.assertIsNone(self.cache.get(self.CV, self.PREFERENCES))
+
+
+class ListingCacheTests(SimpleTestCase):
+    FILTERS = {'country': 'Germany', 'job_title': 'Backend Developer'}
+
+    def setUp(self):
+        self.lock_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.lock_dir, ignore_errors=True)
+        self.release = threading.Event()
+        self.calls = []
+        with override_settings(SINGLE_FLIGHT_DIR=self.lock_dir):
+            self.cache = ListingCache('test', self._generate, fresh_ttl=60, stale_ttl=3600)
+
+    def _generate(self, filters):
+        self.calls.append(filters)
+        self.release.wait(5)
+        return [{'title': 'new'}]
+
+    def _store_entry(self, age):
+        key = self.cache._key(self.FILTERS)
+        self.cache._store_local(key, {'generated_at': time.time() - age, 'jobs': [{'title': 'old'}]})
+
+    def _finish_refreshes(self):
+        self.release.set()
+        self.cache._executor.shutdown(wait=True)
+        # A later stale hit starts a new executor
+        self.cache._executor = None
+
+    def test_fresh_entry_is_served_without_refreshing(self):
+        self._store_entry(age=10)
+        self.assertEqual(self.cache.get(self.FILTERS), [{'title': 'old'}])
+        self.assertEqual(self.calls, [])
+        self.assertIsNone(self.cache._executor)
+
+    def test_stale_entry_is_served_while_one_refresh_runs(self):
+        self._store_entry(age=120)
+        started = time.monotonic()
+        for _ in range(3):
+            self.assertEqual(self.cache.get(self.FILTERS), [{'title': 'old'}])
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertFalse(self.cache.is_fresh(self.FILTERS))
+
+        self._finish_refreshes()
+        stats = self.cache.stats()
+        self.assertEqual((stats['stale_hits'], stats['refreshes']), (3, 1))
+        self.assertEqual(len(self.calls), 1)
+        self.assertTrue(self.cache.is_fresh(self.FILTERS))
+        self.assertEqual(self.cache.get(self.FILTERS), [{'title': 'new'}])
+
+    def test_failed_refresh_keeps_serving_the_stale_entry(self):
+        self.cache.generate = lambda filters: []
+        self._store_entry(age=120)
+        self.cache.get(self.FILTERS)
+        self._finish_refreshes()
+        self.assertEqual(self.cache.get(self.FILTERS), [{'title': 'old'}])
+
+    def test_expired_entry_is_regenerated_before_returning(self):
+        self._store_entry(age=7200)
+        self.release.set()
+        self.assertEqual(self.cache.get(self.FILTERS), [{'title': 'new'}])
+        self.assertEqual(self.cache.stats()['misses'], 1)
@@ -4,6 +4,7 @@ from . import views
 urlpatterns = [
     path('', views.home, name='home'),
     path('upload-cv/', views.upload_cv, name='upload_cv'),
+    path('cv-status/<str:job_id>/', views.cv_parse_status, name='cv_parse_status'),
     path('job-preferences/', views.job_preferences, name='job_preferences'),
     path('job-results/', views.job_results, name='job_results'),
     path('chatbot/', views.chatbot, name='chatbot'),
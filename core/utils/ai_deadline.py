@@ -0,0 +1,49 @@
+"""
+AI Deadline - Request-scoped time budget for OpenAI calls
+A view sets a deadline once; every call made while serving that request (including
+calls in tasks it starts) gets only the time that is left instead of the client's
+full timeout and retries.
+"""
+import contextlib
+import contextvars
+import time
+
+
+_deadline = contextvars.ContextVar('ai_deadline', default=None)
+
+
+class DeadlineExceeded(Exception):
+    """The request's AI budget ran out before the call could finish"""
+
+
+@contextlib.contextmanager
+def ai_deadline(seconds):
+    """
+    Limit AI calls made inside the block to `seconds` in total
+    A nested deadline can only shorten the one already in force.
+    """
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None:
+        deadline = min(deadline, current)
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining():
+    """Seconds left in the current deadline, or None when there is none"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def check_remaining():
+    """Seconds left (None without a deadline); raises DeadlineExceeded once it has passed"""
+    budget = remaining()
+    if budget is not None and budget <= 0:
+        raise DeadlineExceeded('The request ran out of time for AI calls')
+    return budget
@@ -0,0 +1,215 @@
+"""
+AI Dispatcher - Admission control in front of every OpenAI call
+A fixed set of slot lock files is shared by all worker processes on the host; each
+call holds one slot (an fcntl lock) while it runs, so the whole deployment never has
+more than AI_MAX_CONCURRENCY calls in flight no matter how many workers hit OpenAI.
+Some slots are reserved for interactive calls (chat), so background generation can
+never take all of them. Per-session request rates are limited by a token bucket
+kept in the Django session, so it holds whichever worker serves the request.
+"""
+import asyncio
+import contextlib
+import os
+import threading
+import time
+from django.conf import settings
+from .ai_deadline import remaining
+
+try:
+    import fcntl
+except ImportError:  # Windows: the cap applies per process
+    fcntl = None
+
+
+INTERACTIVE = 'interactive'
+BACKGROUND = 'background'
+
+
+class AIBusy(Exception):
+    """No slot became free within the wait limit"""
+
+
+class AIDispatcher:
+    """Cluster-wide (per host) cap on concurrent OpenAI calls with reserved interactive slots"""
+
+    def __init__(self, slots=None, reserved=None, slot_dir=None, wait=None):
+        """
+        Args:
+            slots: Calls allowed in flight across all processes
+            reserved: Slots only INTERACTIVE calls may use
+            slot_dir: Directory of the slot lock files
+            wait: Seconds a call waits for a slot before AIBusy is raised
+        """
+        self.slots = max(1, slots or settings.AI_MAX_CONCURRENCY)
+        reserved = reserved if reserved is not None else settings.AI_INTERACTIVE_RESERVED
+        self.reserved = max(0, min(reserved, self.slots - 1))
+        self.slot_dir = str(slot_dir or settings.AI_SLOT_DIR)
+        self.wait = wait if wait is not None else settings.AI_SLOT_WAIT
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._files = {}
+        self._held = set()
+        self._counters = {'acquired': 0, 'waited': 0, 'busy': 0}
+
+    @contextlib.contextmanager
+    def slot(self, priority=BACKGROUND, wait=None):
+        """
+        Hold a slot for the duration of the block (blocks the thread while waiting)
+        Args:
+            wait: Seconds to wait for a slot instead of AI_SLOT_WAIT (0 takes a free one or raises AIBusy)
+        """
+        slot = self._try_acquire(priority)
+        if slot is None:
+            wait = self._wait_limit(wait)
+            deadline = time.monotonic() + wait
+            delay, max_delay = self._backoff(priority)
+            while slot is None:
+                if time.monotonic() >= deadline:
+                    self._busy(priority, wait)
+                time.sleep(delay)
+                delay = min(delay * 2, max_delay)
+                slot = self._try_acquire(priority, waited=True)
+        try:
+            yield slot
+        finally:
+            self._release(slot)
+
+    @contextlib.asynccontextmanager
+    async def aslot(self, priority=BACKGROUND, wait=None):
+        """slot() for coroutines: waits on the event loop instead of blocking it"""
+        slot = self._try_acquire(priority)
+        if slot is None:
+            wait = self._wait_limit(wait)
+            deadline = time.monotonic() + wait
+            delay, max_delay = self._backoff(priority)
+            while slot is None:
+                if time.monotonic() >= deadline:
+                    self._busy(priority, wait)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, max_delay)
+                slot = self._try_acquire(priority, waited=True)
+        try:
+            yield slot
+        finally:
+            self._release(slot)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counters, held_here=len(self._held), slots=self.slots, reserved=self.reserved)
+
+    @staticmethod
+    def _backoff(priority):
+        # Interactive callers poll more often, so they win freed slots first
+        return (0.01, 0.05) if priority == INTERACTIVE else (0.02, 0.25)
+
+    def _wait_limit(self, wait=None):
+        """Seconds to wait for a slot: AI_SLOT_WAIT (or wait), less if the request deadline is nearer"""
+        wait = self.wait if wait is None else wait
+        budget = remaining()
+        return wait if budget is None else max(0.0, min(wait, budget))
+
+    def _busy(self, priority, wait):
+        with self._lock:
+            self._counters['busy'] += 1
+        print(f"[ERROR] No OpenAI slot free within {wait:g}s ({priority})")
+        raise AIBusy('Too many AI requests are running right now. Please try again in a moment.')
+
+    def _slot_order(self, priority):
+        if priority == INTERACTIVE:
+            # Reserved slots first, leaving shared ones for background work
+            return range(self.slots)
+        return range(self.reserved, self.slots)
+
+    def _try_acquire(self, priority, waited=False):
+        """Take a free slot without waiting; returns its number or None"""
+        if os.getpid() != self._pid:
+            # Forked: the parent's slots and file handles are not ours
+            self._reset()
+        with self._lock:
+            for slot in self._slot_order(priority):
+                if slot in self._held:
+                    continue
+                lock_file = self._slot_file(slot)
+                if lock_file is not None:
+                    try:
+                        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except BlockingIOError:
+                        continue
+                self._held.add(slot)
+                self._counters['acquired'] += 1
+                if waited:
+                    self._counters['waited'] += 1
+                return slot
+        return None
+
+    def _release(self, slot):
+        with self._lock:
+            lock_file = self._files.get(slot)
+            if lock_file is not None:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+                except OSError as e:
+                    print(f"Could not release OpenAI slot {slot}: {e}")
+            self._held.discard(slot)
+
+    def _slot_file(self, slot):
+        """Open lock file of a slot (kept open for the life of the process), or None without fcntl"""
+        if fcntl is None:
+            return None
+        lock_file = self._files.get(slot)
+        if lock_file is None:
+            try:
+                os.makedirs(self.slot_dir, exist_ok=True)
+                lock_file = open(os.path.join(self.slot_dir, f"slot-{slot}.lock"), 'a')
+            except OSError as e:
+                # Degrade to a per-process cap rather than failing the call
+                print(f"OpenAI slot file unavailable, limiting this process only: {e}")
+                return None
+            self._files[slot] = lock_file
+        return lock_file
+
+
+class SessionTokenBucket:
+    """Token bucket per browser session, stored in the session itself"""
+
+    SESSION_KEY = 'ai_rate_bucket'
+
+    def __init__(self, burst=None, refill_per_minute=None):
+        """
+        Args:
+            burst: Tokens a full bucket holds (requests allowed back to back)
+            refill_per_minute: Tokens added per minute
+        """
+        self.burst = burst or settings.AI_SESSION_BURST
+        self.rate = (refill_per_minute or settings.AI_SESSION_REFILL_PER_MINUTE) / 60.0
+        self.enabled = getattr(settings, 'AI_SESSION_RATE_LIMIT_ENABLED', True)
+
+    def take(self, session, cost=1):
+        """
+        Spend tokens for a request
+        Args:
+            session: request.session (loaded; touching it loads it from the database)
+            cost: Tokens this request needs (roughly the OpenAI calls it can make)
+        Returns:
+            int: 0 if allowed, otherwise seconds until the request would be allowed
+        """
+        if not self.enabled:
+            return 0
+
+        now = time.time()
+        state = session.get(self.SESSION_KEY) or {}
+        tokens = min(self.burst, state.get('tokens', self.burst) + (now - state.get('updated', now)) * self.rate)
+        cost = min(cost, self.burst)
+        if tokens < cost:
+            return max(1, int((cost - tokens) / self.rate + 0.999))
+
+        session[self.SESSION_KEY] = {'tokens': tokens - cost, 'updated': now}
+        return 0
+
+
+# Shared by every AIJobMatcher in the process
+ai_dispatcher = AIDispatcher()
+session_bucket = SessionTokenBucket()
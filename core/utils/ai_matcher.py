@@ -2,46 +2,143 @@
 AI Matcher - Matches CV skills with job requirements using OpenAI
 Dual mode: Job Assistant (CV-based) and AI Chat (ChatGPT-like)
 """
-from openai import OpenAI
 from django.conf import settings
+from .openai_client import get_openai_client, get_async_openai_client
+from .ai_dispatcher import ai_dispatcher, BACKGROUND
+from .ai_deadline import check_remaining, DeadlineExceeded
+from .circuit_breaker import get_breaker
+from .model_router import model_router, MATCH, LISTINGS, CHAT, CHAT_STREAM, SUMMARY
+from .chat_memory import ChatMemory
+import asyncio
+import contextlib
 import json
 import time
+import openai
+
+
+# Marks the end of a streamed reply in the queue between the upstream reader and the client
+_STREAM_END = object()
+# Upstream readers of streamed replies still running (the event loop only keeps weak references)
+_stream_readers = set()
+
+
+def empty_match_results():
+    """match_jobs result with nothing found"""
+    return {
+        "suitable_job_titles": [],
+        "government_queries": [],
+        "company_queries": [],
+        "recommended_sectors": []
+    }
 
 
 class AIJobMatcher:
     """AI-powered job matching system with dual chat modes"""
     
-    def __init__(self):
-        try:
-            self.client = OpenAI(
-                api_key=settings.OPENAI_API_KEY,
-                timeout=30.0,
-                max_retries=2
-            )
-        except Exception as e:
-            print(f"Failed to initialize OpenAI client: {e}")
-            self.client = None
-    
-    def match_jobs(self, cv_data, job_preferences):
+    def __init__(self, priority=BACKGROUND, summarize_history=True):
         """
-        Match CV data with job preferences and generate job search queries
         Args:
-            cv_data: Extracted CV information
-            job_preferences: User's job preferences
-        Returns:
-            dict: Matching results and search queries
+            priority: ai_dispatcher priority of this matcher's calls (INTERACTIVE for chat)
+            summarize_history: Chat prompts may start a model summary of older turns
+                               (False when the session cannot pay for that call)
         """
-        if not self.client:
-            print("OpenAI client not initialized, returning empty results")
-            return {
-                "suitable_job_titles": [],
-                "government_queries": [],
-                "company_queries": [],
-                "recommended_sectors": []
-            }
-        
+        # Shared pooled client: constructing a matcher per request is cheap
+        self.client = get_openai_client()
+        self.priority = priority
+        self.summarize_history = summarize_history
+    
+    @property
+    def async_client(self):
+        """AsyncOpenAI client for the running event loop (use from async code only)"""
+        return get_async_openai_client()
+
+    def _create(self, call_type, **request):
+        """
+        chat.completions.create with the model routed for call_type, holding a dispatcher slot
+        Fails fast (CircuitOpen) while the model is failing and stays within the request deadline.
+        """
+        model = model_router.choose(call_type)
+        with get_breaker(model).guard():
+            with ai_dispatcher.slot(self.priority), self._timed(call_type, model):
+                client = self._budgeted(self.client, sync=True)
+                return client.chat.completions.create(model=model, **request)
+
+    async def _acreate(self, client, call_type, **request):
+        request = dict(request, model=model_router.choose(call_type))
+        delay = model_router.hedge_delay(call_type, request['model'])
+        if delay is None:
+            return await self._acall(client, call_type, request)
+        return await self._ahedged(client, call_type, request, delay)
+
+    async def _acall(self, client, call_type, request, slot_wait=None):
+        with get_breaker(request['model']).guard():
+            async with ai_dispatcher.aslot(self.priority, wait=slot_wait):
+                with self._timed(call_type, request['model']):
+                    budget = check_remaining()
+                    if budget is None:
+                        return await client.chat.completions.create(**request)
+                    try:
+                        # The client keeps its retries; wait_for stops them once the budget is spent
+                        return await asyncio.wait_for(
+                            self._budgeted(client).chat.completions.create(**request), budget
+                        )
+                    except asyncio.TimeoutError:
+                        raise DeadlineExceeded(f'No reply within the remaining {budget:.1f}s')
+
+    async def _ahedged(self, client, call_type, request, delay):
+        """_acall, plus an identical request if the first has not answered after `delay` seconds"""
+        first = asyncio.ensure_future(self._acall(client, call_type, request))
+        tasks = {first}
         try:
-            prompt = f"""
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                print(f"[ROUTER] {call_type} call on {request['model']} slower than {delay:.1f}s, hedging")
+                model_router.count('hedges')
+                # The hedge only runs if a slot is free right now
+                tasks.add(asyncio.ensure_future(self._acall(client, call_type, request, slot_wait=0)))
+            while True:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not first:
+                            model_router.count('hedge_wins')
+                        return task.result()
+                if not tasks:
+                    # Both failed: report the first request's error
+                    return first.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    @staticmethod
+    @contextlib.contextmanager
+    def _timed(call_type, model):
+        """Report the call's latency to the router; a timed-out call counts the time it took"""
+        started = time.monotonic()
+        try:
+            yield
+        except (openai.APITimeoutError, DeadlineExceeded):
+            model_router.record(call_type, model, time.monotonic() - started)
+            raise
+        model_router.record(call_type, model, time.monotonic() - started)
+
+    @staticmethod
+    def _budgeted(client, sync=False):
+        """
+        The client, limited to what is left of the request deadline
+        A blocking call cannot be cut short from outside, so sync calls also lose their retries.
+        """
+        budget = check_remaining()
+        if budget is None:
+            return client
+        timeout = min(budget, settings.OPENAI_TIMEOUT)
+        if sync:
+            return client.with_options(timeout=timeout, max_retries=0)
+        return client.with_options(timeout=timeout)
+
+    def _match_request(self, cv_data, job_preferences):
+        """Chat completion arguments for match_jobs"""
+        prompt = f"""
             Based on this candidate profile, suggest the best job search queries and job titles:
             
             Skills: {cv_data.get('skills', '')}
@@ -70,61 +167,77 @@ class AIJobMatcher:
                 "recommended_sectors": ["sector1", "sector2", ...]
             }}
             """
-            
-            response = self.client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are an expert career counselor and job matching specialist. Provide accurate job matching advice in JSON format only."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.5,
-                max_tokens=800
-            )
-            
-            ai_response = response.choices[0].message.content
-            
-            # Extract JSON from response
-            try:
-                json_start = ai_response.find('{')
-                json_end = ai_response.rfind('}') + 1
-                if json_start != -1 and json_end > json_start:
-                    json_str = ai_response[json_start:json_end]
-                    matching_results = json.loads(json_str)
-                    return matching_results
-                else:
-                    raise ValueError("No JSON found in response")
-            except Exception as json_error:
-                print(f"JSON parsing error: {json_error}")
-                print("Returning empty results - OpenAI API required for data")
-                return {
-                    "suitable_job_titles": [],
-                    "government_queries": [],
-                    "company_queries": [],
-                    "recommended_sectors": []
-                }
-            
-        except Exception as e:
-            print(f"Error in AI job matching: {e}")
+
+        return {
+            "messages": [
+                {"role": "system", "content": "You are an expert career counselor and job matching specialist. Provide accurate job matching advice in JSON format only."},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.5,
+            "max_tokens": 800
+        }
+
+    def _parse_match_response(self, ai_response):
+        """Pull the JSON object out of a match_jobs reply"""
+        # Extract JSON from response
+        try:
+            json_start = ai_response.find('{')
+            json_end = ai_response.rfind('}') + 1
+            if json_start != -1 and json_end > json_start:
+                json_str = ai_response[json_start:json_end]
+                matching_results = json.loads(json_str)
+                return matching_results
+            else:
+                raise ValueError("No JSON found in response")
+        except Exception as json_error:
+            print(f"JSON parsing error: {json_error}")
             print("Returning empty results - OpenAI API required for data")
-            return {
-                "suitable_job_titles": [],
-                "government_queries": [],
-                "company_queries": [],
-                "recommended_sectors": []
-            }
-    
-    def generate_chatbot_response(self, user_message, cv_data=None, conversation_history=None):
+            return empty_match_results()
+
+    def match_jobs(self, cv_data, job_preferences):
         """
-        AI Job Assistant Mode - Uses OpenAI API ONLY for intelligent responses
+        Match CV data with job preferences and generate job search queries
+        Args:
+            cv_data: Extracted CV information
+            job_preferences: User's job preferences
+        Returns:
+            dict: Matching results and search queries
         """
         if not self.client:
-            return "OpenAI API is not available. Please check your API key configuration."
+            print("OpenAI client not initialized, returning empty results")
+            return empty_match_results()
+        
+        try:
+            response = self._create(MATCH, **self._match_request(cv_data, job_preferences))
+            return self._parse_match_response(response.choices[0].message.content)
+            
+        except Exception as e:
+            print(f"Error in AI job matching: {e}")
+            print("Returning empty results - OpenAI API required for data")
+            return empty_match_results()
+
+    async def amatch_jobs(self, cv_data, job_preferences):
+        """match_jobs on the async client"""
+        client = self.async_client
+        if not client:
+            print("OpenAI client not initialized, returning empty results")
+            return empty_match_results()
 
         try:
-            # Build CV context for system prompt
-            cv_context = ""
-            if cv_data:
-                cv_context = f"""
+            response = await self._acreate(client, MATCH, **self._match_request(cv_data, job_preferences))
+            return self._parse_match_response(response.choices[0].message.content)
+
+        except Exception as e:
+            print(f"Error in AI job matching: {e}")
+            print("Returning empty results - OpenAI API required for data")
+            return empty_match_results()
+    
+    def _chatbot_request(self, user_message, cv_data=None, conversation_history=None):
+        """Chat completion arguments for Job Assistant mode"""
+        # Build CV context for system prompt
+        cv_context = ""
+        if cv_data:
+            cv_context = f"""
 The user has uploaded their CV with the following profile:
 - Skills: {cv_data.get('skills', 'Not specified')}
 - Experience: {cv_data.get('experience_years', '0')} years
@@ -134,35 +247,113 @@ The user has uploaded their CV with the following profile:
 Use this information to provide personalized job search advice.
 """
 
-            # Build conversation messages
-            messages = [
-                {
-                    "role": "system",
-                    "content": f"""You are an AI Job Assistant specialized in helping users with job search, CV improvement, interview preparation, and career advice. {cv_context}
+        # Build conversation messages
+        messages = [
+            {
+                "role": "system",
+                "content": f"""You are an AI Job Assistant specialized in helping users with job search, CV improvement, interview preparation, and career advice. {cv_context}
 Provide helpful, actionable advice in a friendly and professional tone. Keep responses concise and well-formatted."""
-                }
-            ]
-
-            # Add conversation history if available
-            if conversation_history:
-                for msg in conversation_history[-6:]:
-                    messages.append({
-                        "role": msg.get("role", "user"),
-                        "content": msg.get("content", "")
-                    })
-
-            # Add current message
-            messages.append({
-                "role": "user",
-                "content": user_message
-            })
+            }
+        ]
+
+        # Recent turns verbatim within the token budget, older ones as a summary
+        messages.extend(chat_memory.build(conversation_history, summarize=self.summarize_history))
+
+        # Add current message
+        messages.append({
+            "role": "user",
+            "content": user_message
+        })
+
+        return {
+            "messages": messages,
+            "temperature": 0.7,
+            "max_tokens": 500
+        }
+
+    def _general_chat_request(self, user_message, conversation_history=None):
+        """Chat completion arguments for AI Chat mode"""
+        # Build conversation messages for API
+        messages = [
+            {
+                "role": "system",
+                "content": "You are a helpful, friendly, and knowledgeable AI assistant. You engage in natural conversations, answer questions accurately, explain concepts clearly, help with creative tasks, and provide useful information. You are conversational and warm in your tone, like ChatGPT. Keep responses concise but informative."
+            }
+        ]
+
+        # Recent turns verbatim within the token budget, older ones as a summary
+        messages.extend(chat_memory.build(conversation_history, summarize=self.summarize_history))
+
+        # Add current message
+        messages.append({
+            "role": "user",
+            "content": user_message
+        })
+
+        return {
+            "messages": messages,
+            "temperature": 0.7,  # More creative/conversational
+            "max_tokens": 500,
+            "top_p": 1.0,
+            "frequency_penalty": 0.0,
+            "presence_penalty": 0.0
+        }
+
+    def _summary_request(self, summary, messages):
+        """Chat completion arguments for summarize_conversation"""
+        transcript = "\n".join(
+            f"{'User' if msg['role'] == 'user' else 'Assistant'}: {msg['content']}" for msg in messages
+        )
+        prompt = f"""Update the running summary of a conversation between a user and an assistant with the new messages.
+Keep facts about the user (skills, experience, goals, preferences, constraints), the questions asked and the advice given. Leave out greetings and filler.
+Reply with the updated summary only, in plain text, at most {settings.CHAT_SUMMARY_TOKENS * 3 // 4} words.
+
+Summary so far:
+{summary or '(none yet)'}
+
+New messages:
+{transcript}"""
+
+        return {
+            "messages": [
+                {"role": "system", "content": "You condense conversations into short, factual summaries."},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.2,
+            "max_tokens": settings.CHAT_SUMMARY_TOKENS
+        }
+
+    def summarize_conversation(self, summary, messages):
+        """
+        Fold chat turns into a running summary (chat_memory runs this in a background thread)
+        Args:
+            summary: Summary so far ('' for none)
+            messages: Turns to fold in, oldest first
+        Returns:
+            str: The updated summary, or None if the call failed
+        """
+        if not self.client:
+            return None
+
+        try:
+            response = self._create(SUMMARY, **self._summary_request(summary, messages))
+            return response.choices[0].message.content.strip()
+
+        except Exception as e:
+            print(f"OpenAI API error summarizing chat: {e}")
+            return None
 
+    def generate_chatbot_response(self, user_message, cv_data=None, conversation_history=None):
+        """
+        AI Job Assistant Mode - Uses OpenAI API ONLY for intelligent responses
+        """
+        if not self.client:
+            return "OpenAI API is not available. Please check your API key configuration."
+
+        try:
             # Call OpenAI API
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=messages,
-                temperature=0.7,
-                max_tokens=500
+            response = self._create(
+                CHAT, **self._chatbot_request(user_message, cv_data, conversation_history)
             )
 
             return response.choices[0].message.content.strip()
@@ -179,37 +370,9 @@ Provide helpful, actionable advice in a friendly and professional tone. Keep res
             return "OpenAI API is not available. Please check your API key configuration."
 
         try:
-            # Build conversation messages for API
-            messages = [
-                {
-                    "role": "system",
-                    "content": "You are a helpful, friendly, and knowledgeable AI assistant. You engage in natural conversations, answer questions accurately, explain concepts clearly, help with creative tasks, and provide useful information. You are conversational and warm in your tone, like ChatGPT. Keep responses concise but informative."
-                }
-            ]
-
-            # Add conversation history if available
-            if conversation_history:
-                for msg in conversation_history[-6:]:  # Last 6 messages for context
-                    messages.append({
-                        "role": msg.get("role", "user"),
-                        "content": msg.get("content", "")
-                    })
-
-            # Add current message
-            messages.append({
-                "role": "user",
-                "content": user_message
-            })
-
             # Call OpenAI API
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",  # Using GPT-3.5 for chat (faster and cheaper)
-                messages=messages,
-                temperature=0.7,  # More creative/conversational
-                max_tokens=500,
-                top_p=1.0,
-                frequency_penalty=0.0,
-                presence_penalty=0.0
+            response = self._create(
+                CHAT, **self._general_chat_request(user_message, conversation_history)
             )
 
             return response.choices[0].message.content.strip()
@@ -218,6 +381,224 @@ Provide helpful, actionable advice in a friendly and professional tone. Keep res
             print(f"OpenAI API error in chat mode: {e}")
             return "I'm having trouble connecting to the AI service. Please try again later."
 
+    async def agenerate_chatbot_response(self, user_message, cv_data=None, conversation_history=None):
+        """generate_chatbot_response on the async client"""
+        client = self.async_client
+        if not client:
+            return "OpenAI API is not available. Please check your API key configuration."
+
+        try:
+            response = await self._acreate(
+                client, CHAT, **self._chatbot_request(user_message, cv_data, conversation_history)
+            )
+            return response.choices[0].message.content.strip()
+
+        except Exception as e:
+            print(f"OpenAI API error in job assistant mode: {e}")
+            return "I'm having trouble connecting to the AI service. Please try again later."
+
+    async def agenerate_general_chat_response(self, user_message, conversation_history=None):
+        """generate_general_chat_response on the async client"""
+        client = self.async_client
+        if not client:
+            return "OpenAI API is not available. Please check your API key configuration."
+
+        try:
+            response = await self._acreate(
+                client, CHAT, **self._general_chat_request(user_message, conversation_history)
+            )
+            return response.choices[0].message.content.strip()
+
+        except Exception as e:
+            print(f"OpenAI API error in chat mode: {e}")
+            return "I'm having trouble connecting to the AI service. Please try again later."
+
+    def astream_chatbot_response(self, user_message, cv_data=None, conversation_history=None):
+        """
+        Job Assistant mode, streamed on the async client
+        Yields:
+            str: Pieces of the reply as the model produces them (raises on API errors)
+        """
+        return self._astream_completion(CHAT_STREAM, self._chatbot_request(user_message, cv_data, conversation_history))
+
+    def astream_general_chat_response(self, user_message, conversation_history=None):
+        """
+        AI Chat mode, streamed on the async client
+        Yields:
+            str: Pieces of the reply as the model produces them (raises on API errors)
+        """
+        return self._astream_completion(CHAT_STREAM, self._general_chat_request(user_message, conversation_history))
+
+    async def _astream_completion(self, call_type, request):
+        client = self.async_client
+        if not client:
+            yield "OpenAI API is not available. Please check your API key configuration."
+            return
+
+        # The upstream stream is read into a queue by its own task, so the dispatcher slot
+        # and the breaker are released when OpenAI finishes, however slowly the browser reads
+        queue = asyncio.Queue()
+        reader = asyncio.ensure_future(self._aread_stream(client, call_type, request, queue))
+        _stream_readers.add(reader)
+        reader.add_done_callback(_stream_readers.discard)
+        try:
+            while True:
+                item = await queue.get()
+                if item is _STREAM_END:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # Stops reading upstream if the browser went away first
+            reader.cancel()
+
+    async def _aread_stream(self, client, call_type, request, queue):
+        """
+        Put each piece of a streamed reply on the queue, then _STREAM_END or the error
+        The router gets the time to the first chunk: how long the reply takes overall
+        depends on its length, not on how loaded the model is.
+        """
+        model = model_router.choose(call_type)
+        try:
+            with get_breaker(model).guard():
+                async with ai_dispatcher.aslot(self.priority):
+                    started = time.monotonic()
+                    first_chunk = False
+                    try:
+                        stream = await self._budgeted(client).chat.completions.create(
+                            model=model, stream=True, **request
+                        )
+                        try:
+                            async for chunk in stream:
+                                if chunk.choices and chunk.choices[0].delta.content:
+                                    if not first_chunk:
+                                        first_chunk = True
+                                        model_router.record(call_type, model, time.monotonic() - started)
+                                    queue.put_nowait(chunk.choices[0].delta.content)
+                        finally:
+                            await stream.close()
+                    except (openai.APITimeoutError, DeadlineExceeded):
+                        # As in _timed, a call that timed out before its first chunk counts the time it took
+                        if not first_chunk:
+                            model_router.record(call_type, model, time.monotonic() - started)
+                        raise
+        except Exception as e:
+            queue.put_nowait(e)
+        else:
+            queue.put_nowait(_STREAM_END)
+
+    def _job_listings_request(self, filters):
+        """Chat completion arguments for generate_job_listings"""
+        # Build prompt based on filters
+        country = filters.get('country', 'Global')
+        job_title = filters.get('job_title', 'Software Engineer')
+        experience = filters.get('experience_level', 'Mid Level')
+        company = filters.get('company', 'Top Tech Companies')
+        state = filters.get('state', '')
+
+        # Map experience level to years
+        exp_years_map = {
+            'fresher': '0-1 years',
+            'entry': '0-2 years',
+            'mid': '2-5 years',
+            'senior': '5-10 years',
+            'lead': '10+ years'
+        }
+        exp_years = exp_years_map.get(experience, '2-5 years')
+
+        location_str = f"{state}, {country}" if state else country
+
+        # List of ONLY reputed, established companies
+        reputed_companies = [
+            'Google', 'Microsoft', 'Amazon', 'Apple', 'Meta', 'Netflix', 'Tesla', 'IBM', 'Oracle', 'Salesforce',
+            'Adobe', 'Intel', 'Nvidia', 'Cisco', 'Dell', 'HP', 'VMware', 'Qualcomm', 'PayPal', 'eBay',
+            'Accenture', 'Deloitte', 'PwC', 'EY', 'KPMG', 'McKinsey', 'BCG', 'Bain', 'Capgemini', 'Cognizant',
+            'TCS', 'Infosys', 'Wipro', 'HCL', 'Tech Mahindra', 'L&T Infotech',
+            'JPMorgan', 'Goldman Sachs', 'Morgan Stanley', 'Citibank', 'Bank of America', 'HSBC', 'Barclays',
+            'ICICI Bank', 'HDFC Bank', 'Axis Bank', 'SBI',
+            'Walmart', 'Target', 'Flipkart', 'Alibaba',
+            'Verizon', 'AT&T', 'Vodafone', 'Airtel', 'Reliance Jio',
+            'Ford', 'Toyota', 'BMW', 'Mercedes', 'Tata Motors',
+            'Pfizer', 'Johnson & Johnson', 'AstraZeneca', 'Sun Pharma',
+            'P&G', 'Unilever', 'Nestle', 'Coca-Cola', 'PepsiCo', 'HUL',
+            'Shell', 'BP', 'ExxonMobil', 'Reliance Industries',
+            'Boeing', 'Airbus', 'Lockheed Martin',
+            'Disney', 'Warner Bros', 'Sony',
+            'Samsung', 'LG', 'Siemens', 'Philips', 'GE', 'Bosch', 'Honeywell'
+        ]
+
+        companies_list = ', '.join(reputed_companies[:30])
+
+        prompt = f"""Generate 7-8 job listings: {job_title} in {location_str}, {experience} level.
+{f'Company: ONLY {company}' if company else f'Companies: ONLY use these reputed companies: {companies_list}'}
+
+CRITICAL: Use ONLY well-known, established companies. NO startups, NO small companies.
+
+JSON format:
+[{{"title":"job","company":"name","location":"city,state,country","experience_required":"X-Y years","qualification":"degree","salary_range":"Rs X-Y LPA","responsibilities":["r1","r2","r3","r4","r5"],"qualifications":["q1","q2","q3","q4","q5"]}}]
+
+Generate 7-8 jobs from REPUTED companies only. ONLY JSON."""
+
+        return {
+            "messages": [
+                {"role": "system", "content": "Generate job listings ONLY from well-known, reputed, established companies. NO startups or small companies."},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.7,
+            "max_tokens": 3000
+        }
+
+    def _parse_job_listings(self, content):
+        """Jobs from a generate_job_listings reply, with job-board search links added"""
+        # Extract JSON from response (in case there's extra text)
+        start_idx = content.find('[')
+        end_idx = content.rfind(']') + 1
+        if start_idx != -1 and end_idx > start_idx:
+            json_str = content[start_idx:end_idx]
+            jobs_data = json.loads(json_str)
+
+            # Add REAL, WORKING application links - NO fake company websites
+            enhanced_jobs = []
+            for job in jobs_data:
+                company_name = job.get('company', 'Company')
+                job_title_for_search = job.get('title', '').replace(' ', '+')
+                location = job.get('location', '')
+                is_india = 'India' in location
+
+                # LinkedIn - REAL search URL (always works)
+                job['linkedin_link'] = f"https://www.linkedin.com/jobs/search/?keywords={company_name}+{job_title_for_search}"
+
+                # Indeed - REAL search URL (works globally, use .in for India)
+                if is_india:
+                    job['indeed_link'] = f"https://in.indeed.com/jobs?q={company_name}+{job_title_for_search}"
+                else:
+                    job['indeed_link'] = f"https://www.indeed.com/jobs?q={company_name}+{job_title_for_search}"
+
+                # Glassdoor - REAL search URL (works globally, use .co.in for India)
+                company_for_glassdoor = company_name.replace(' ', '-').lower()
+                if is_india:
+                    job['glassdoor_link'] = f"https://www.glassdoor.co.in/Job/{company_for_glassdoor}-jobs-SRCH_KO0,{len(company_name)}.htm"
+                else:
+                    job['glassdoor_link'] = f"https://www.glassdoor.com/Job/{company_for_glassdoor}-jobs-SRCH_KO0,{len(company_name)}.htm"
+
+                # Naukri - REAL search URL (only for Indian jobs)
+                if is_india:
+                    job['naukri_link'] = f"https://www.naukri.com/{company_name.lower().replace(' ', '-')}-jobs"
+                else:
+                    job['naukri_link'] = None
+
+                # Company Website - Set to None (we don't have real career page URLs)
+                job['company_website'] = None
+
+                enhanced_jobs.append(job)
+
+            print(f"[OK] Generated {len(enhanced_jobs)} jobs using OpenAI API")
+            return enhanced_jobs
+        else:
+            print("[ERROR] No valid JSON found in API response")
+            return []
+
     def generate_job_listings(self, filters):
         """
         Generate realistic job listings using OpenAI API based on search filters
@@ -231,116 +612,35 @@ Provide helpful, actionable advice in a friendly and professional tone. Keep res
             return []
 
         try:
-            # Build prompt based on filters
-            country = filters.get('country', 'Global')
-            job_title = filters.get('job_title', 'Software Engineer')
-            experience = filters.get('experience_level', 'Mid Level')
-            company = filters.get('company', 'Top Tech Companies')
-            state = filters.get('state', '')
-
-            # Map experience level to years
-            exp_years_map = {
-                'fresher': '0-1 years',
-                'entry': '0-2 years',
-                'mid': '2-5 years',
-                'senior': '5-10 years',
-                'lead': '10+ years'
-            }
-            exp_years = exp_years_map.get(experience, '2-5 years')
-
-            location_str = f"{state}, {country}" if state else country
-
-            # List of ONLY reputed, established companies
-            reputed_companies = [
-                'Google', 'Microsoft', 'Amazon', 'Apple', 'Meta', 'Netflix', 'Tesla', 'IBM', 'Oracle', 'Salesforce',
-                'Adobe', 'Intel', 'Nvidia', 'Cisco', 'Dell', 'HP', 'VMware', 'Qualcomm', 'PayPal', 'eBay',
-                'Accenture', 'Deloitte', 'PwC', 'EY', 'KPMG', 'McKinsey', 'BCG', 'Bain', 'Capgemini', 'Cognizant',
-                'TCS', 'Infosys', 'Wipro', 'HCL', 'Tech Mahindra', 'L&T Infotech',
-                'JPMorgan', 'Goldman Sachs', 'Morgan Stanley', 'Citibank', 'Bank of America', 'HSBC', 'Barclays',
-                'ICICI Bank', 'HDFC Bank', 'Axis Bank', 'SBI',
-                'Walmart', 'Target', 'Flipkart', 'Alibaba',
-                'Verizon', 'AT&T', 'Vodafone', 'Airtel', 'Reliance Jio',
-                'Ford', 'Toyota', 'BMW', 'Mercedes', 'Tata Motors',
-                'Pfizer', 'Johnson & Johnson', 'AstraZeneca', 'Sun Pharma',
-                'P&G', 'Unilever', 'Nestle', 'Coca-Cola', 'PepsiCo', 'HUL',
-                'Shell', 'BP', 'ExxonMobil', 'Reliance Industries',
-                'Boeing', 'Airbus', 'Lockheed Martin',
-                'Disney', 'Warner Bros', 'Sony',
-                'Samsung', 'LG', 'Siemens', 'Philips', 'GE', 'Bosch', 'Honeywell'
-            ]
-
-            companies_list = ', '.join(reputed_companies[:30])
-
-            prompt = f"""Generate 7-8 job listings: {job_title} in {location_str}, {experience} level.
-{f'Company: ONLY {company}' if company else f'Companies: ONLY use these reputed companies: {companies_list}'}
+            response = self._create(LISTINGS, **self._job_listings_request(filters))
 
-CRITICAL: Use ONLY well-known, established companies. NO startups, NO small companies.
+            # Parse response
+            content = response.choices[0].message.content.strip()
+            return self._parse_job_listings(content)
 
-JSON format:
-[{{"title":"job","company":"name","location":"city,state,country","experience_required":"X-Y years","qualification":"degree","salary_range":"Rs X-Y LPA","responsibilities":["r1","r2","r3","r4","r5"],"qualifications":["q1","q2","q3","q4","q5"]}}]
+        except json.JSONDecodeError as e:
+            print(f"[ERROR] JSON parsing error: {e}")
+            print(f"Response content: {content[:500] if 'content' in locals() else 'N/A'}")
+            print("Returning no jobs due to OpenAI error")
+            return []
+        except Exception as e:
+            print(f"[ERROR] Error generating jobs with OpenAI: {e}")
+            print("Returning no jobs due to OpenAI error")
+            return []
 
-Generate 7-8 jobs from REPUTED companies only. ONLY JSON."""
+    async def agenerate_job_listings(self, filters):
+        """generate_job_listings on the async client"""
+        client = self.async_client
+        if not client:
+            print("OpenAI client not available, returning no company jobs")
+            return []
 
-            response = self.client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "Generate job listings ONLY from well-known, reputed, established companies. NO startups or small companies."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=3000
-            )
+        try:
+            response = await self._acreate(client, LISTINGS, **self._job_listings_request(filters))
 
             # Parse response
             content = response.choices[0].message.content.strip()
-
-            # Extract JSON from response (in case there's extra text)
-            start_idx = content.find('[')
-            end_idx = content.rfind(']') + 1
-            if start_idx != -1 and end_idx > start_idx:
-                json_str = content[start_idx:end_idx]
-                jobs_data = json.loads(json_str)
-
-                # Add REAL, WORKING application links - NO fake company websites
-                enhanced_jobs = []
-                for job in jobs_data:
-                    company_name = job.get('company', 'Company')
-                    job_title_for_search = job.get('title', '').replace(' ', '+')
-                    location = job.get('location', '')
-                    is_india = 'India' in location
-
-                    # LinkedIn - REAL search URL (always works)
-                    job['linkedin_link'] = f"https://www.linkedin.com/jobs/search/?keywords={company_name}+{job_title_for_search}"
-
-                    # Indeed - REAL search URL (works globally, use .in for India)
-                    if is_india:
-                        job['indeed_link'] = f"https://in.indeed.com/jobs?q={company_name}+{job_title_for_search}"
-                    else:
-                        job['indeed_link'] = f"https://www.indeed.com/jobs?q={company_name}+{job_title_for_search}"
-
-                    # Glassdoor - REAL search URL (works globally, use .co.in for India)
-                    company_for_glassdoor = company_name.replace(' ', '-').lower()
-                    if is_india:
-                        job['glassdoor_link'] = f"https://www.glassdoor.co.in/Job/{company_for_glassdoor}-jobs-SRCH_KO0,{len(company_name)}.htm"
-                    else:
-                        job['glassdoor_link'] = f"https://www.glassdoor.com/Job/{company_for_glassdoor}-jobs-SRCH_KO0,{len(company_name)}.htm"
-
-                    # Naukri - REAL search URL (only for Indian jobs)
-                    if is_india:
-                        job['naukri_link'] = f"https://www.naukri.com/{company_name.lower().replace(' ', '-')}-jobs"
-                    else:
-                        job['naukri_link'] = None
-
-                    # Company Website - Set to None (we don't have real career page URLs)
-                    job['company_website'] = None
-
-                    enhanced_jobs.append(job)
-
-                print(f"[OK] Generated {len(enhanced_jobs)} jobs using OpenAI API")
-                return enhanced_jobs
-            else:
-                print("[ERROR] No valid JSON found in API response")
-                return []
+            return self._parse_job_listings(content)
 
         except json.JSONDecodeError as e:
             print(f"[ERROR] JSON parsing error: {e}")
@@ -352,26 +652,15 @@ Generate 7-8 jobs from REPUTED companies only. ONLY JSON."""
             print("Returning no jobs due to OpenAI error")
             return []
 
-    def generate_government_jobs(self, filters):
-        """
-        Generate realistic GOVERNMENT job listings using OpenAI API
-        Args:
-            filters: Dict with country, job_title, state
-        Returns:
-            List of government job dictionaries
-        """
-        if not self.client:
-            print("OpenAI client not available, returning no government jobs")
-            return []
-
-        try:
-            country = filters.get('country', 'United Kingdom')
-            job_title = filters.get('job_title', 'Civil Service')
-            state = filters.get('state', '')
+    def _government_jobs_request(self, filters):
+        """Chat completion arguments for generate_government_jobs"""
+        country = filters.get('country', 'United Kingdom')
+        job_title = filters.get('job_title', 'Civil Service')
+        state = filters.get('state', '')
 
-            location_str = f"{state}, {country}" if state else country
+        location_str = f"{state}, {country}" if state else country
 
-            prompt = f"""Generate 5-10 realistic GOVERNMENT job listings for the following criteria:
+        prompt = f"""Generate 5-10 realistic GOVERNMENT job listings for the following criteria:
 - Job Title/Department: {job_title}
 - Country: {country}
 - Location: {location_str}
@@ -409,33 +698,75 @@ Use REAL government organizations for {country}. Examples:
 
 Generate realistic, diverse government jobs. No explanation, ONLY JSON array."""
 
-            response = self.client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are a government job data generator that creates realistic official government job listings in JSON format."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=3000
-            )
+        return {
+            "messages": [
+                {"role": "system", "content": "You are a government job data generator that creates realistic official government job listings in JSON format."},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.7,
+            "max_tokens": 3000
+        }
+
+    def _parse_government_jobs(self, content):
+        """Jobs from a generate_government_jobs reply"""
+        # Extract JSON
+        start_idx = content.find('[')
+        end_idx = content.rfind(']') + 1
+        if start_idx != -1 and end_idx > start_idx:
+            json_str = content[start_idx:end_idx]
+            jobs_data = json.loads(json_str)
+
+            print(f"[OK] Generated {len(jobs_data)} government jobs using OpenAI API")
+            return jobs_data
+        else:
+            print("[ERROR] No valid JSON found in government jobs API response")
+            return []
+
+    def generate_government_jobs(self, filters):
+        """
+        Generate realistic GOVERNMENT job listings using OpenAI API
+        Args:
+            filters: Dict with country, job_title, state
+        Returns:
+            List of government job dictionaries
+        """
+        if not self.client:
+            print("OpenAI client not available, returning no government jobs")
+            return []
+
+        try:
+            response = self._create(LISTINGS, **self._government_jobs_request(filters))
 
             content = response.choices[0].message.content.strip()
+            return self._parse_government_jobs(content)
+
+        except Exception as e:
+            print(f"[ERROR] Error generating government jobs with OpenAI: {e}")
+            print("Returning no jobs due to OpenAI error")
+            return []
 
-            # Extract JSON
-            start_idx = content.find('[')
-            end_idx = content.rfind(']') + 1
-            if start_idx != -1 and end_idx > start_idx:
-                json_str = content[start_idx:end_idx]
-                jobs_data = json.loads(json_str)
+    async def agenerate_government_jobs(self, filters):
+        """generate_government_jobs on the async client"""
+        client = self.async_client
+        if not client:
+            print("OpenAI client not available, returning no government jobs")
+            return []
 
-                print(f"[OK] Generated {len(jobs_data)} government jobs using OpenAI API")
-                return jobs_data
-            else:
-                print("[ERROR] No valid JSON found in government jobs API response")
-                return []
+        try:
+            response = await self._acreate(client, LISTINGS, **self._government_jobs_request(filters))
+
+            content = response.choices[0].message.content.strip()
+            return self._parse_government_jobs(content)
 
         except Exception as e:
             print(f"[ERROR] Error generating government jobs with OpenAI: {e}")
             print("Returning no jobs due to OpenAI error")
             return []
 
+
+def _summarize_conversation(summary, messages):
+    return AIJobMatcher().summarize_conversation(summary, messages)
+
+
+# History builder shared by the chat requests of every AIJobMatcher in the process
+chat_memory = ChatMemory(_summarize_conversation)
@@ -0,0 +1,267 @@
+"""
+Chat Memory - Token-budgeted conversation history for the chat prompts
+The newest turns go into the prompt verbatim until CHAT_HISTORY_TOKENS is used up;
+everything older is folded into one summary of at most CHAT_SUMMARY_TOKENS. Summaries
+are written by the model in a background thread and cached per conversation prefix,
+so each message only folds in the turns added since the last summary. Until the model
+summary is ready, an extractive one (the opening sentence of each older turn) is used,
+so building the prompt never waits on OpenAI and its size stays flat as chats grow.
+A model summary is a call made for the chat request, so it runs under what is left
+of that request's ai_deadline, and callers can leave it out (summary_due() says when
+one would be made, e.g. to charge it to the session's rate limit first).
+"""
+import contextlib
+import hashlib
+import json
+import math
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from .ai_deadline import ai_deadline, remaining
+
+try:
+    import tiktoken
+except ImportError:  # Token counts are estimated from the text length
+    tiktoken = None
+
+
+ROLES = ('user', 'assistant')
+# Tokens the chat format adds around each message
+MESSAGE_OVERHEAD = 4
+
+_encoding = None
+_encoding_lock = threading.Lock()
+
+
+def _get_encoding():
+    global _encoding
+    if _encoding is None and tiktoken is not None:
+        with _encoding_lock:
+            if _encoding is None:
+                try:
+                    _encoding = tiktoken.get_encoding('cl100k_base')
+                except Exception as e:
+                    # The encoding is downloaded on first use; offline we estimate instead
+                    print(f"tiktoken encoding unavailable, estimating token counts: {e}")
+                    _encoding = False
+    return _encoding or None
+
+
+def count_tokens(text):
+    """Tokens in text (tiktoken when installed, else about four characters per token)"""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / 4)
+
+
+def trim_to_tokens(text, limit):
+    """Text cut down to about `limit` tokens, marking the cut"""
+    if count_tokens(text) <= limit:
+        return text
+    encoding = _get_encoding()
+    if encoding is not None:
+        return encoding.decode(encoding.encode(text, disallowed_special=())[:limit]).rstrip() + ' [...]'
+    return text[:limit * 4].rstrip() + ' [...]'
+
+
+def _first_sentence(text):
+    text = ' '.join(text.split())
+    match = re.match(r'(.+?[.!?])(\s|$)', text)
+    return match.group(1) if match else text
+
+
+class ChatMemory:
+    """Builds the history part of a chat prompt within a token budget"""
+
+    def __init__(self, summarize=None, history_tokens=None, summary_tokens=None, message_tokens=None,
+                 max_entries=None):
+        """
+        Args:
+            summarize: Callable (previous summary or '', list of messages) -> summary text or None;
+                       runs in a background thread (None keeps extractive summaries only)
+            history_tokens: Budget for recent turns kept verbatim
+            summary_tokens: Budget for the summary of older turns
+            message_tokens: Longer history messages (pasted text) are trimmed to this
+            max_entries: Cached summaries kept before least recently used ones are evicted
+        """
+        self.summarize = summarize if settings.CHAT_MODEL_SUMMARIES_ENABLED else None
+        self.history_tokens = history_tokens or settings.CHAT_HISTORY_TOKENS
+        self.summary_tokens = summary_tokens or settings.CHAT_SUMMARY_TOKENS
+        self.message_tokens = message_tokens or settings.CHAT_MESSAGE_TOKENS
+        self.max_entries = max_entries or settings.CHAT_SUMMARY_CACHE_ENTRIES
+        self._summaries = OrderedDict()
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._executor = None
+        self._counters = {'exact': 0, 'rolled': 0, 'extractive': 0, 'summarized': 0}
+
+    def build(self, conversation_history, summarize=True):
+        """
+        History messages for a chat request
+        Args:
+            conversation_history: [{'role', 'content'}, ...] as sent by the chat page, oldest first
+            summarize: Start a model summary of older turns if one is due (else extractive only)
+        Returns:
+            list: A system message summarizing older turns (if any), then the recent turns
+        """
+        history = self._clean(conversation_history)
+        split = self._split(history)
+
+        messages = []
+        if split:
+            summary = self._summary(history[:split], summarize)
+            if summary:
+                messages.append({
+                    "role": "system",
+                    "content": f"Summary of the earlier conversation: {summary}"
+                })
+        messages.extend(history[split:])
+        return messages
+
+    def summary_due(self, conversation_history):
+        """True if build() would start a model summary call for this history"""
+        if self.summarize is None:
+            return False
+        history = self._clean(conversation_history)
+        split = self._split(history)
+        if not split:
+            return False
+        keys = self._prefix_keys(history[:split])
+        with self._lock:
+            return keys[-1] not in self._summaries and keys[-1] not in self._pending
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counters, cached=len(self._summaries), pending=len(self._pending))
+
+    def _clean(self, conversation_history):
+        """Known roles only (the page cannot add system messages), long messages trimmed"""
+        history = []
+        for msg in conversation_history or []:
+            if not isinstance(msg, dict):
+                continue
+            content = str(msg.get('content') or '').strip()
+            if not content:
+                continue
+            role = msg.get('role') if msg.get('role') in ROLES else 'user'
+            history.append({"role": role, "content": trim_to_tokens(content, self.message_tokens)})
+        return history
+
+    def _split(self, history):
+        """Index where the recent turns kept verbatim start: newest first until the budget is spent"""
+        used = 0
+        split = len(history)
+        while split > 0:
+            cost = count_tokens(history[split - 1]['content']) + MESSAGE_OVERHEAD
+            # The last turn always fits
+            if used + cost > self.history_tokens and split < len(history):
+                break
+            used += cost
+            split -= 1
+        return split
+
+    def _summary(self, older, summarize=True):
+        """Summary of the older turns: cached, rolled forward from a shorter prefix, or extractive"""
+        keys = self._prefix_keys(older)
+        with self._lock:
+            covered = 0
+            summary = ''
+            for count in range(len(keys), 0, -1):
+                if keys[count - 1] in self._summaries:
+                    covered = count
+                    summary = self._summaries[keys[count - 1]]
+                    self._summaries.move_to_end(keys[count - 1])
+                    break
+
+        if covered == len(older):
+            self._count('exact')
+            return summary
+
+        self._count('rolled' if covered else 'extractive')
+        if self.summarize is not None and summarize:
+            self._summarize_async(keys[-1], *self._summary_input(summary, older[covered:]))
+        return self._extend(summary, older[covered:])
+
+    def _summary_input(self, summary, messages):
+        """
+        (summary, messages) for the model, at most history_tokens of messages
+        Turns beyond that are folded into the summary extractively first.
+        """
+        used = 0
+        split = len(messages)
+        while split > 0:
+            used += count_tokens(messages[split - 1]['content']) + MESSAGE_OVERHEAD
+            if used > self.history_tokens and split < len(messages):
+                break
+            split -= 1
+        if split:
+            summary = self._extend(summary, messages[:split])
+        return summary, messages[split:]
+
+    def _extend(self, summary, messages):
+        """Previous summary plus the opening sentence of each newer turn, within the summary budget"""
+        budget = self.summary_tokens - count_tokens(summary)
+        lines = []
+        # The newest turns matter most when not everything fits
+        for msg in reversed(messages):
+            line = f"{'User' if msg['role'] == 'user' else 'Assistant'}: {_first_sentence(msg['content'])}"
+            line = trim_to_tokens(line, 60)
+            cost = count_tokens(line) + 1
+            if cost > budget:
+                break
+            lines.append(line)
+            budget -= cost
+        lines.reverse()
+        return ' '.join(part for part in [summary] + lines if part)
+
+    @staticmethod
+    def _prefix_keys(messages):
+        """Key of every prefix of the conversation: keys[n - 1] covers messages[:n]"""
+        digest = hashlib.sha256()
+        keys = []
+        for msg in messages:
+            digest.update(json.dumps([msg['role'], msg['content']]).encode('utf-8'))
+            keys.append(digest.copy().hexdigest())
+        return keys
+
+    def _summarize_async(self, key, summary, messages):
+        """Have the model fold messages into the summary in the background; cached under key"""
+        with self._lock:
+            if key in self._pending:
+                return
+            self._pending.add(key)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=settings.CHAT_SUMMARY_THREADS, thread_name_prefix='chat-summary'
+                )
+        # Threads do not inherit the request's context, so its deadline is passed on
+        self._executor.submit(self._background_summarize, key, summary, messages, remaining())
+
+    def _background_summarize(self, key, summary, messages, budget=None):
+        try:
+            with ai_deadline(budget) if budget is not None else contextlib.nullcontext():
+                text = self.summarize(summary, messages)
+            if text:
+                self._store(key, trim_to_tokens(text.strip(), self.summary_tokens))
+                self._count('summarized')
+        except Exception as e:
+            print(f"[ERROR] Chat summary failed: {e}")
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+    def _store(self, key, summary):
+        with self._lock:
+            self._summaries[key] = summary
+            self._summaries.move_to_end(key)
+            while len(self._summaries) > self.max_entries:
+                self._summaries.popitem(last=False)
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
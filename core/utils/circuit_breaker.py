@@ -0,0 +1,134 @@
+"""
+Circuit Breaker - Fail fast while OpenAI is failing
+After a run of consecutive upstream failures the breaker opens and calls fail at
+once (callers fall back to cached or empty results). After a cool-down one probe
+call is let through; its outcome closes the breaker or opens it again.
+"""
+import contextlib
+import threading
+import time
+import openai
+from django.conf import settings
+
+
+# Errors that say the upstream is unhealthy; bad requests and our own limits do not count
+UPSTREAM_ERRORS = (
+    openai.APIConnectionError,  # includes APITimeoutError
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+
+
+class CircuitOpen(Exception):
+    """The breaker is open: the call was not made"""
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker with half-open probing"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name, failure_threshold=None, reset_timeout=None, half_open_probes=1):
+        """
+        Args:
+            name: Shown in log lines and errors
+            failure_threshold: Consecutive upstream failures that open the breaker
+            reset_timeout: Seconds the breaker stays open before probing
+            half_open_probes: Probe calls allowed at once while half-open
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold or settings.AI_BREAKER_FAILURES
+        self.reset_timeout = reset_timeout if reset_timeout is not None else settings.AI_BREAKER_RESET
+        self.half_open_probes = half_open_probes
+        self.enabled = getattr(settings, 'AI_BREAKER_ENABLED', True)
+        self._lock = threading.Lock()
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+
+    @contextlib.contextmanager
+    def guard(self):
+        """
+        Wrap one upstream call (also works around awaits in async code)
+        Raises CircuitOpen without running the block while the breaker is open.
+        """
+        if not self.enabled:
+            yield
+            return
+
+        probe = self._admit()
+        try:
+            yield
+        except UPSTREAM_ERRORS:
+            self._record_failure(probe)
+            raise
+        except BaseException:
+            # Not the upstream's fault (bad request, deadline, client went away)
+            self._release(probe)
+            raise
+        self._record_success(probe)
+
+    def is_open(self):
+        """True while calls would fail fast (open and not yet due for a probe)"""
+        with self._lock:
+            return (self.enabled and self.state == self.OPEN
+                    and time.monotonic() - self._opened_at < self.reset_timeout)
+
+    def stats(self):
+        with self._lock:
+            return {'state': self.state, 'failures': self._failures}
+
+    def _admit(self):
+        """Returns True if this call is a half-open probe"""
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                print(f"[CIRCUIT] {self.name} half-open, probing")
+            if self.state == self.CLOSED:
+                return False
+            if self.state == self.HALF_OPEN and self._probes < self.half_open_probes:
+                self._probes += 1
+                return True
+        raise CircuitOpen(f'{self.name} is failing; skipping the call for now')
+
+    def _record_success(self, probe):
+        with self._lock:
+            if probe:
+                self._probes -= 1
+            if self.state != self.CLOSED:
+                print(f"[CIRCUIT] {self.name} closed, upstream recovered")
+            self.state = self.CLOSED
+            self._failures = 0
+
+    def _record_failure(self, probe):
+        with self._lock:
+            if probe:
+                self._probes -= 1
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    print(f"[CIRCUIT] {self.name} open after {self._failures} failures, "
+                          f"failing fast for {self.reset_timeout:g}s")
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def _release(self, probe):
+        if probe:
+            with self._lock:
+                self._probes -= 1
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name):
+    """Process-wide breaker for a name (one per model)"""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name)
+        return breaker
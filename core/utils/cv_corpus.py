@@ -0,0 +1,392 @@
+"""
+Synthetic CV Corpus - Generates PDF and DOCX CVs with known ground truth
+Used by the generate_cv_corpus and benchmark_parser management commands to
+measure CVParser speed and extraction quality
+"""
+import json
+import os
+import random
+import re
+from datetime import datetime
+import docx
+from .skill_matcher import DEFAULT_TECH_SKILLS, DEFAULT_SOFT_SKILLS
+
+
+MANIFEST_NAME = 'ground_truth.json'
+
+FIRST_NAMES = ['Aisha', 'Ben', 'Carlos', 'Dana', 'Elena', 'Farid', 'Grace', 'Hiro', 'Ines', 'Jonas',
+               'Kavya', 'Liam', 'Mei', 'Noah', 'Olga', 'Priya', 'Quinn', 'Ravi', 'Sara', 'Tomas']
+LAST_NAMES = ['Ahmed', 'Brown', 'Costa', 'Dubois', 'Evans', 'Fischer', 'Gupta', 'Hansen', 'Ito',
+              'Jensen', 'Khan', 'Lopez', 'Moreau', 'Nguyen', 'Okafor', 'Patel', 'Rossi', 'Silva']
+
+# Company names avoid words the parser treats as titles or skills ("Research", "Data", ...)
+COMPANIES = ['Northwind Traders', 'Bluefin Retail', 'Orbit Logistics', 'Harbor Bank', 'Juniper Health',
+             'Crescent Media', 'Summit Insurance', 'Falcon Travel', 'Maple Foods', 'Granite Telecom']
+INSTITUTIONS = ['University of Leeds', 'Delhi Technological University', 'University of Toronto',
+                'Monash University', 'University of Porto', 'Kyoto University', 'University of Lagos']
+
+# Role family (the title keyword the parser should report) -> full titles
+TITLE_FAMILIES = {
+    'Engineer': ['Software Engineer', 'Senior Software Engineer', 'DevOps Engineer', 'QA Engineer'],
+    'Developer': ['Backend Developer', 'Frontend Developer', 'Senior Developer', 'Mobile Developer'],
+    'Analyst': ['Business Analyst', 'Reporting Analyst', 'Systems Analyst'],
+    'Manager': ['Product Manager', 'Engineering Manager', 'Delivery Manager'],
+    'Consultant': ['Technology Consultant', 'Cloud Consultant'],
+    'Specialist': ['Support Specialist', 'Integration Specialist'],
+    'Designer': ['UX Designer', 'Product Designer'],
+}
+
+# Highest degree -> (education label reported by the parser, degree line, lower degrees listed too)
+DEGREES = {
+    'PhD': ('PhD', 'PhD in Computer Science', ['master', 'bachelor']),
+    'master': ("Master's Degree", 'Master of Science in Information Systems', ['bachelor']),
+    'bachelor': ("Bachelor's Degree", 'Bachelor of Engineering in Computer Science', []),
+    'diploma': ('Diploma', 'Diploma in Software Development', []),
+}
+DEGREE_LINES = {
+    'master': 'Master of Science in Information Systems',
+    'bachelor': 'Bachelor of Engineering in Computer Science',
+}
+
+EXPERIENCE_HEADERS = ['EXPERIENCE', 'WORK EXPERIENCE', 'Professional Experience', 'EMPLOYMENT HISTORY:']
+SKILLS_HEADERS = ['SKILLS', 'TECHNICAL SKILLS', 'Key Skills']
+EDUCATION_HEADERS = ['EDUCATION', 'Education', 'ACADEMIC BACKGROUND']
+PROJECTS_HEADERS = ['PROJECTS', 'PERSONAL PROJECTS']
+
+# Neutral prose: none of these words are in the skill taxonomy or the title list
+SUMMARY_SENTENCES = [
+    'Dependable professional who enjoys building useful products.',
+    'Comfortable owning work from first sketch to steady production use.',
+    'Known for clear writing and careful reviews.',
+    'Happy working across time zones with distributed colleagues.',
+]
+DUTY_SENTENCES = [
+    'Delivered features used by thousands of customers every week.',
+    'Reduced page load times by a third.',
+    'Mentored two junior colleagues through their first year.',
+    'Owned the release checklist for the quarterly launch.',
+]
+FILLER_LINE = 'Portfolio notes lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod'
+
+LINES_PER_PDF_PAGE = 50
+MONTH_ABBR = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+
+def _now_month():
+    today = datetime.now()
+    return today.year * 12 + today.month - 1
+
+
+def _format_point(month, style):
+    year, month_index = divmod(month, 12)
+    if style == 'name':
+        return f'{MONTH_ABBR[month_index]} {year}'
+    if style == 'numeric':
+        return f'{month_index + 1:02d}/{year}'
+    return str(year)
+
+
+def _format_range(start, end, style, rng):
+    """Render a role's dates; end None means the role is current"""
+    separator = rng.choice([' - ', ' to ', '-'])
+    if end is None:
+        return _format_point(start, style) + separator + rng.choice(['Present', 'Current', 'Now'])
+    return _format_point(start, style) + separator + _format_point(end, style)
+
+
+def _pick_skills(rng, count):
+    """Pick canonical skills and the spelling (name or synonym) used in the CV"""
+    taxonomy = dict(DEFAULT_TECH_SKILLS)
+    taxonomy.update(DEFAULT_SOFT_SKILLS)
+    picked = []
+    for canonical in rng.sample(sorted(taxonomy), count):
+        synonyms = taxonomy[canonical]
+        spelling = rng.choice(synonyms) if synonyms and rng.random() < 0.3 else canonical
+        picked.append((canonical, spelling))
+    return picked
+
+
+def generate_cv(rng, index, max_pages=1):
+    """
+    Build one synthetic CV
+    Args:
+        rng: random.Random instance (seeded for a reproducible corpus)
+        index: Position in the corpus, used for the file name
+        max_pages: Upper bound on pages; filler pages pad the CV up to a random count
+    Returns:
+        dict: {'lines': [...], 'headers': {...}, 'truth': {...}, 'filler_pages': n}
+    """
+    now = _now_month()
+    name = f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}'
+    skills = _pick_skills(rng, rng.randint(4, 18))
+    date_style = rng.choice(['name', 'name', 'numeric', 'year'])
+
+    # Roles walk backwards from today with gaps; some overlap the previous role
+    roles = []
+    cursor = now
+    for role_index in range(rng.randint(1, 4)):
+        length = rng.randint(6, 48)
+        current = role_index == 0 and rng.random() < 0.5
+        end = None if current else cursor - rng.randint(0, 8)
+        start = (end if end is not None else now) - length
+        if date_style == 'year':
+            # Year-only dates are read as January of each year
+            start = (start // 12) * 12
+            end = None if end is None else max((end // 12) * 12, start + 12)
+        family = rng.choice(sorted(TITLE_FAMILIES))
+        roles.append({
+            'title': rng.choice(TITLE_FAMILIES[family]),
+            'family': family,
+            'company': rng.choice(COMPANIES),
+            'start': start,
+            'end': end,
+        })
+        overlap = rng.randint(0, 6) if rng.random() < 0.25 else -rng.randint(1, 10)
+        cursor = start + overlap
+
+    degree = rng.choice(sorted(DEGREES))
+    education_label, degree_line, lower = DEGREES[degree]
+
+    experience = [rng.choice(EXPERIENCE_HEADERS)]
+    role_skills = list(skills)
+    rng.shuffle(role_skills)
+    for role in roles:
+        title_line = rng.choice(['{title} at {company}', '{title}, {company}', '{company} | {title}'])
+        experience.append(title_line.format(**role))
+        experience.append(_format_range(role['start'], role['end'], date_style, rng))
+        experience.append(rng.choice(DUTY_SENTENCES))
+        if role_skills and rng.random() < 0.5:
+            experience.append('Used ' + role_skills.pop()[1] + ' daily.')
+    skills_in_list = [spelling for canonical, spelling in skills
+                      if (canonical, spelling) in role_skills]
+
+    sections = []
+    if skills_in_list:
+        skills_section = [rng.choice(SKILLS_HEADERS)]
+        if rng.random() < 0.5:
+            skills_section.append(', '.join(skills_in_list))
+        else:
+            skills_section.extend('- ' + spelling for spelling in skills_in_list)
+        sections.append(skills_section)
+
+    education = [rng.choice(EDUCATION_HEADERS), f'{degree_line}, {rng.choice(INSTITUTIONS)}']
+    # Study dates are outside EXPERIENCE and must not count as work experience
+    study_end = rng.randint(now // 12 - 15, now // 12 - 1)
+    education.append(f'{study_end - 3} - {study_end}')
+    for other in lower:
+        education.append(f'{DEGREE_LINES[other]}, {rng.choice(INSTITUTIONS)}')
+    sections.append(education)
+
+    if rng.random() < 0.4:
+        sections.append([rng.choice(PROJECTS_HEADERS), 'Volunteer booking site for a local charity',
+                         f'{study_end - 2} - {study_end - 1}'])
+
+    rng.shuffle(sections)
+    sections.insert(rng.randint(0, len(sections)), experience)
+
+    lines = [name, f'{name.split()[0].lower()}@example.com | +44 7700 900{index % 1000:03d}',
+             'SUMMARY', ' '.join(rng.sample(SUMMARY_SENTENCES, 2))]
+    headers = {'SUMMARY'}
+    for section in sections:
+        headers.add(section[0])
+        lines.extend(section)
+
+    filler_pages = rng.randint(0, max(0, max_pages - 1))
+    truth = {
+        'name': name,
+        'skills': sorted(canonical for canonical, spelling in skills),
+        'roles': [{'title': role['title'], 'family': role['family'],
+                   'start': role['start'], 'end': role['end']} for role in roles],
+        'title_families': sorted({role['family'] for role in roles}),
+        'education': education_label,
+    }
+    return {'lines': lines, 'headers': headers, 'truth': truth, 'filler_pages': filler_pages}
+
+
+def _pdf_escape(text):
+    text = text.encode('latin-1', errors='replace').decode('latin-1')
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def write_pdf(pages, path):
+    """
+    Write a minimal text-only PDF (Helvetica, one text object per page)
+    Args:
+        pages: List of pages, each a list of text lines
+        path: Output file path
+    """
+    objects = [b'<< /Type /Catalog /Pages 2 0 R >>']
+    kids = ' '.join(f'{3 + i * 2} 0 R' for i in range(len(pages)))
+    objects.append(f'<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>'.encode())
+    font_id = 3 + len(pages) * 2
+
+    for i, lines in enumerate(pages):
+        content = 'BT /F1 10 Tf 50 800 Td 14 TL ' + ' '.join(
+            f"({_pdf_escape(line)}) '" for line in lines
+        ) + ' ET'
+        content = content.encode('latin-1')
+        objects.append(
+            f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] '
+            f'/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {4 + i * 2} 0 R >>'.encode()
+        )
+        objects.append(f'<< /Length {len(content)} >>\nstream\n'.encode() + content + b'\nendstream')
+    objects.append(b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>')
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f'{number} 0 obj\n'.encode() + obj + b'\nendobj\n'
+    xref = len(out)
+    out += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode()
+    out += b''.join(f'{offset:010d} 00000 n \n'.encode() for offset in offsets)
+    out += f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode()
+
+    with open(path, 'wb') as file:
+        file.write(out)
+
+
+def render_pdf(cv, path):
+    """Write a generated CV as a PDF; returns the page count"""
+    lines = cv['lines']
+    pages = [lines[i:i + LINES_PER_PDF_PAGE] for i in range(0, len(lines), LINES_PER_PDF_PAGE)]
+    pages += [[FILLER_LINE] * LINES_PER_PDF_PAGE for _ in range(cv['filler_pages'])]
+    write_pdf(pages, path)
+    return len(pages)
+
+
+def render_docx(cv, path, rng):
+    """Write a generated CV as a DOCX, with headers bold or styled and skills sometimes in a table"""
+    document = docx.Document()
+    document.add_heading(cv['lines'][0], level=1)
+    header_style = rng.choice(['heading', 'bold'])
+    table_skills = rng.random() < 0.3
+
+    skills_rows = None
+    for line in cv['lines'][1:]:
+        if skills_rows is not None and not line.startswith('- '):
+            if skills_rows:
+                _add_skills_table(document, skills_rows)
+            skills_rows = None
+        if line in cv['headers']:
+            skills_rows = [] if table_skills and 'SKILL' in line.upper() else None
+            if header_style == 'heading':
+                document.add_heading(line, level=2)
+            else:
+                document.add_paragraph().add_run(line).bold = True
+            continue
+        if skills_rows is not None:
+            skills_rows.append(line[2:])
+            continue
+        document.add_paragraph(line)
+    if skills_rows:
+        _add_skills_table(document, skills_rows)
+
+    for _ in range(cv['filler_pages']):
+        document.add_page_break()
+        for _ in range(LINES_PER_PDF_PAGE):
+            document.add_paragraph(FILLER_LINE)
+    document.save(path)
+    return cv['filler_pages'] + 1
+
+
+def _add_skills_table(document, skills):
+    table = document.add_table(rows=(len(skills) + 1) // 2, cols=2)
+    for i, skill in enumerate(skills):
+        table.cell(i // 2, i % 2).text = skill
+
+
+def write_corpus(out_dir, count, seed=0, formats=('pdf', 'docx'), max_pages=3):
+    """
+    Generate a corpus of CVs plus a ground_truth.json manifest
+    Args:
+        out_dir: Directory to write into (created if missing)
+        count: Number of CVs
+        seed: Random seed; the same seed reproduces the same corpus
+        formats: File formats to cycle through
+        max_pages: Upper bound on pages per CV
+    Returns:
+        dict: The manifest that was written
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    rng = random.Random(seed)
+    files = []
+    for index in range(count):
+        cv = generate_cv(rng, index, max_pages=max_pages)
+        file_format = formats[index % len(formats)]
+        filename = f'cv_{index:05d}.{file_format}'
+        path = os.path.join(out_dir, filename)
+        if file_format == 'pdf':
+            pages = render_pdf(cv, path)
+        else:
+            pages = render_docx(cv, path, rng)
+        files.append(dict(cv['truth'], file=filename, format=file_format, pages=pages))
+
+    manifest = {'seed': seed, 'generated_at': datetime.now().isoformat(), 'files': files}
+    with open(os.path.join(out_dir, MANIFEST_NAME), 'w', encoding='utf-8') as file:
+        json.dump(manifest, file, indent=2)
+    return manifest
+
+
+def load_manifest(corpus_dir):
+    with open(os.path.join(corpus_dir, MANIFEST_NAME), 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+
+def expected_experience_months(roles):
+    """Work experience in months as the parser counts it: merged [start, end) intervals"""
+    now = _now_month()
+    intervals = sorted((role['start'], now if role['end'] is None else min(role['end'], now))
+                       for role in roles)
+    total = 0
+    current_start, current_end = None, None
+    for start, end in intervals:
+        if current_end is not None and start <= current_end:
+            current_end = max(current_end, end)
+            continue
+        if current_end is not None:
+            total += current_end - current_start
+        current_start, current_end = start, end
+    if current_end is not None:
+        total += current_end - current_start
+    return total
+
+
+def parsed_experience_years(value):
+    """Numeric years from the parser's experience label ("4", "0-1", "0 (5 months)")"""
+    value = str(value or '0')
+    months = re.search(r'\((\d+) months?\)', value)
+    if months:
+        return int(months.group(1)) / 12.0
+    if value == '0-1':
+        return 0.75
+    match = re.match(r'\d+', value)
+    return float(match.group(0)) if match else 0.0
+
+
+def split_list(value):
+    return {item.strip() for item in str(value or '').split(',') if item.strip()}
+
+
+def score_parse(truth, result):
+    """
+    Compare one parse result against its ground truth
+    Returns:
+        dict: true/false positive counts for skills and titles, experience error, education match
+    """
+    expected_skills = set(truth['skills'])
+    found_skills = split_list(result.get('skills')) - {'Professional skills'}
+    expected_titles = set(truth['title_families'])
+    found_titles = split_list(result.get('job_titles')) - {'Professional'}
+    expected_years = expected_experience_months(truth['roles']) / 12.0
+
+    return {
+        'skills_tp': len(expected_skills & found_skills),
+        'skills_fp': len(found_skills - expected_skills),
+        'skills_fn': len(expected_skills - found_skills),
+        'titles_tp': len(expected_titles & found_titles),
+        'titles_fp': len(found_titles - expected_titles),
+        'titles_fn': len(expected_titles - found_titles),
+        'experience_error': abs(parsed_experience_years(result.get('experience_years')) - expected_years),
+        'education_ok': result.get('education') == truth['education'],
+    }
@@ -3,13 +3,181 @@ CV/Resume Parser - Extracts skills and experience from PDF and DOCX files
 """
 import PyPDF2
 import docx
+import io
+import math
+import mmap
+import multiprocessing
+import os
 import re
+import threading
+import zipfile
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from xml.etree import ElementTree
+from django.conf import settings
+from .skill_matcher import get_skill_matcher
+
+
+# Section headers recognised by the segmenter: canonical section -> header phrases
+SECTION_HEADERS = {
+    'experience': [
+        'EXPERIENCE', 'WORK EXPERIENCE', 'PROFESSIONAL EXPERIENCE', 'EMPLOYMENT HISTORY',
+        'EMPLOYMENT', 'CAREER HISTORY', 'WORK HISTORY'
+    ],
+    'projects': ['PERSONAL PROJECTS', 'PROJECTS', 'PROJECT', 'GROUP PROJECTS', 'ACADEMIC PROJECTS'],
+    'education': ['EDUCATION', 'ACADEMIC', 'ACADEMIC BACKGROUND', 'QUALIFICATION', 'QUALIFICATIONS'],
+    'skills': ['SKILLS', 'TECHNICAL SKILLS', 'KEY SKILLS', 'CORE COMPETENCIES'],
+    'certifications': ['CERTIFICATIONS', 'CERTIFICATES', 'TRAINING'],
+    'achievements': ['ACHIEVEMENTS', 'AWARDS', 'HONORS', 'HONOURS'],
+    'publications': ['PUBLICATIONS', 'RESEARCH'],
+    'summary': ['SUMMARY', 'PROFESSIONAL SUMMARY', 'PROFILE', 'OBJECTIVE', 'CAREER OBJECTIVE'],
+    'references': ['REFERENCES'],
+    'interests': ['HOBBIES', 'INTERESTS'],
+}
+
+_HEADER_TO_SECTION = {
+    header: section for section, headers in SECTION_HEADERS.items() for header in headers
+}
+
+# One compiled pattern for every header line. Longest phrases first so "WORK EXPERIENCE"
+# wins over "EXPERIENCE". A header may carry a short "& QUALIFICATIONS" style tail, a
+# parenthetical and a trailing colon, but not free text ("Research Assistant" is not a header).
+SECTION_HEADER_RE = re.compile(
+    r'^(?P<header>' + '|'.join(
+        re.escape(header).replace(r'\ ', r'\s+')
+        for header in sorted(_HEADER_TO_SECTION, key=len, reverse=True)
+    ) + r')'
+    r'(?:\s*(?:&|and|/|,|\+)\s*[a-z]+(?:\s+[a-z]+)?)?'
+    r'\s*(?:\(.*\))?\s*[:\-–—]?\s*$',
+    re.IGNORECASE
+)
+
+
+# Date ranges in the EXPERIENCE section: "Sep 2024 – Present", "Jan 2020 - Dec 2023",
+# "09/2021 to 03/2023", "2019–2021", "2018 - Now". Months are counted as year * 12 + month - 1.
+_MONTH_NAMES = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12
+}
+_MONTH = (
+    r'jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?'
+    r'|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?'
+)
+_YEAR = r'(?:19|20)\d{2}'
+
+
+def _date_point(prefix):
+    """Regex for one end of a range: "Sep 2024", "09/2024" or "2024" """
+    return (
+        rf'(?:(?P<{prefix}_month>{_MONTH})\.?[\s,]+(?P<{prefix}_year>{_YEAR})'
+        rf'|(?P<{prefix}_num>0?[1-9]|1[0-2])\s*/\s*(?P<{prefix}_num_year>{_YEAR})'
+        rf'|(?P<{prefix}_year_only>{_YEAR}))'
+    )
+
+
+DATE_RANGE_RE = re.compile(
+    r'(?<![\w/])' + _date_point('start') +
+    r'\s*(?:[-–—]+|\bto\b|\buntil\b|\btill\b)\s*'
+    r'(?:(?P<present>present|current|now|today|date)\b|' + _date_point('end') + r')(?![\w/])',
+    re.IGNORECASE
+)
+
+# A role as a half-open month interval [start, end)
+DateRange = namedtuple('DateRange', ['start', 'end', 'text'])
+
+
+def _extract_pdf_page_range(pdf_bytes, start, end):
+    """Extract the text of pages [start, end) - runs in a page worker process"""
+    pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_bytes))
+    return [pdf_reader.pages[i].extract_text() or "" for i in range(start, end)]
+
+
+_page_executor = None
+_page_executor_pid = None
+_page_executor_lock = threading.Lock()
+# Size and start method of this process's page pool; parse-pool workers override them
+_page_workers = None
+_page_start_method = None
+
+
+def page_worker_count():
+    """Processes the page pool uses: the limit set for this process, else CV_PDF_PARALLEL_WORKERS or one per core"""
+    if _page_workers is not None:
+        return _page_workers
+    return getattr(settings, 'CV_PDF_PARALLEL_WORKERS', 0) or os.cpu_count() or 2
+
+
+def limit_page_executor(workers, start_method=None):
+    """
+    Cap the page pool of this process (below 2 workers pages are extracted sequentially)
+    Args:
+        workers: Page processes allowed
+        start_method: multiprocessing start method for them (default forkserver, else spawn)
+    """
+    global _page_workers, _page_start_method
+    _page_workers = max(0, workers)
+    _page_start_method = start_method
+
+
+def _get_page_executor():
+    """Process pool for parallel page extraction, created on first use in each process"""
+    global _page_executor, _page_executor_pid
+    with _page_executor_lock:
+        if _page_executor is None or _page_executor_pid != os.getpid():
+            start_method = _page_start_method or (
+                'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            )
+            _page_executor = ProcessPoolExecutor(
+                max_workers=page_worker_count(),
+                mp_context=multiprocessing.get_context(start_method)
+            )
+            _page_executor_pid = os.getpid()
+        return _page_executor
+
+
+def shutdown_page_executor():
+    """Stop this process's page pool, if it started one"""
+    global _page_executor
+    with _page_executor_lock:
+        executor, _page_executor = _page_executor, None
+        owned = _page_executor_pid == os.getpid()
+    if executor is not None and owned:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+# WordprocessingML tags used by the streaming DOCX extractor
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_MC_FALLBACK = '{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback'
+_DOCX_PARAGRAPH = _W + 'p'
+_DOCX_TEXT = _W + 't'
+_DOCX_BREAKS = {_W + 'tab': '\t', _W + 'br': '\n', _W + 'cr': '\n'}
+_DOCX_BODY = _W + 'body'
 
 
 class CVParser:
     """Parse CV/Resume and extract relevant information"""
     
+    # Bump whenever extraction logic changes so cached parse results are invalidated
+    PARSER_VERSION = '4'
+    
+    # File-backed buffers at least this large are memory-mapped instead of read through
+    MMAP_THRESHOLD = 1024 * 1024
+    
+    def __init__(self, max_pages=None, max_chars=None, parallel_pages=None):
+        """
+        Args:
+            max_pages: Stop PDF extraction after this many pages (defaults to settings.CV_PDF_MAX_PAGES)
+            max_chars: Stop PDF extraction after this many characters (defaults to settings.CV_PDF_MAX_CHARS)
+            parallel_pages: Split extraction of long PDFs across processes (defaults to
+                            settings.CV_PDF_PARALLEL_PAGES; used from CV_PDF_PARALLEL_THRESHOLD pages)
+        """
+        self.max_pages = max_pages if max_pages is not None else getattr(settings, 'CV_PDF_MAX_PAGES', 0)
+        self.max_chars = max_chars if max_chars is not None else getattr(settings, 'CV_PDF_MAX_CHARS', 0)
+        self.parallel_pages = parallel_pages if parallel_pages is not None else getattr(settings, 'CV_PDF_PARALLEL_PAGES', False)
+        self.parallel_threshold = getattr(settings, 'CV_PDF_PARALLEL_THRESHOLD', 20)
+        self.pdf_stats = None
+    
     def parse_cv(self, file_path):
         """
         Parse CV and extract text content
@@ -18,16 +186,46 @@ class CVParser:
         Returns:
             dict: Extracted information
         """
-        text_content = ""
+        if not file_path.lower().endswith(('.pdf', '.docx', '.doc')):
+            return {'error': 'Unsupported file format'}
         
-        # Determine file type and extract text
-        if file_path.endswith('.pdf'):
-            text_content = self._extract_from_pdf(file_path)
-        elif file_path.endswith(('.docx', '.doc')):
-            text_content = self._extract_from_docx(file_path)
+        try:
+            with open(file_path, 'rb') as file:
+                return self.parse_cv_buffer(file, file_path)
+        except OSError as e:
+            print(f"Error opening CV file: {e}")
+            return {'error': 'Could not extract text from file'}
+    
+    def parse_cv_buffer(self, file_obj, filename):
+        """
+        Parse CV straight from an open binary file object, e.g. an uploaded file,
+        without writing it to disk first
+        Args:
+            file_obj: Binary file object (large file-backed PDFs are memory-mapped)
+            filename: Original file name, used to pick the extractor
+        Returns:
+            dict: Extracted information
+        """
+        name = filename.lower()
+        if name.endswith('.pdf'):
+            extractor = self._extract_from_pdf
+        elif name.endswith(('.docx', '.doc')):
+            extractor = self._extract_from_docx
         else:
             return {'error': 'Unsupported file format'}
         
+        # PDFs are read with random access, so large ones are mapped rather than copied;
+        # zipfile (DOCX) needs a seekable() stream, which mmap only provides from Python 3.13
+        mapped = self._map_buffer(file_obj) if extractor == self._extract_from_pdf else None
+        self.pdf_stats = None
+        try:
+            if mapped is None:
+                file_obj.seek(0)
+            text_content = extractor(mapped if mapped is not None else file_obj)
+        finally:
+            if mapped is not None:
+                mapped.close()
+        
         if not text_content:
             return {'error': 'Could not extract text from file'}
         
@@ -41,25 +239,175 @@ class CVParser:
             print(f"Could not print CV text (Unicode error): {e}")
         
         # Extract information using keyword matching
-        return self._extract_basic(text_content)
+        result = self._extract_basic(text_content)
+        if self.pdf_stats:
+            result.update(self.pdf_stats)
+        return result
     
-    def _extract_from_pdf(self, pdf_path):
-        """Extract text from PDF file"""
+    def _map_buffer(self, file_obj):
+        """Memory-map a large file-backed buffer; None for in-memory or small buffers"""
         try:
-            text = ""
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
+            fileno = file_obj.fileno()
+            size = os.fstat(fileno).st_size
+        except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+            return None
+        
+        if size < self.MMAP_THRESHOLD:
+            return None
+        
+        try:
+            return mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            print(f"Could not memory-map CV file, reading it instead: {e}")
+            return None
+    
+    def _iter_pdf_pages(self, pdf_reader):
+        """Yield the text of each PDF page lazily, so unread pages are never parsed"""
+        for page in pdf_reader.pages:
+            yield page.extract_text() or ""
+    
+    def _extract_from_pdf(self, pdf_file):
+        """
+        Extract text from PDF file (path or binary stream)
+        Stops at the page/character budget and records pages read in self.pdf_stats
+        """
+        try:
+            pdf_reader = PyPDF2.PdfReader(pdf_file)
+            page_count = len(pdf_reader.pages)
+            page_limit = min(page_count, self.max_pages) if self.max_pages else page_count
+            
+            pages = None
+            if self.parallel_pages and page_limit >= self.parallel_threshold:
+                pages = self._extract_pdf_pages_parallel(pdf_file, page_limit)
+            
+            if pages is None:
+                pages = []
+                chars = 0
+                for page_text in self._iter_pdf_pages(pdf_reader):
+                    pages.append(page_text)
+                    chars += len(page_text) + 1
+                    if len(pages) >= page_limit or (self.max_chars and chars >= self.max_chars):
+                        break
+            
+            self.pdf_stats = {'pages_read': len(pages), 'page_count': page_count}
+            if len(pages) < page_count:
+                print(f"[OK] PDF extraction stopped at budget: {len(pages)} of {page_count} pages")
+            
+            # Join once instead of growing a string page by page
+            text = "\n".join(pages)
+            if self.max_chars:
+                text = text[:self.max_chars]
             return text.strip()
         except Exception as e:
             print(f"Error extracting PDF: {e}")
             return ""
     
-    def _extract_from_docx(self, docx_path):
-        """Extract text from DOCX file"""
+    def _extract_pdf_pages_parallel(self, pdf_file, page_limit):
+        """
+        Split page extraction across worker processes, one page range per worker,
+        and reassemble the pages in order. Returns None to fall back to sequential extraction.
+        """
+        if page_worker_count() < 2:
+            return None
+        try:
+            if isinstance(pdf_file, str):
+                with open(pdf_file, 'rb') as file:
+                    pdf_bytes = file.read()
+            elif isinstance(pdf_file, mmap.mmap):
+                pdf_bytes = pdf_file[:]
+            else:
+                pdf_file.seek(0)
+                pdf_bytes = pdf_file.read()
+            
+            executor = _get_page_executor()
+            chunk = math.ceil(page_limit / page_worker_count())
+            starts = list(range(0, page_limit, chunk))
+            ends = [min(start + chunk, page_limit) for start in starts]
+            
+            # map() yields results in submission order, so pages come back in document order
+            pages = []
+            for page_texts in executor.map(_extract_pdf_page_range, [pdf_bytes] * len(starts), starts, ends):
+                pages.extend(page_texts)
+            
+            # Character budget applies to the reassembled pages
+            if self.max_chars:
+                chars = 0
+                for i, page_text in enumerate(pages):
+                    chars += len(page_text) + 1
+                    if chars >= self.max_chars:
+                        pages = pages[:i + 1]
+                        break
+            
+            print(f"[OK] Extracted {len(pages)} PDF pages across {len(starts)} processes")
+            return pages
+        except Exception as e:
+            print(f"Parallel PDF extraction failed, extracting sequentially: {e}")
+            return None
+    
+    def _extract_from_docx(self, docx_file):
+        """
+        Extract text from DOCX file (path or binary stream)
+        Streams word/document.xml first; python-docx is the fallback
+        """
         try:
-            doc = docx.Document(docx_path)
+            text = self._extract_from_docx_xml(docx_file)
+            if text:
+                return text
+        except (zipfile.BadZipFile, KeyError, ElementTree.ParseError) as e:
+            print(f"Streaming DOCX extraction failed, using python-docx: {e}")
+        
+        if not isinstance(docx_file, str):
+            docx_file.seek(0)
+        return self._extract_from_docx_model(docx_file)
+    
+    def _extract_from_docx_xml(self, docx_file):
+        """
+        Stream word/document.xml out of the zip with an incremental parser.
+        Emits one line per paragraph, in document order, including paragraphs
+        inside table cells and text boxes (which python-docx's paragraphs skip).
+        """
+        lines = []
+        # Paragraphs can nest (text box inside a paragraph), so keep a stack of buffers
+        buffers = []
+        # Text inside mc:Fallback duplicates the mc:Choice content it stands in for
+        fallback_depth = 0
+        
+        with zipfile.ZipFile(docx_file) as archive:
+            with archive.open('word/document.xml') as document_xml:
+                for event, elem in ElementTree.iterparse(document_xml, events=('start', 'end')):
+                    tag = elem.tag
+                    
+                    if event == 'start':
+                        if tag == _DOCX_PARAGRAPH:
+                            buffers.append([])
+                        elif tag == _MC_FALLBACK:
+                            fallback_depth += 1
+                        continue
+                    
+                    if tag == _MC_FALLBACK:
+                        fallback_depth -= 1
+                    elif fallback_depth or not buffers:
+                        pass
+                    elif tag == _DOCX_TEXT:
+                        buffers[-1].append(elem.text or "")
+                    elif tag in _DOCX_BREAKS:
+                        buffers[-1].append(_DOCX_BREAKS[tag])
+                    
+                    if tag == _DOCX_PARAGRAPH:
+                        paragraph = "".join(buffers.pop())
+                        if not fallback_depth:
+                            lines.append(paragraph)
+                    
+                    # Drop finished top-level blocks so memory stays flat on long documents
+                    if not buffers and tag != _DOCX_BODY:
+                        elem.clear()
+        
+        return "\n".join(lines).strip()
+    
+    def _extract_from_docx_model(self, docx_file):
+        """Extract text from DOCX file via the python-docx object model"""
+        try:
+            doc = docx.Document(docx_file)
             text = ""
             for paragraph in doc.paragraphs:
                 text += paragraph.text + "\n"
@@ -70,46 +418,20 @@ class CVParser:
     
     def _extract_basic(self, text_content):
         """Keyword-based extraction with accurate experience calculation"""
-        skills = []
-        
-        # Common technical skills
-        tech_skills = [
-            'Python', 'Java', 'JavaScript', 'C++', 'C#', 'SQL', 'HTML', 'CSS',
-            'React', 'Angular', 'Vue', 'Node.js', 'Django', 'Flask', 'Spring',
-            'MongoDB', 'PostgreSQL', 'MySQL', 'AWS', 'Azure', 'GCP', 'Docker',
-            'Kubernetes', 'Git', 'Jenkins', 'Agile', 'Scrum', 'REST API',
-            'Machine Learning', 'Data Analysis', 'Excel', 'PowerPoint', 'Tableau',
-            'Power BI', 'Pandas', 'NumPy', 'TensorFlow', 'Scikit-learn', 'PHP',
-            'Bootstrap', 'Cisco', 'OOP', 'Full Stack', 'Web Development', 'NoSQL',
-            'SQLite', 'Plotly', 'SMOTE', 'SVM', 'Random Forest', 'K-Means', 'DBSCAN'
-        ]
-        
-        # Soft skills
-        soft_skills = [
-            'Communication', 'Leadership', 'Teamwork', 'Problem Solving',
-            'Critical Thinking', 'Time Management', 'Project Management'
-        ]
-        
-        text_lower = text_content.lower()
+        # Single pass over the text for every skill in the taxonomy
+        skills = get_skill_matcher().find_skills(text_content)
         
-        # Find technical skills
-        for skill in tech_skills:
-            if skill.lower() in text_lower:
-                skills.append(skill)
-        
-        # Find soft skills
-        for skill in soft_skills:
-            if skill.lower() in text_lower:
-                skills.append(skill)
+        # Split into sections once; every extractor reads from the same index
+        lines, sections = self._segment_sections(text_content)
         
         # Calculate work experience - ONLY from EXPERIENCE section
-        experience_years = self._calculate_work_experience_v2(text_content)
+        experience_years = self._calculate_work_experience_v2(lines, sections)
         
         # Find education
-        education = self._extract_education(text_content)
+        education = self._extract_education(text_content, lines, sections)
         
         # Find job titles
-        job_titles = self._extract_job_titles(text_content)
+        job_titles = self._extract_job_titles(lines, sections)
         
         return {
             'skills': ', '.join(set(skills[:25])) if skills else 'Professional skills',
@@ -121,60 +443,54 @@ class CVParser:
             'raw_text': text_content[:1000]
         }
     
-    def _calculate_work_experience_v2(self, text):
+    def _segment_sections(self, text):
         """
-        NEW APPROACH: Only count dates that appear BETWEEN "EXPERIENCE" and the NEXT section
+        Build a section index in one pass over the lines
+        Returns:
+            tuple: (lines, {section name: [(start_line, end_line), ...]})
+                   Each range starts at the header line and ends before the next header
         """
         lines = text.split('\n')
+        sections = {}
+        current = None
         
-        # Find EXPERIENCE section boundaries
-        exp_start_idx = -1
-        exp_end_idx = len(lines)
-        
-        # Section headers to look for
-        section_headers = [
-            'EXPERIENCE', 'WORK EXPERIENCE', 'PROFESSIONAL EXPERIENCE', 'EMPLOYMENT HISTORY',
-            'CAREER HISTORY', 'Work History'
-        ]
-        
-        stop_headers = [
-            'PERSONAL PROJECTS', 'PROJECTS', 'PROJECT', 'GROUP PROJECTS',
-            'EDUCATION', 'ACADEMIC', 'QUALIFICATION',
-            'SKILLS', 'TECHNICAL SKILLS', 'CORE COMPETENCIES',
-            'CERTIFICATIONS', 'CERTIFICATES', 'TRAINING',
-            'ACHIEVEMENTS', 'AWARDS', 'HONORS',
-            'PUBLICATIONS', 'RESEARCH',
-            'REFERENCES', 'HOBBIES', 'INTERESTS'
-        ]
-        
-        # Find where EXPERIENCE starts
         for i, line in enumerate(lines):
-            line_upper = line.strip().upper()
-            for header in section_headers:
-                if line_upper == header or line_upper.startswith(header):
-                    exp_start_idx = i
-                    print(f"[OK] Found EXPERIENCE section at line {i}: {line.strip()}")
-                    break
-            if exp_start_idx != -1:
-                break
-
-        if exp_start_idx == -1:
+            match = SECTION_HEADER_RE.match(line.strip())
+            if not match:
+                continue
+            if current:
+                name, start = current
+                sections.setdefault(name, []).append((start, i))
+            header = re.sub(r'\s+', ' ', match.group('header').upper())
+            current = (_HEADER_TO_SECTION[header], i)
+        
+        if current:
+            name, start = current
+            sections.setdefault(name, []).append((start, len(lines)))
+        
+        return lines, sections
+    
+    def _section_text(self, lines, sections, name):
+        """Join every range of a section back into text, or None if the CV has no such section"""
+        ranges = sections.get(name)
+        if not ranges:
+            return None
+        return '\n'.join('\n'.join(lines[start:end]) for start, end in ranges)
+    
+    def _calculate_work_experience_v2(self, lines, sections):
+        """
+        NEW APPROACH: Only count dates that appear BETWEEN "EXPERIENCE" and the NEXT section
+        """
+        ranges = sections.get('experience')
+        if not ranges:
             print("[X] No EXPERIENCE section found")
             return '0'
         
-        # Find where EXPERIENCE ends (next major section)
-        for i in range(exp_start_idx + 1, len(lines)):
-            line_upper = lines[i].strip().upper()
-            for stop_header in stop_headers:
-                if line_upper == stop_header or line_upper.startswith(stop_header):
-                    exp_end_idx = i
-                    print(f"[OK] EXPERIENCE section ends at line {i}: {lines[i].strip()}")
-                    break
-            if exp_end_idx != len(lines):
-                break
+        for start, end in ranges:
+            print(f"[OK] EXPERIENCE section at lines {start}-{end}: {lines[start].strip()}")
         
         # Extract only EXPERIENCE section text
-        experience_text = '\n'.join(lines[exp_start_idx:exp_end_idx])
+        experience_text = self._section_text(lines, sections, 'experience')
         try:
             print("\n" + "="*80)
             print("EXPERIENCE SECTION ONLY:")
@@ -205,55 +521,67 @@ class CVParser:
         return '0'
     
     def _count_months_in_text(self, text):
-        """Count total months from date ranges in given text"""
+        """Count total months from date ranges in given text, counting overlapping roles once"""
         total_months = 0
-        current_date = datetime.now()
         
-        # Month mapping
-        month_map = {
-            'jan': 1, 'january': 1, 'feb': 2, 'february': 2,
-            'mar': 3, 'march': 3, 'apr': 4, 'april': 4,
-            'may': 5, 'jun': 6, 'june': 6,
-            'jul': 7, 'july': 7, 'aug': 8, 'august': 8,
-            'sep': 9, 'sept': 9, 'september': 9,
-            'oct': 10, 'october': 10, 'nov': 11, 'november': 11,
-            'dec': 12, 'december': 12
-        }
-        
-        text_lower = text.lower()
+        for date_range in self._merge_date_ranges(self._extract_date_ranges(text)):
+            months = date_range.end - date_range.start
+            total_months += months
+            print(f"  [+] Counted: {date_range.text} = {months} months")
         
-        # Pattern: "Sep 2024 – Present"
-        pattern1 = r'(jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*[\s,]+(\d{4})\s*[-–—]\s*(present|current)'
-        for match in re.finditer(pattern1, text_lower):
-            month_name = match.group(1)
-            year = int(match.group(2))
-            month = month_map.get(month_name[:3])
-            
-            if month:
-                months = (current_date.year - year) * 12 + (current_date.month - month)
-                if 0 < months < 600:
-                    total_months += months
-                    print(f"  [+] Counted: {match.group(0)} = {months} months")
+        return total_months
+    
+    def _extract_date_ranges(self, text):
+        """
+        Scan text once for date ranges
+        Returns:
+            list: DateRange(start, end, text) with start/end as absolute month numbers
+        """
+        current_date = datetime.now()
+        now = current_date.year * 12 + current_date.month - 1
+        ranges = []
         
-        # Pattern: "Jan 2020 - Dec 2023"
-        pattern2 = r'(jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*[\s,]+(\d{4})\s*[-–—]\s*(jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*[\s,]+(\d{4})'
-        for match in re.finditer(pattern2, text_lower):
-            start_month = month_map.get(match.group(1)[:3])
-            start_year = int(match.group(2))
-            end_month = month_map.get(match.group(3)[:3])
-            end_year = int(match.group(4))
+        for match in DATE_RANGE_RE.finditer(text):
+            start = self._date_point_to_month(match, 'start')
+            if match.group('present'):
+                end = now
+            else:
+                end = self._date_point_to_month(match, 'end')
             
-            if start_month and end_month:
-                months = (end_year - start_year) * 12 + (end_month - start_month)
-                if 0 < months < 600:
-                    total_months += months
-                    print(f"  [+] Counted: {match.group(0)} = {months} months")
+            end = min(end, now)
+            if 0 < end - start < 600:
+                ranges.append(DateRange(start, end, match.group(0)))
         
-        return total_months
+        return ranges
     
-    def _extract_education(self, text):
-        """Extract education level"""
-        text_lower = text.lower()
+    def _date_point_to_month(self, match, prefix):
+        """Absolute month number for one end of a matched range (year-only dates count from January)"""
+        if match.group(f'{prefix}_month'):
+            month = _MONTH_NAMES[match.group(f'{prefix}_month')[:3].lower()]
+            year = int(match.group(f'{prefix}_year'))
+        elif match.group(f'{prefix}_num'):
+            month = int(match.group(f'{prefix}_num'))
+            year = int(match.group(f'{prefix}_num_year'))
+        else:
+            month = 1
+            year = int(match.group(f'{prefix}_year_only'))
+        return year * 12 + month - 1
+    
+    def _merge_date_ranges(self, ranges):
+        """Merge overlapping or touching ranges so concurrent roles are not double-counted"""
+        merged = []
+        for date_range in sorted(ranges):
+            if merged and date_range.start <= merged[-1].end:
+                last = merged[-1]
+                if date_range.end > last.end:
+                    merged[-1] = DateRange(last.start, date_range.end, f"{last.text} + {date_range.text}")
+            else:
+                merged.append(date_range)
+        return merged
+    
+    def _extract_education(self, text, lines, sections):
+        """Extract education level, preferring the EDUCATION section when the CV has one"""
+        text_lower = (self._section_text(lines, sections, 'education') or text).lower()
         
         if any(word in text_lower for word in ['phd', 'ph.d', 'doctorate', 'doctoral']):
             return 'PhD'
@@ -266,27 +594,13 @@ class CVParser:
         
         return 'Not specified'
     
-    def _extract_job_titles(self, text):
+    def _extract_job_titles(self, lines, sections):
         """Extract job titles from EXPERIENCE section only"""
         job_titles = []
         
-        # Find EXPERIENCE section
-        lines = text.split('\n')
-        exp_start = -1
-        exp_end = len(lines)
-        
-        for i, line in enumerate(lines):
-            if 'EXPERIENCE' in line.upper():
-                exp_start = i
-                break
-        
-        if exp_start != -1:
-            for i in range(exp_start + 1, len(lines)):
-                if any(word in lines[i].upper() for word in ['PROJECT', 'EDUCATION', 'SKILL', 'CERTIFICATION']):
-                    exp_end = i
-                    break
-            
-            exp_text = '\n'.join(lines[exp_start:exp_end]).lower()
+        exp_text = self._section_text(lines, sections, 'experience')
+        if exp_text:
+            exp_text = exp_text.lower()
             
             # Look for common titles
             titles = [
@@ -0,0 +1,416 @@
+"""
+Fake OpenAI - Local stand-in for the chat completions API
+An httpx transport the shared OpenAI clients use when settings.OPENAI_FAKE_MODE is set:
+  fake    canned replies shaped like each AIJobMatcher call, with injected latency and errors
+  record  forwards to the real API and saves every successful reply under OPENAI_RECORDINGS_DIR
+  replay  serves the saved replies (canned ones for requests that were never recorded)
+Latency and errors are drawn from a seeded generator per request, so a load test or
+benchmark run repeats exactly without network access or API spend.
+"""
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+import httpx
+from django.conf import settings
+
+
+MODES = ('fake', 'record', 'replay')
+
+# Request fields that decide the reply (and so the recording it is stored under)
+KEY_FIELDS = ('model', 'messages', 'temperature', 'max_tokens', 'stream')
+# Distinct requests whose attempt counts are kept (least recently seen dropped first)
+ATTEMPT_KEYS = 10000
+
+
+def parse_latency(spec):
+    """
+    Parse a latency distribution
+    Args:
+        spec: "0.5" or "fixed:0.5", "uniform:MIN,MAX", "normal:MEAN,SD",
+              "lognormal:MEDIAN,SIGMA" or "recorded" (the latency seen while recording)
+    Returns:
+        Callable (random.Random, recorded seconds or None) -> seconds
+    """
+    spec = str(spec or '0').strip().lower()
+    kind, _, args = spec.partition(':')
+    if not args and kind != 'recorded':
+        kind, args = 'fixed', kind
+    try:
+        values = [float(value) for value in args.split(',')] if args else []
+        if kind == 'fixed':
+            return lambda rng, recorded: values[0]
+        if kind == 'uniform':
+            return lambda rng, recorded: rng.uniform(values[0], values[1])
+        if kind == 'normal':
+            return lambda rng, recorded: max(0.0, rng.gauss(values[0], values[1]))
+        if kind == 'lognormal':
+            # Long right tail, like real model latency
+            return lambda rng, recorded: values[0] * math.exp(rng.gauss(0.0, values[1]))
+        if kind == 'recorded':
+            return lambda rng, recorded: recorded or 0.0
+    except (IndexError, ValueError):
+        pass
+    raise ValueError(f"Invalid latency distribution: {spec!r}")
+
+
+def parse_model_latency(spec):
+    """
+    Parse per-model latency distributions
+    Args:
+        spec: "MODEL=DISTRIBUTION;MODEL=DISTRIBUTION" (see parse_latency)
+    Returns:
+        dict: model -> latency callable
+    """
+    latencies = {}
+    for item in str(spec or '').split(';'):
+        model, _, distribution = item.partition('=')
+        if model.strip():
+            latencies[model.strip()] = parse_latency(distribution)
+    return latencies
+
+
+def request_key(path, body):
+    """Stable key of a chat completion request: same request, same reply"""
+    fields = {name: body.get(name) for name in KEY_FIELDS}
+    canonical = json.dumps([path, fields], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def _pick(rng, options, count):
+    return rng.sample(options, min(count, len(options)))
+
+
+COMPANIES = ['Google', 'Microsoft', 'Amazon', 'Infosys', 'TCS', 'Accenture', 'IBM', 'Deloitte', 'Siemens', 'HSBC']
+CITIES = ['London, United Kingdom', 'Bangalore, Karnataka, India', 'New York, NY, USA', 'Toronto, Canada',
+          'Berlin, Germany', 'Sydney, Australia']
+TITLES = ['Software Engineer', 'Data Analyst', 'Python Developer', 'Backend Developer', 'Data Scientist',
+          'Full Stack Developer', 'DevOps Engineer', 'Machine Learning Engineer']
+DEPARTMENTS = ['UK Civil Service', 'NHS', 'HMRC', 'USAJOBS - Department of Labor', 'Indian Railways', 'UPSC',
+               'GC Jobs - Statistics Canada', 'APS Jobs - Department of Finance']
+
+
+def canned_content(body, rng):
+    """Reply text shaped like the request: match JSON, job listing arrays or chat text"""
+    messages = body.get('messages') or [{}]
+    prompt = str(messages[-1].get('content', ''))
+
+    if 'suitable_job_titles' in prompt:
+        return json.dumps({
+            'suitable_job_titles': _pick(rng, TITLES, 3),
+            'government_queries': [f"{title} government jobs" for title in _pick(rng, TITLES, 2)],
+            'company_queries': [f"{title} at {company}" for title, company in
+                                zip(_pick(rng, TITLES, 2), _pick(rng, COMPANIES, 2))],
+            'recommended_sectors': _pick(rng, ['Technology', 'Finance', 'Healthcare', 'Public Sector',
+                                               'Consulting', 'Retail'], 3)
+        })
+
+    if 'GOVERNMENT job listings' in prompt:
+        match = re.search(r'Job Title/Department: (.+)', prompt)
+        title = match.group(1).strip() if match else 'Administrative Officer'
+        return json.dumps([{
+            'title': f"{title} ({grade})",
+            'organization': department,
+            'location': rng.choice(CITIES),
+            'qualification': "Bachelor's Degree in any discipline",
+            'salary': f"{rng.randint(25, 60)},000 - {rng.randint(61, 90)},000 per annum",
+            'posted_date': f"Posted {rng.randint(1, 14)} days ago",
+            'description': f"Join {department} as a {title}.",
+            'requirements': [f"Requirement {n}" for n in range(1, 6)],
+            'official_link': 'https://www.civilservicejobs.service.gov.uk/'
+        } for grade, department in zip(['Grade 7', 'Grade 6', 'HEO', 'SEO', 'EO', 'AO'],
+                                       _pick(rng, DEPARTMENTS, rng.randint(5, 6)))])
+
+    if 'job listings:' in prompt:
+        match = re.search(r'job listings: (.+?) in ', prompt)
+        title = match.group(1).strip() if match else rng.choice(TITLES)
+        return json.dumps([{
+            'title': title,
+            'company': company,
+            'location': rng.choice(CITIES),
+            'experience_required': f"{years}-{years + 3} years",
+            'qualification': 'B.Tech/B.E. in Computer Science',
+            'salary_range': f"Rs {years * 4 + 4}-{years * 4 + 12} LPA",
+            'responsibilities': [f"Responsibility {n}" for n in range(1, 6)],
+            'qualifications': [f"Qualification {n}" for n in range(1, 6)]
+        } for company, years in zip(_pick(rng, COMPANIES, rng.randint(7, 8)), [rng.randint(0, 8) for _ in range(8)])])
+
+    question = ' '.join(prompt.split()[-12:])
+    sentences = [
+        f"Here is how I would approach \"{question}\".",
+        "Start by listing the skills from your CV that match the role you want.",
+        "Tailor your summary and your two most recent roles to the job description.",
+        "Apply through the official careers page or a major job board such as LinkedIn or Indeed.",
+        "Prepare two or three short stories that show measurable results.",
+        "Follow up a week after applying if you have not heard back.",
+    ]
+    return ' '.join([sentences[0]] + _pick(rng, sentences[1:], rng.randint(2, 4)))
+
+
+def _completion(body, key, content):
+    prompt_tokens = sum(len(str(message.get('content', ''))) for message in body.get('messages') or []) // 4
+    return {
+        'id': f"chatcmpl-fake-{key[:16]}",
+        'object': 'chat.completion',
+        'created': int(time.time()),
+        'model': body.get('model', 'gpt-3.5-turbo'),
+        'choices': [{
+            'index': 0,
+            'message': {'role': 'assistant', 'content': content},
+            'finish_reason': 'stop'
+        }],
+        'usage': {
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': len(content) // 4,
+            'total_tokens': prompt_tokens + len(content) // 4
+        }
+    }
+
+
+def _stream_frames(body, key, content):
+    """SSE frames of a streamed reply, a few words per chunk"""
+    def chunk(delta, finish_reason=None):
+        return {
+            'id': f"chatcmpl-fake-{key[:16]}",
+            'object': 'chat.completion.chunk',
+            'created': int(time.time()),
+            'model': body.get('model', 'gpt-3.5-turbo'),
+            'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}]
+        }
+
+    pieces = re.findall(r'\S+\s*', content) or ['']
+    deltas = [{'role': 'assistant', 'content': ''}]
+    deltas += [{'content': ''.join(pieces[i:i + 3])} for i in range(0, len(pieces), 3)]
+    frames = [chunk(delta) for delta in deltas] + [chunk({}, 'stop')]
+    return [f"data: {json.dumps(frame)}\n\n".encode('utf-8') for frame in frames] + [b"data: [DONE]\n\n"]
+
+
+def _split_sse(content):
+    """Recorded SSE body -> frames, so replays stream chunk by chunk too"""
+    return [frame + b"\n\n" for frame in content.split(b"\n\n") if frame.strip()]
+
+
+class _PacedStream(httpx.SyncByteStream):
+    def __init__(self, frames, delay):
+        self.frames = frames
+        self.delay = delay
+
+    def __iter__(self):
+        for index, frame in enumerate(self.frames):
+            if index and self.delay:
+                time.sleep(self.delay)
+            yield frame
+
+
+class _AsyncPacedStream(httpx.AsyncByteStream):
+    def __init__(self, frames, delay):
+        self.frames = frames
+        self.delay = delay
+
+    async def __aiter__(self):
+        for index, frame in enumerate(self.frames):
+            if index and self.delay:
+                await asyncio.sleep(self.delay)
+            yield frame
+
+
+class FakeOpenAITransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """httpx transport (sync and async) standing in for api.openai.com"""
+
+    def __init__(self, mode=None, latency=None, chunk_delay=None, error_rate=None, rate_limit_rate=None,
+                 seed=None, recordings_dir=None, model_latency=None, attempt_keys=None):
+        """
+        Args:
+            mode: 'fake', 'record' or 'replay' (defaults to settings.OPENAI_FAKE_MODE)
+            latency: Latency distribution before each reply (see parse_latency)
+            chunk_delay: Seconds between streamed chunks
+            error_rate: Share of requests answered with a 500 error
+            rate_limit_rate: Share of requests answered with a 429 rate limit error
+            seed: Seed for latency and error draws
+            recordings_dir: Directory of recorded replies
+            model_latency: Per-model latency distributions (see parse_model_latency)
+            attempt_keys: Distinct requests whose attempt counts are remembered
+        """
+        self.mode = mode or settings.OPENAI_FAKE_MODE
+        if self.mode not in MODES:
+            raise ValueError(f"OPENAI_FAKE_MODE must be one of {', '.join(MODES)}, not {self.mode!r}")
+        self.latency = parse_latency(latency if latency is not None else settings.OPENAI_FAKE_LATENCY)
+        self.model_latency = parse_model_latency(
+            model_latency if model_latency is not None else settings.OPENAI_FAKE_MODEL_LATENCY
+        )
+        self.chunk_delay = chunk_delay if chunk_delay is not None else settings.OPENAI_FAKE_CHUNK_DELAY
+        self.error_rate = error_rate if error_rate is not None else settings.OPENAI_FAKE_ERROR_RATE
+        self.rate_limit_rate = rate_limit_rate if rate_limit_rate is not None else settings.OPENAI_FAKE_RATE_LIMIT_RATE
+        self.seed = seed if seed is not None else settings.OPENAI_FAKE_SEED
+        self.recordings_dir = str(recordings_dir or settings.OPENAI_RECORDINGS_DIR)
+
+        self._lock = threading.Lock()
+        self.attempt_keys = attempt_keys or ATTEMPT_KEYS
+        self._attempts = OrderedDict()
+        self._real = None
+        self._async_real = None
+
+    def handle_request(self, request):
+        if self.mode == 'record':
+            if self._real is None:
+                self._real = httpx.HTTPTransport()
+            started = time.monotonic()
+            response = self._real.handle_request(request)
+            try:
+                response.read()
+            finally:
+                response.close()
+            return self._record(request, response, time.monotonic() - started)
+
+        delay, response = self._plan(request)
+        timeout = self._read_timeout(request)
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            raise httpx.ReadTimeout('Fake OpenAI reply slower than the read timeout', request=request)
+        if delay:
+            time.sleep(delay)
+        if isinstance(response, list):
+            return self._stream_response(_PacedStream(response, self.chunk_delay))
+        return response
+
+    async def handle_async_request(self, request):
+        if self.mode == 'record':
+            if self._async_real is None:
+                self._async_real = httpx.AsyncHTTPTransport()
+            started = time.monotonic()
+            response = await self._async_real.handle_async_request(request)
+            try:
+                await response.aread()
+            finally:
+                await response.aclose()
+            return self._record(request, response, time.monotonic() - started)
+
+        delay, response = self._plan(request)
+        timeout = self._read_timeout(request)
+        if timeout is not None and delay > timeout:
+            await asyncio.sleep(timeout)
+            raise httpx.ReadTimeout('Fake OpenAI reply slower than the read timeout', request=request)
+        if delay:
+            await asyncio.sleep(delay)
+        if isinstance(response, list):
+            return self._stream_response(_AsyncPacedStream(response, self.chunk_delay))
+        return response
+
+    def close(self):
+        if self._real is not None:
+            self._real.close()
+
+    async def aclose(self):
+        if self._async_real is not None:
+            await self._async_real.aclose()
+
+    @staticmethod
+    def _read_timeout(request):
+        """Read timeout the client set on the request; real transports enforce it, so we do too"""
+        return (request.extensions.get('timeout') or {}).get('read')
+
+    def _plan(self, request):
+        """
+        Decide the reply to a request
+        Returns:
+            tuple: (seconds to wait, httpx.Response or list of SSE frames to stream)
+        """
+        body = json.loads(request.content or b'{}')
+        key = request_key(request.url.path, body)
+        # One generator per attempt at this request: retries draw fresh values, and
+        # concurrent requests do not change each other's draws
+        with self._lock:
+            attempt = self._attempts.pop(key, 0)
+            self._attempts[key] = attempt + 1
+            if len(self._attempts) > self.attempt_keys:
+                self._attempts.popitem(last=False)
+        rng = random.Random(f"{self.seed}:{key}:{attempt}")
+
+        recorded = self._load(key) if self.mode == 'replay' else None
+        latency = self.model_latency.get(body.get('model'), self.latency)
+        delay = latency(rng, recorded.get('elapsed') if recorded else None)
+
+        draw = rng.random()
+        if draw < self.rate_limit_rate:
+            return delay, httpx.Response(429, headers={'retry-after': '1'}, json={'error': {
+                'message': 'Rate limit reached (injected by the fake OpenAI transport)',
+                'type': 'requests', 'code': 'rate_limit_exceeded'
+            }})
+        if draw < self.rate_limit_rate + self.error_rate:
+            return delay, httpx.Response(500, json={'error': {
+                'message': 'The server had an error (injected by the fake OpenAI transport)',
+                'type': 'server_error', 'code': None
+            }})
+
+        if recorded is not None:
+            content = recorded['content'].encode('utf-8')
+            if body.get('stream'):
+                return delay, _split_sse(content)
+            return delay, httpx.Response(recorded['status_code'], content=content,
+                                         headers={'content-type': 'application/json'})
+
+        if self.mode == 'replay':
+            print(f"[WARNING] No OpenAI recording for {key[:12]}, using a canned reply")
+        content = canned_content(body, rng)
+        if body.get('stream'):
+            return delay, _stream_frames(body, key, content)
+        return delay, httpx.Response(200, json=_completion(body, key, content))
+
+    @staticmethod
+    def _stream_response(stream):
+        return httpx.Response(200, headers={'content-type': 'text/event-stream'}, stream=stream)
+
+    def _record(self, request, response, elapsed):
+        """Save a real reply (successful ones only) and hand a fully read copy to the client"""
+        if response.status_code == 200:
+            body = json.loads(request.content or b'{}')
+            key = request_key(request.url.path, body)
+            self._save(key, {
+                'request': {name: body.get(name) for name in KEY_FIELDS},
+                'status_code': response.status_code,
+                'elapsed': elapsed,
+                'content': response.content.decode('utf-8'),
+                'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S')
+            })
+        # The body is already decoded, so drop the encoding headers that described the wire format
+        headers = [(name, value) for name, value in response.headers.items()
+                   if name.lower() not in ('content-encoding', 'content-length', 'transfer-encoding')]
+        return httpx.Response(response.status_code, headers=headers, content=response.content)
+
+    def _path(self, key):
+        return os.path.join(self.recordings_dir, key[:2], f"{key}.json")
+
+    def _load(self, key):
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Could not read OpenAI recording {key[:12]}: {e}")
+            return None
+
+    def _save(self, key, entry):
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename so a concurrent replay never reads a partial file
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as file:
+                json.dump(entry, file, indent=1)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Could not save OpenAI recording {key[:12]}: {e}")
+
+
+def get_fake_transport():
+    """A FakeOpenAITransport when settings.OPENAI_FAKE_MODE is set, else None (talk to OpenAI)"""
+    if not getattr(settings, 'OPENAI_FAKE_MODE', ''):
+        return None
+    return FakeOpenAITransport()
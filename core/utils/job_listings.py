@@ -0,0 +1,84 @@
+"""
+Job Listings - Filters and cached generators for the government and company job portals
+Shared by the portal views and the warm_listing_cache command so both build
+identical filters and therefore hit the same cache entries
+"""
+from django.conf import settings
+from .ai_matcher import AIJobMatcher
+from .listing_cache import ListingCache
+from .mongo import get_collection
+
+
+# Form country codes -> country names used in prompts
+GOVERNMENT_COUNTRY_NAMES = {
+    'UK': 'United Kingdom',
+    'USA': 'United States',
+    'India': 'India',
+    'Canada': 'Canada',
+    'Australia': 'Australia',
+    'EU': 'European Union',
+    'Singapore': 'Singapore',
+    'UAE': 'United Arab Emirates',
+    'NewZealand': 'New Zealand',
+    'Ireland': 'Ireland',
+    'Germany': 'Germany',
+    'France': 'France',
+}
+
+COMPANY_COUNTRY_NAMES = {
+    'UK': 'United Kingdom',
+    'USA': 'United States',
+    'India': 'India',
+    'Canada': 'Canada',
+    'Australia': 'Australia',
+    'Singapore': 'Singapore',
+    'UAE': 'United Arab Emirates',
+    'Germany': 'Germany',
+    'Ireland': 'Ireland',
+}
+
+
+def government_filters(country_code='', state='', job_title=''):
+    """Filters for generate_government_jobs from the government search form values"""
+    return {
+        'country': GOVERNMENT_COUNTRY_NAMES.get(country_code, 'United Kingdom') if country_code else 'United Kingdom',
+        'state': state,
+        'job_title': job_title if job_title else 'Government Jobs'
+    }
+
+
+def company_filters(country_code='', state='', job_title='', experience_level='', company=''):
+    """Filters for generate_job_listings from the company search form values"""
+    return {
+        'country': COMPANY_COUNTRY_NAMES.get(country_code, country_code) if country_code else 'Global',
+        'state': state,
+        'job_title': job_title if job_title else 'General/Any Position',
+        'experience_level': experience_level,
+        'company': company
+    }
+
+
+def _generate_government_jobs(filters):
+    return AIJobMatcher().generate_government_jobs(filters)
+
+
+def _generate_company_jobs(filters):
+    return AIJobMatcher().generate_job_listings(filters)
+
+
+async def _agenerate_government_jobs(filters):
+    return await AIJobMatcher().agenerate_government_jobs(filters)
+
+
+async def _agenerate_company_jobs(filters):
+    return await AIJobMatcher().agenerate_job_listings(filters)
+
+
+# Generated listings per filter combination, refreshed in the background once stale
+listing_collection = get_collection('listing_cache') if settings.LISTING_CACHE_SHARED else None
+government_listing_cache = ListingCache(
+    'government', _generate_government_jobs, listing_collection, agenerate=_agenerate_government_jobs
+)
+company_listing_cache = ListingCache(
+    'company', _generate_company_jobs, listing_collection, agenerate=_agenerate_company_jobs
+)
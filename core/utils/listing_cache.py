@@ -0,0 +1,290 @@
+"""
+Listing Cache - Stale-while-revalidate cache for generated job listings
+Fresh entries are served straight away; stale ones are served while a background
+thread regenerates them, so page loads do not wait on the model once a filter
+combination has been seen. Entries can be shared across processes through MongoDB.
+Concurrent generations for the same filters, in any process, share one call.
+"""
+import copy
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from .ai_deadline import DeadlineExceeded
+from .single_flight import SingleFlight
+
+
+FILTER_KEY_FIELDS = ('country', 'state', 'job_title', 'experience_level', 'company')
+
+
+def normalize_filters(filters):
+    """Filter tuple used as the cache key: (country, state, title, experience, company)"""
+    return tuple(' '.join(str((filters or {}).get(field) or '').split()).lower() for field in FILTER_KEY_FIELDS)
+
+
+class ListingCache:
+    """Stale-while-revalidate cache in front of one listing generator"""
+
+    def __init__(self, kind, generate, collection=None, fresh_ttl=None, stale_ttl=None, max_entries=None,
+                 agenerate=None):
+        """
+        Args:
+            kind: Listing type stored with each entry ('government', 'company')
+            generate: Callable filters -> list of jobs (an empty list means the call failed)
+            agenerate: Coroutine function doing the same for async views (optional)
+            collection: MongoDB collection shared across processes (None for memory only)
+            fresh_ttl: Seconds an entry is served without refreshing
+            stale_ttl: Seconds an entry may still be served while it is refreshed
+            max_entries: In-memory entries kept before least recently used ones are evicted
+        """
+        self.kind = kind
+        self.generate = generate
+        self.agenerate = agenerate
+        self.collection = collection
+        self.fresh_ttl = fresh_ttl or settings.LISTING_CACHE_FRESH_TTL
+        self.stale_ttl = max(stale_ttl or settings.LISTING_CACHE_STALE_TTL, self.fresh_ttl)
+        self.max_entries = max_entries or settings.LISTING_CACHE_MAX_ENTRIES
+        self.enabled = getattr(settings, 'LISTING_CACHE_ENABLED', True)
+        self._entries = OrderedDict()
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._executor = None
+        self._index_ready = False
+        self._counters = {'fresh_hits': 0, 'stale_hits': 0, 'misses': 0, 'refreshes': 0}
+        self._single_flight = SingleFlight(f'{kind}-listings')
+
+    def _key(self, filters):
+        normalized = json.dumps([self.kind, normalize_filters(filters)])
+        return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+    def get(self, filters):
+        """
+        Return listings for the filters, generating them on a miss
+        Args:
+            filters: Dict with country, state, job_title, experience_level, company
+        Returns:
+            list: A copy of the cached or newly generated jobs
+        """
+        if not self.enabled:
+            return copy.deepcopy(self.refresh(filters))
+
+        jobs = self._serve(self._lookup(self._key(filters)), filters)
+        if jobs is not None:
+            return jobs
+
+        self._count('misses')
+        return copy.deepcopy(self.refresh(filters))
+
+    async def aget(self, filters):
+        """get() for async views: generation uses agenerate and MongoDB runs in a thread"""
+        if not self.enabled:
+            return copy.deepcopy(await self._arefresh(filters))
+
+        jobs = self._serve(await self._alookup(self._key(filters)), filters)
+        if jobs is not None:
+            return jobs
+
+        self._count('misses')
+        return copy.deepcopy(await self._arefresh(filters))
+
+    def _serve(self, entry, filters):
+        """Jobs to return for a cached entry (refreshing stale ones in the background), or None on a miss"""
+        if entry is None:
+            return None
+        age = time.time() - entry['generated_at']
+        if age < self.fresh_ttl:
+            self._count('fresh_hits')
+            print(f"[OK] {self.kind} listing cache hit ({age:.0f}s old)")
+            return copy.deepcopy(entry['jobs'])
+        self._count('stale_hits')
+        print(f"[OK] {self.kind} listing cache stale hit ({age:.0f}s old), refreshing in background")
+        self.refresh_async(filters)
+        return copy.deepcopy(entry['jobs'])
+
+    def refresh(self, filters):
+        """
+        Generate listings now and store them (empty results are not cached); returns the jobs.
+        Joins an identical generation already running here or in another process.
+        If generation fails or runs out of time, the last listings kept for these filters
+        are returned however old they are.
+        """
+        key = self._key(filters)
+        try:
+            jobs = self._single_flight.run(key, lambda: self._generate_and_store(key, filters))
+        except DeadlineExceeded as e:
+            print(f"[WARNING] {self.kind} listing generation: {e}")
+            jobs = []
+        self._remember(key, jobs)
+        return jobs or self._last_known(key)
+
+    async def _arefresh(self, filters):
+        key = self._key(filters)
+        try:
+            jobs = await self._single_flight.arun(key, lambda: self._agenerate_and_store(key, filters))
+        except DeadlineExceeded as e:
+            print(f"[WARNING] {self.kind} listing generation: {e}")
+            jobs = []
+        self._remember(key, jobs)
+        return jobs or self._last_known(key)
+
+    def _last_known(self, key):
+        """Jobs of the in-memory entry for the key even if expired (fallback while OpenAI is failing)"""
+        entry = self._local_entry(key)
+        if entry is None:
+            return []
+        age = time.time() - entry['generated_at']
+        print(f"[WARNING] Generation failed, serving {self.kind} listings from {age:.0f}s ago")
+        return copy.deepcopy(entry['jobs'])
+
+    def _generate_and_store(self, key, filters):
+        jobs = self.generate(filters)
+        if jobs and self.enabled:
+            self._store(key, filters, jobs)
+        return jobs
+
+    async def _agenerate_and_store(self, key, filters):
+        if self.agenerate is not None:
+            jobs = await self.agenerate(filters)
+        else:
+            jobs = await sync_to_async(self.generate, thread_sensitive=False)(filters)
+        if jobs and self.enabled:
+            await sync_to_async(self._store, thread_sensitive=False)(key, filters, jobs)
+        return jobs
+
+    def _remember(self, key, jobs):
+        """Keep a result generated by another process in memory too"""
+        if not jobs or not self.enabled:
+            return
+        entry = self._local_entry(key)
+        if entry is None or self._is_stale(entry):
+            self._store_local(key, {'generated_at': time.time(), 'jobs': copy.deepcopy(jobs)})
+
+    def refresh_async(self, filters):
+        """Regenerate in the background unless a refresh for these filters is already running"""
+        key = self._key(filters)
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=settings.LISTING_CACHE_REFRESH_THREADS,
+                    thread_name_prefix=f'{self.kind}-listing-refresh'
+                )
+        self._executor.submit(self._background_refresh, key, copy.deepcopy(filters))
+
+    def _background_refresh(self, key, filters):
+        try:
+            self._count('refreshes')
+            # On failure the stale entry keeps being served until it expires
+            self.refresh(filters)
+        except Exception as e:
+            print(f"[ERROR] Background {self.kind} listing refresh failed: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def is_fresh(self, filters):
+        """True if the filters have an entry that does not need refreshing yet"""
+        entry = self._lookup(self._key(filters))
+        return entry is not None and time.time() - entry['generated_at'] < self.fresh_ttl
+
+    async def ais_fresh(self, filters):
+        """is_fresh() for async views"""
+        if not self.enabled:
+            return False
+        entry = await self._alookup(self._key(filters))
+        return entry is not None and time.time() - entry['generated_at'] < self.fresh_ttl
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters, size=len(self._entries))
+        counters['single_flight'] = self._single_flight.stats()
+        return counters
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def _lookup(self, key):
+        """Newest unexpired entry from memory or the shared tier, or None"""
+        entry = self._local_entry(key)
+        if entry is None or self._is_stale(entry):
+            entry = self._newest(key, entry, self._read_shared(key))
+        return self._unexpired(entry)
+
+    async def _alookup(self, key):
+        entry = self._local_entry(key)
+        if (entry is None or self._is_stale(entry)) and self.collection is not None:
+            shared = await sync_to_async(self._read_shared, thread_sensitive=False)(key)
+            entry = self._newest(key, entry, shared)
+        return self._unexpired(entry)
+
+    def _local_entry(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        return entry
+
+    def _newest(self, key, entry, shared):
+        if shared is not None and (entry is None or shared['generated_at'] > entry['generated_at']):
+            # Another process refreshed it
+            entry = shared
+            self._store_local(key, entry)
+        return entry
+
+    def _unexpired(self, entry):
+        if entry is not None and time.time() - entry['generated_at'] >= self.stale_ttl:
+            return None
+        return entry
+
+    def _is_stale(self, entry):
+        return time.time() - entry['generated_at'] >= self.fresh_ttl
+
+    def _store(self, key, filters, jobs):
+        entry = {'generated_at': time.time(), 'jobs': copy.deepcopy(jobs)}
+        self._store_local(key, entry)
+        self._write_shared(key, filters, entry)
+
+    def _store_local(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _read_shared(self, key):
+        if self.collection is None:
+            return None
+        try:
+            doc = self.collection.find_one({'_id': key})
+        except Exception as e:
+            print(f"Listing cache lookup failed in MongoDB: {e}")
+            return None
+        if not doc:
+            return None
+        return {'generated_at': doc['generated_at'], 'jobs': doc['jobs']}
+
+    def _write_shared(self, key, filters, entry):
+        if self.collection is None:
+            return
+        try:
+            if not self._index_ready:
+                self.collection.create_index('expires_at', expireAfterSeconds=0)
+                self._index_ready = True
+            self.collection.replace_one({'_id': key}, {
+                '_id': key,
+                'kind': self.kind,
+                'filters': list(normalize_filters(filters)),
+                'jobs': entry['jobs'],
+                'generated_at': entry['generated_at'],
+                'expires_at': datetime.utcnow() + timedelta(seconds=self.stale_ttl)
+            }, upsert=True)
+        except Exception as e:
+            print(f"Listing cache write failed in MongoDB: {e}")
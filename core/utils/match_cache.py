@@ -0,0 +1,180 @@
+"""
+Match Cache - Reuses AIJobMatcher.match_jobs results for the same profile and preferences
+Entries live in a size-bounded LRU in process memory with a TTL, backed by an
+optional MongoDB collection shared by every worker process
+"""
+import copy
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+
+# Only the fields that go into the match_jobs prompt take part in the key
+CV_KEY_FIELDS = ('skills', 'experience_years', 'education', 'job_titles', 'industries')
+LIST_FIELDS = ('skills', 'job_titles', 'industries')
+PREFERENCE_KEY_FIELDS = ('job_type', 'job_title', 'location', 'experience_level')
+
+
+def _normalize(value):
+    return re.sub(r'\s+', ' ', str(value or '')).strip().lower()
+
+
+def make_match_key(cv_data, job_preferences):
+    """
+    Canonical hash of a CV profile and job preferences.
+    Comma-separated lists are compared as sets, so "Python, SQL" and "sql,python" share a key.
+    """
+    profile = {}
+    for field in CV_KEY_FIELDS:
+        value = (cv_data or {}).get(field, '')
+        if field in LIST_FIELDS:
+            profile[field] = sorted({_normalize(item) for item in str(value or '').split(',') if item.strip()})
+        else:
+            profile[field] = _normalize(value)
+    preferences = {field: _normalize((job_preferences or {}).get(field, '')) for field in PREFERENCE_KEY_FIELDS}
+
+    canonical = json.dumps({'cv': profile, 'preferences': preferences}, sort_keys=True)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class MatchCache:
+    """TTL + LRU cache of match_jobs results with an optional MongoDB tier"""
+
+    def __init__(self, collection=None, max_entries=None, ttl=None):
+        """
+        Args:
+            collection: MongoDB collection shared across processes (None for memory only)
+            max_entries: In-memory entries kept before least recently used ones are evicted
+            ttl: Seconds a result stays valid
+        """
+        self.collection = collection
+        self.max_entries = max_entries or settings.MATCH_CACHE_MAX_ENTRIES
+        self.ttl = ttl or settings.MATCH_CACHE_TTL
+        self.enabled = getattr(settings, 'MATCH_CACHE_ENABLED', True)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'shared_hits': 0, 'misses': 0, 'evictions': 0}
+        self._index_ready = False
+
+    def get(self, cv_data, job_preferences):
+        """
+        Look up match results
+        Returns:
+            dict: A copy of the cached results, or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        key = make_match_key(cv_data, job_preferences)
+        result = self._get_local(key)
+        if result is None:
+            result = self._shared_hit(key, self._read_shared(key))
+        return result
+
+    async def aget(self, cv_data, job_preferences):
+        """get() for async views: memory hits stay on the event loop, MongoDB runs in a thread"""
+        if not self.enabled:
+            return None
+
+        key = make_match_key(cv_data, job_preferences)
+        result = self._get_local(key)
+        if result is None:
+            shared = None
+            if self.collection is not None:
+                shared = await sync_to_async(self._read_shared, thread_sensitive=False)(key)
+            result = self._shared_hit(key, shared)
+        return result
+
+    def _get_local(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(key)
+                self._counters['hits'] += 1
+                print(f"[OK] Match cache hit for {key[:12]}")
+                return copy.deepcopy(entry[1])
+            if entry:
+                del self._entries[key]
+        return None
+
+    def _shared_hit(self, key, result):
+        """Count a lookup that missed memory; promote a shared result into memory"""
+        if result is not None:
+            self._store_local(key, result)
+            with self._lock:
+                self._counters['shared_hits'] += 1
+            print(f"[OK] Match cache hit (shared) for {key[:12]}")
+            return copy.deepcopy(result)
+
+        with self._lock:
+            self._counters['misses'] += 1
+        return None
+
+    def set(self, cv_data, job_preferences, result):
+        """Store match results; empty fallback results are not cached"""
+        if not self.enabled or not result or not any(result.values()):
+            return
+
+        key = make_match_key(cv_data, job_preferences)
+        result = copy.deepcopy(result)
+        self._store_local(key, result)
+        self._write_shared(key, result)
+
+    async def aset(self, cv_data, job_preferences, result):
+        """set() for async views; the MongoDB write runs in a thread"""
+        if not self.enabled or not result or not any(result.values()):
+            return
+
+        key = make_match_key(cv_data, job_preferences)
+        result = copy.deepcopy(result)
+        self._store_local(key, result)
+        if self.collection is not None:
+            await sync_to_async(self._write_shared, thread_sensitive=False)(key, result)
+
+    def stats(self):
+        """Hit/miss counters plus the current in-memory size"""
+        with self._lock:
+            return dict(self._counters, size=len(self._entries))
+
+    def _store_local(self, key, result):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters['evictions'] += 1
+
+    def _read_shared(self, key):
+        if self.collection is None:
+            return None
+        try:
+            doc = self.collection.find_one({'_id': key})
+        except Exception as e:
+            print(f"Match cache lookup failed in MongoDB: {e}")
+            return None
+        # The TTL index removes expired documents lazily, so check the expiry too
+        if not doc or doc.get('expires_at', datetime.min) <= datetime.utcnow():
+            return None
+        return doc.get('result')
+
+    def _write_shared(self, key, result):
+        if self.collection is None:
+            return
+        try:
+            if not self._index_ready:
+                self.collection.create_index('expires_at', expireAfterSeconds=0)
+                self._index_ready = True
+            self.collection.replace_one({'_id': key}, {
+                '_id': key,
+                'result': result,
+                'expires_at': datetime.utcnow() + timedelta(seconds=self.ttl)
+            }, upsert=True)
+        except Exception as e:
+            print(f"Match cache write failed in MongoDB: {e}")
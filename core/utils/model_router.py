@@ -0,0 +1,148 @@
+"""
+Model Router - Picks the model for each kind of AIJobMatcher call
+Every call type has a list of models, preferred first, and a p95 latency budget. A call
+uses the first model whose recently observed p95 fits the budget and whose circuit
+breaker is closed, so a slow or failing primary model hands its traffic to a faster one
+until its latency samples age out. Call types can also be hedged: if the first request
+has not answered within the model's p95, an identical second one is sent and the first
+reply wins.
+"""
+import threading
+import time
+from collections import deque
+from django.conf import settings
+from .circuit_breaker import get_breaker
+
+
+MATCH = 'match'
+LISTINGS = 'listings'
+CHAT = 'chat'
+# Streamed chat replies: their samples are the time to the first chunk, not the whole reply
+CHAT_STREAM = 'chat_stream'
+SUMMARY = 'summary'
+CALL_TYPES = (MATCH, LISTINGS, CHAT, CHAT_STREAM, SUMMARY)
+
+
+class LatencyTracker:
+    """Recent call latencies per (call type, model), kept for a sliding time window"""
+
+    def __init__(self, window=None, min_samples=None):
+        """
+        Args:
+            window: Seconds a sample counts towards the p95
+            min_samples: Samples needed before a p95 is reported
+        """
+        self.window = window or settings.AI_LATENCY_WINDOW
+        self.min_samples = min_samples or settings.AI_LATENCY_MIN_SAMPLES
+        self._lock = threading.Lock()
+        self._samples = {}
+
+    def record(self, call_type, model, seconds):
+        with self._lock:
+            samples = self._samples.setdefault((call_type, model), deque())
+            samples.append((time.monotonic(), seconds))
+            self._prune(samples)
+
+    def p95(self, call_type, model):
+        """p95 latency in seconds, or None without enough recent samples"""
+        with self._lock:
+            samples = self._samples.get((call_type, model))
+            if not samples:
+                return None
+            self._prune(samples)
+            if len(samples) < self.min_samples:
+                return None
+            values = sorted(seconds for _, seconds in samples)
+        return values[min(len(values) - 1, int(len(values) * 0.95))]
+
+    def counts(self):
+        with self._lock:
+            return {key: len(samples) for key, samples in self._samples.items()}
+
+    def _prune(self, samples):
+        cutoff = time.monotonic() - self.window
+        while samples and samples[0][0] < cutoff:
+            samples.popleft()
+
+
+class ModelRouter:
+    """Model choice, latency tracking and hedging policy per call type"""
+
+    def __init__(self, tracker=None):
+        self.tracker = tracker or LatencyTracker()
+        self.hedged = {name.strip() for name in settings.AI_HEDGED_CALLS.split(',') if name.strip()}
+        self.hedge_min_delay = settings.AI_HEDGE_MIN_DELAY
+        self._lock = threading.Lock()
+        self._chosen = {}
+        self._counters = {'hedges': 0, 'hedge_wins': 0}
+
+    def models(self, call_type):
+        """Models configured for a call type, preferred first"""
+        models = getattr(settings, f'AI_{call_type.upper()}_MODELS')
+        return [model.strip() for model in models.split(',') if model.strip()]
+
+    def budget(self, call_type):
+        """p95 latency budget of a call type in seconds"""
+        return getattr(settings, f'AI_{call_type.upper()}_P95_BUDGET')
+
+    def choose(self, call_type):
+        """
+        Model for the next call of this type
+        Returns:
+            str: First model that is within budget and not failing, else the last (fastest) one
+        """
+        models = self.models(call_type)
+        budget = self.budget(call_type)
+        chosen = models[-1]
+        reason = 'every model is over budget or failing'
+        for model in models:
+            if get_breaker(model).is_open():
+                continue
+            p95 = self.tracker.p95(call_type, model)
+            if p95 is not None and p95 > budget:
+                continue
+            chosen = model
+            reason = None
+            break
+
+        with self._lock:
+            changed = self._chosen.get(call_type, models[0]) != chosen
+            self._chosen[call_type] = chosen
+        if changed:
+            print(f"[ROUTER] {call_type} calls now use {chosen}"
+                  + (f" ({reason})" if reason else f" (within the {budget:g}s p95 budget)"))
+        return chosen
+
+    def record(self, call_type, model, seconds):
+        self.tracker.record(call_type, model, seconds)
+
+    def hedge_delay(self, call_type, model):
+        """Seconds to wait before hedging a call, or None if this call type is not hedged"""
+        if call_type not in self.hedged:
+            return None
+        p95 = self.tracker.p95(call_type, model)
+        if p95 is None:
+            # Until there are samples, hedge only calls that are already over budget
+            p95 = self.budget(call_type)
+        return max(self.hedge_min_delay, p95)
+
+    def count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def stats(self):
+        counts = self.tracker.counts()
+        with self._lock:
+            stats = dict(self._counters)
+        for call_type in CALL_TYPES:
+            stats[call_type] = {
+                'model': self._chosen.get(call_type, self.models(call_type)[0]),
+                'hedged': call_type in self.hedged,
+                'p95': {model: self.tracker.p95(call_type, model) for model in self.models(call_type)},
+                'samples': {model: counts.get((call_type, model), 0) for model in self.models(call_type)},
+            }
+        return stats
+
+
+# Shared by every AIJobMatcher in the process
+model_router = ModelRouter()
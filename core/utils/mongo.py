@@ -0,0 +1,29 @@
+"""
+MongoDB connection - Shared by views, caches and management commands
+The application keeps working without MongoDB; callers get None instead of a collection
+"""
+from pymongo import MongoClient
+from django.conf import settings
+
+
+try:
+    mongo_client = MongoClient(
+        host=settings.MONGODB_SETTINGS['host'],
+        port=settings.MONGODB_SETTINGS['port'],
+        serverSelectionTimeoutMS=2000
+    )
+    mongo_db = mongo_client[settings.MONGODB_SETTINGS['db']]
+    mongo_client.server_info()
+    print("MongoDB connected successfully")
+except Exception as e:
+    print(f"MongoDB connection error: {e}")
+    print("Application will continue without MongoDB")
+    mongo_client = None
+    mongo_db = None
+
+
+def get_collection(name):
+    """Return a MongoDB collection, or None when MongoDB is not available"""
+    if mongo_db is None:
+        return None
+    return mongo_db[name]
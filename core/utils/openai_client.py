@@ -0,0 +1,133 @@
+"""
+OpenAI client - One pooled, keep-alive client shared by every request in a process
+Connections (and their TLS sessions) are reused across requests; the client is
+rebuilt in a forked child so pre-fork servers never share sockets with the parent.
+Async views get an AsyncOpenAI client per event loop, since an async connection
+pool is bound to the loop that created it; the client is closed when its loop shuts
+down. Under ASGI that is one pool per worker. Under WSGI or runserver every async
+view runs on a new loop, so each request gets (and closes) its own pool.
+With settings.OPENAI_FAKE_MODE set, both talk to the local stand-in in fake_openai.py.
+"""
+import asyncio
+import os
+import threading
+import httpx
+from openai import OpenAI, AsyncOpenAI, DefaultHttpxClient, DefaultAsyncHttpxClient
+from django.conf import settings
+from .fake_openai import get_fake_transport
+
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+# Event loop -> (AsyncOpenAI client, generator that closes it when the loop shuts down)
+_async_clients = {}
+
+
+def _limits():
+    return httpx.Limits(
+        max_connections=settings.OPENAI_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.OPENAI_KEEPALIVE_EXPIRY
+    )
+
+
+def _api_key():
+    if settings.OPENAI_FAKE_MODE in ('fake', 'replay'):
+        # No real requests are made; the client just needs some key
+        return settings.OPENAI_API_KEY or 'fake-openai-key'
+    return settings.OPENAI_API_KEY
+
+
+def _build_client():
+    http_client = DefaultHttpxClient(limits=_limits(), transport=get_fake_transport())
+    return OpenAI(
+        api_key=_api_key(),
+        timeout=settings.OPENAI_TIMEOUT,
+        max_retries=settings.OPENAI_MAX_RETRIES,
+        http_client=http_client
+    )
+
+
+def get_openai_client():
+    """
+    Return the process-wide OpenAI client, created on first use.
+    The client (and its httpx connection pool) is thread-safe.
+    Returns:
+        OpenAI: Shared client, or None if it could not be created (e.g. no API key)
+    """
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is None or _client_pid != pid:
+        with _client_lock:
+            if _client is None or _client_pid != pid:
+                try:
+                    _client = _build_client()
+                    _client_pid = pid
+                    print("[OK] OpenAI client created")
+                except Exception as e:
+                    print(f"Failed to initialize OpenAI client: {e}")
+                    return None
+    return _client
+
+
+def get_async_openai_client():
+    """
+    Return the AsyncOpenAI client for the running event loop, created on first use.
+    Under ASGI there is one loop per worker, so every async view shares one pool.
+    Returns:
+        AsyncOpenAI: Client bound to the current loop, or None if it could not be created
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        try:
+            client = AsyncOpenAI(
+                api_key=_api_key(),
+                timeout=settings.OPENAI_TIMEOUT,
+                max_retries=settings.OPENAI_MAX_RETRIES,
+                http_client=DefaultAsyncHttpxClient(limits=_limits(), transport=get_fake_transport())
+            )
+        except Exception as e:
+            print(f"Failed to initialize async OpenAI client: {e}")
+            return None
+        _async_clients[loop] = (client, _close_at_loop_shutdown(loop, client))
+        print("[OK] Async OpenAI client created")
+        return client
+    return client[0]
+
+
+def _close_at_loop_shutdown(loop, client):
+    """
+    Close the client (and forget it) when the running loop shuts down
+    asyncio.run() (and asgiref's loop per request under WSGI) finalizes the loop's async
+    generators before closing it, so a generator parked at its yield runs its cleanup then.
+    Returns:
+        The generator, which must be kept referenced for as long as the client
+    """
+    async def close_client():
+        try:
+            yield
+        finally:
+            _async_clients.pop(loop, None)
+            try:
+                await client.close()
+            except Exception as e:
+                print(f"Async OpenAI client close failed: {e}")
+
+    closer = close_client()
+    asyncio.ensure_future(closer.__anext__())
+    return closer
+
+
+def _reset_after_fork():
+    """Forked child: drop the parent's clients without closing their sockets (the parent still uses them)"""
+    global _client, _client_pid, _client_lock, _async_clients
+    _client = None
+    _client_pid = None
+    _client_lock = threading.Lock()
+    _async_clients = {}
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
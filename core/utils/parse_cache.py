@@ -0,0 +1,112 @@
+"""
+CV Parse Cache - Skips re-parsing CVs that were already uploaded
+Entries are keyed by the SHA-256 of the file bytes and stored in MongoDB,
+or in a local on-disk store when MongoDB is not available
+"""
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from django.conf import settings
+from .cv_parser import CVParser
+
+
+class ParseCache:
+    """Content-hash cache of CVParser results"""
+
+    def __init__(self, collection=None, cache_dir=None, parser_version=None):
+        """
+        Args:
+            collection: MongoDB collection for cache entries (None to use the disk store)
+            cache_dir: Directory of the on-disk store (defaults to settings.CV_PARSE_CACHE_DIR)
+            parser_version: Entries written by any other parser version are ignored
+        """
+        self.collection = collection
+        self.cache_dir = str(cache_dir or settings.CV_PARSE_CACHE_DIR)
+        self.parser_version = parser_version or CVParser.PARSER_VERSION
+        self.enabled = getattr(settings, 'CV_PARSE_CACHE_ENABLED', True)
+
+    @staticmethod
+    def hash_file(uploaded_file):
+        """SHA-256 of an uploaded file, read in chunks"""
+        digest = hashlib.sha256()
+        for chunk in uploaded_file.chunks():
+            digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def hash_bytes(data):
+        """SHA-256 of raw file bytes"""
+        return hashlib.sha256(data).hexdigest()
+
+    def get(self, content_hash):
+        """
+        Look up a parse result
+        Returns:
+            dict: Cache entry with 'cv_data' and 'file_path', or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        entry = None
+        if self.collection is not None:
+            try:
+                entry = self.collection.find_one({'_id': content_hash})
+            except Exception as e:
+                print(f"Parse cache lookup failed in MongoDB: {e}")
+                entry = self._read_disk(content_hash)
+        else:
+            entry = self._read_disk(content_hash)
+
+        if not entry or entry.get('parser_version') != self.parser_version:
+            return None
+
+        print(f"[OK] Parse cache hit for {content_hash[:12]}")
+        return entry
+
+    def set(self, content_hash, cv_data, file_path=None):
+        """Store a parse result for the given content hash"""
+        if not self.enabled or 'error' in cv_data:
+            return
+
+        entry = {
+            '_id': content_hash,
+            'parser_version': self.parser_version,
+            'cv_data': cv_data,
+            'file_path': file_path,
+            'cached_at': datetime.now().isoformat()
+        }
+
+        if self.collection is not None:
+            try:
+                self.collection.replace_one({'_id': content_hash}, entry, upsert=True)
+                return
+            except Exception as e:
+                print(f"Parse cache write failed in MongoDB, using disk store: {e}")
+        self._write_disk(content_hash, entry)
+
+    def _disk_path(self, content_hash):
+        return os.path.join(self.cache_dir, content_hash[:2], f"{content_hash}.json")
+
+    def _read_disk(self, content_hash):
+        try:
+            with open(self._disk_path(content_hash), 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Parse cache read failed on disk: {e}")
+            return None
+
+    def _write_disk(self, content_hash, entry):
+        path = self._disk_path(content_hash)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename so concurrent readers never see a partial entry
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as file:
+                json.dump(entry, file)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Parse cache write failed on disk: {e}")
@@ -0,0 +1,126 @@
+"""
+CV Parse Jobs - Background CV processing for the asynchronous upload mode
+The upload request returns straight away with a job id; the work runs on a
+thread pool and its status is kept in MongoDB (or in process memory when
+MongoDB is not available) for the status endpoint to poll. MongoDB expires
+status records CV_PARSE_JOB_TTL seconds after their last update.
+"""
+import threading
+import traceback
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from django.conf import settings
+
+
+class ParseJobQueue:
+    """Runs CV processing functions in the background and tracks their status"""
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    # In-memory status records kept when MongoDB is down
+    MAX_LOCAL_JOBS = 1000
+
+    def __init__(self, collection=None, max_workers=None, ttl=None):
+        """
+        Args:
+            collection: MongoDB collection for job status (None to keep status in memory)
+            max_workers: Background threads (parsing itself is bounded by the parse pool)
+            ttl: Seconds a status record is kept in MongoDB after its last update
+        """
+        self.collection = collection
+        self.max_workers = max_workers or settings.CV_PARSE_JOB_THREADS
+        self.ttl = ttl or settings.CV_PARSE_JOB_TTL
+        self._index_ready = False
+        self._executor = None
+        self._lock = threading.Lock()
+        self._local_jobs = OrderedDict()
+
+    def submit(self, func, *args, filename=''):
+        """
+        Queue func(*args) and return its job id.
+        func must return a dict of result fields, or a dict with 'error' on failure.
+        """
+        job_id = uuid.uuid4().hex
+        self._save(job_id, {
+            'status': self.PENDING,
+            'filename': filename,
+            'created_at': datetime.now().isoformat()
+        }, create=True)
+
+        self._get_executor().submit(self._run, job_id, func, args)
+        return job_id
+
+    def defer(self, func, *args):
+        """Run func(*args) on the background pool without tracking its status"""
+        self._get_executor().submit(self._run_deferred, func, args)
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix='cv-parse-job'
+                )
+            return self._executor
+
+    def get(self, job_id):
+        """Return the job status record, or None if unknown"""
+        # Records only land in memory when MongoDB writes fail, so they are the newest
+        with self._lock:
+            job = self._local_jobs.get(job_id)
+            if job:
+                return dict(job)
+        if self.collection is not None:
+            try:
+                return self.collection.find_one({'_id': job_id})
+            except Exception as e:
+                print(f"Parse job lookup failed in MongoDB: {e}")
+        return None
+
+    def _run(self, job_id, func, args):
+        self._save(job_id, {'status': self.RUNNING})
+        try:
+            result = func(*args) or {}
+        except Exception as e:
+            traceback.print_exc()
+            result = {'error': f'Error processing CV: {e}'}
+
+        if 'error' in result:
+            self._save(job_id, {'status': self.FAILED, 'error': result['error']})
+        else:
+            self._save(job_id, dict(result, status=self.DONE))
+
+    @staticmethod
+    def _run_deferred(func, args):
+        try:
+            func(*args)
+        except Exception:
+            traceback.print_exc()
+
+    def _save(self, job_id, fields, create=False):
+        fields = dict(fields, updated_at=datetime.now().isoformat())
+        if self.collection is not None:
+            try:
+                if not self._index_ready:
+                    self.collection.create_index('expires_at', expireAfterSeconds=0)
+                    self._index_ready = True
+                mongo_fields = dict(fields, expires_at=datetime.utcnow() + timedelta(seconds=self.ttl))
+                if create:
+                    self.collection.insert_one(dict(mongo_fields, _id=job_id))
+                else:
+                    self.collection.update_one({'_id': job_id}, {'$set': mongo_fields})
+                return
+            except Exception as e:
+                print(f"Parse job status write failed in MongoDB, keeping it in memory: {e}")
+
+        with self._lock:
+            job = self._local_jobs.setdefault(job_id, {'_id': job_id})
+            job.update(fields)
+            self._local_jobs.move_to_end(job_id)
+            while len(self._local_jobs) > self.MAX_LOCAL_JOBS:
+                self._local_jobs.popitem(last=False)
@@ -0,0 +1,249 @@
+"""
+CV Parse Pool - Runs CVParser in a bounded pool of worker processes
+Each job gets a wall-clock timeout and every worker a memory limit, so a
+pathological PDF returns a clean error instead of pinning a web worker
+"""
+import atexit
+import io
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from django.conf import settings
+from .cv_parser import CVParser, limit_page_executor, page_worker_count, shutdown_page_executor
+from .skill_matcher import get_skill_matcher
+
+try:
+    import resource
+except ImportError:  # Windows: no per-process memory limits
+    resource = None
+
+
+def _apply_memory_limit(memory_limit_mb):
+    """Cap the worker's address space so runaway extraction raises MemoryError"""
+    if resource is None or not memory_limit_mb:
+        return
+    limit = int(memory_limit_mb) * 1024 * 1024
+    try:
+        soft, hard = resource.getrlimit(resource.RLIMIT_AS)
+        if hard != resource.RLIM_INFINITY:
+            limit = min(limit, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+    except Exception as e:
+        print(f"Could not set parse worker memory limit: {e}")
+
+
+def _parse_source(parser, source, filename):
+    """Parse raw file bytes, an open binary file object or a file path"""
+    if isinstance(source, bytes):
+        return parser.parse_cv_buffer(io.BytesIO(source), filename or '')
+    if hasattr(source, 'read'):
+        return parser.parse_cv_buffer(source, filename or '')
+    return parser.parse_cv(source)
+
+
+def _worker_main(conn, memory_limit_mb, page_workers):
+    """Worker loop: receive (file bytes or path, file name), send back the parse result"""
+    if hasattr(os, 'setpgrp'):
+        # Own process group, so a worker killed on timeout takes its page processes with it
+        os.setpgrp()
+    _apply_memory_limit(memory_limit_mb)
+    # Page processes are forked from the worker so they share its process group
+    limit_page_executor(page_workers, 'fork' if hasattr(os, 'setpgrp') else None)
+    parser = CVParser()
+    # Compile the skill automaton once per worker, not once per CV
+    get_skill_matcher()
+
+    try:
+        _serve(conn, parser)
+    finally:
+        shutdown_page_executor()
+
+
+def _serve(conn, parser):
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError, KeyboardInterrupt):
+            break
+        if job is None:
+            break
+
+        try:
+            result = _parse_source(parser, *job)
+        except MemoryError:
+            result = {'error': 'This CV is too large to process. Please upload a smaller file.'}
+        except Exception as e:
+            result = {'error': f'Could not parse CV: {e}'}
+
+        try:
+            conn.send(result)
+        except (OSError, ValueError):
+            break
+
+
+class _Worker:
+    """One parse worker process and the pipe used to talk to it"""
+
+    def __init__(self, context, memory_limit_mb, page_workers):
+        self.conn, child_conn = context.Pipe()
+        # Not daemonic: workers may start their own page-extraction processes.
+        # They exit on their own when the pipe to the web process closes.
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_conn, memory_limit_mb, page_workers),
+            daemon=False
+        )
+        self.process.start()
+        child_conn.close()
+        self.jobs_done = 0
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except Exception:
+            pass
+        self.kill(grace=1.0)
+
+    def kill(self, grace=0.0):
+        if grace:
+            self.process.join(grace)
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(1.0)
+        if hasattr(os, 'killpg'):
+            # Page processes the worker could not shut down itself
+            try:
+                os.killpg(self.process.pid, signal.SIGKILL)
+            except OSError:
+                pass
+        self.conn.close()
+
+
+class CVParsePool:
+    """
+    Bounded pool of CV parse workers.
+    At most max_workers files are parsed at once; a job that exceeds the timeout
+    has its worker killed and replaced, and the caller gets an error dict.
+    """
+
+    BUSY_ERROR = 'The CV parser is busy right now. Please try again in a moment.'
+    TIMEOUT_ERROR = 'This CV took too long to process. Please upload a smaller or simpler file.'
+    CRASH_ERROR = 'This CV could not be processed. Please upload a different file.'
+
+    def __init__(self, max_workers=None, timeout=None, memory_limit_mb=None, max_jobs_per_worker=None,
+                 isolated=None):
+        self.enabled = isolated if isolated is not None else getattr(settings, 'CV_PARSE_ISOLATED', True)
+        self.max_workers = max_workers or settings.CV_PARSE_WORKERS
+        self.timeout = timeout or settings.CV_PARSE_TIMEOUT
+        self.memory_limit_mb = memory_limit_mb if memory_limit_mb is not None else settings.CV_PARSE_MEMORY_LIMIT_MB
+        self.max_jobs_per_worker = max_jobs_per_worker or settings.CV_PARSE_MAX_JOBS_PER_WORKER
+        # Workers share the page-process budget, so a host runs about one process per core
+        # (fewer than 2 each turns parallel page extraction off inside the workers)
+        self.page_workers = min(page_worker_count(), (os.cpu_count() or 2) // self.max_workers)
+
+        # Workers never inherit web-process state: forkserver on Unix, spawn elsewhere
+        start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        self._context = multiprocessing.get_context(start_method)
+        self._reset()
+        atexit.register(self.shutdown)
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_workers)
+        self._idle = []
+        self._workers = set()
+
+    def parse(self, source, filename=None):
+        """
+        Parse a CV in a worker process
+        Args:
+            source: Raw file bytes, an open binary file object (e.g. an upload) or a path
+            filename: Original file name, required unless source is a path
+        Returns:
+            dict: CVParser result, or {'error': ...} on timeout, crash or overload
+        """
+        if not self.enabled:
+            return _parse_source(CVParser(), source, filename)
+
+        if hasattr(source, 'read'):
+            # Workers get the bytes; file objects cannot cross the process boundary
+            source.seek(0)
+            source = source.read()
+
+        if os.getpid() != self._pid:
+            # Forked after workers were started: those belong to the parent
+            self._reset()
+
+        deadline = time.monotonic() + self.timeout
+        if not self._slots.acquire(timeout=self.timeout):
+            print(f"[ERROR] No parse worker free within {self.timeout}s")
+            return {'error': self.BUSY_ERROR}
+
+        worker = None
+        try:
+            worker = self._checkout()
+            worker.conn.send((source, filename))
+
+            if not worker.conn.poll(max(0.0, deadline - time.monotonic())):
+                print(f"[ERROR] CV parsing timed out after {self.timeout}s, killing worker: {filename or source}")
+                self._discard(worker)
+                worker = None
+                return {'error': self.TIMEOUT_ERROR}
+
+            result = worker.conn.recv()
+            worker.jobs_done += 1
+            return result
+
+        except (EOFError, OSError) as e:
+            # Worker died mid-job (memory limit, segfault in a native library, ...)
+            print(f"[ERROR] CV parse worker crashed: {e}")
+            if worker is not None:
+                self._discard(worker)
+                worker = None
+            return {'error': self.CRASH_ERROR}
+
+        finally:
+            if worker is not None:
+                self._checkin(worker)
+            self._slots.release()
+
+    def _checkout(self):
+        with self._lock:
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.process.is_alive():
+                    return worker
+                self._workers.discard(worker)
+            worker = _Worker(self._context, self.memory_limit_mb, self.page_workers)
+            self._workers.add(worker)
+            return worker
+
+    def _checkin(self, worker):
+        if worker.jobs_done >= self.max_jobs_per_worker or not worker.process.is_alive():
+            # Recycle long-lived workers to bound memory growth
+            self._discard(worker, graceful=True)
+            return
+        with self._lock:
+            self._idle.append(worker)
+
+    def _discard(self, worker, graceful=False):
+        with self._lock:
+            self._workers.discard(worker)
+        if graceful:
+            worker.stop()
+        else:
+            worker.kill()
+
+    def shutdown(self):
+        """Stop every worker (called at interpreter exit)"""
+        if os.getpid() != self._pid:
+            return
+        with self._lock:
+            workers = list(self._workers)
+            self._workers.clear()
+            self._idle = []
+        for worker in workers:
+            worker.stop()
@@ -0,0 +1,326 @@
+"""
+Single Flight - Identical concurrent calls share one execution
+Within a process, callers with the same key wait on the first caller's result.
+Across worker processes, the first caller holds a file lock while it runs and
+leaves its result in a small file that the waiting processes read instead of
+making the call themselves. Result files are reused only while younger than the
+result TTL, and old lock and result files are swept up periodically.
+"""
+import asyncio
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from django.conf import settings
+from .ai_deadline import remaining, DeadlineExceeded
+
+try:
+    import fcntl
+except ImportError:  # Windows: coalescing stays within each process
+    fcntl = None
+
+
+class SingleFlight:
+    """Coalesces calls that share a key; results must be JSON-serializable"""
+
+    def __init__(self, name, lock_dir=None, wait=None, result_ttl=None, sweep_interval=None):
+        """
+        Args:
+            name: Namespace for this group's lock and result files
+            lock_dir: Directory for lock and result files (defaults to settings.SINGLE_FLIGHT_DIR)
+            wait: Seconds to wait for another process before making the call anyway
+            result_ttl: Seconds another process's result is reused
+            sweep_interval: Seconds between sweeps deleting expired result files and idle lock files
+        """
+        self.name = name
+        self.lock_dir = os.path.join(str(lock_dir or settings.SINGLE_FLIGHT_DIR), name)
+        self.wait = wait if wait is not None else settings.SINGLE_FLIGHT_WAIT
+        self.result_ttl = result_ttl if result_ttl is not None else settings.SINGLE_FLIGHT_RESULT_TTL
+        self.sweep_interval = sweep_interval if sweep_interval is not None else settings.SINGLE_FLIGHT_SWEEP_INTERVAL
+        self.enabled = getattr(settings, 'SINGLE_FLIGHT_ENABLED', True)
+        self._last_sweep = None
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._tasks = set()
+        self._counters = {'calls': 0, 'coalesced': 0, 'shared': 0}
+
+    def run(self, key, func, share=bool):
+        """
+        Return func() for this key, or the result of an identical call already running
+        Args:
+            key: Hex digest of the normalized call inputs
+            func: Zero-argument callable making the call
+            share: Predicate deciding if a result may be handed to other processes
+        """
+        if not self.enabled:
+            return func()
+
+        future, leader = self._join(key)
+        if not leader:
+            # Waiting callers give up at their own request deadline
+            try:
+                return future.result(timeout=self._wait_budget())
+            except FutureTimeout:
+                raise DeadlineExceeded(f'{self.name} call {key[:12]} did not finish in time')
+
+        try:
+            result = self._run_locked(key, func, share)
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result=result)
+        return result
+
+    async def arun(self, key, afunc, share=bool):
+        """run() for coroutines: afunc is a zero-argument coroutine function"""
+        if not self.enabled:
+            return await afunc()
+
+        future, leader = self._join(key)
+        if leader:
+            # The call runs as its own task, so a caller giving up (e.g. on a deadline)
+            # leaves it running for the others
+            task = asyncio.ensure_future(self._alead(key, afunc, share, future))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self._wait_budget())
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded(f'{self.name} call {key[:12]} did not finish in time')
+
+    async def _alead(self, key, afunc, share, future):
+        try:
+            lock_file, result = await asyncio.to_thread(self._acquire, key)
+            try:
+                if result is None:
+                    self._count('calls')
+                    result = await afunc()
+                    if share(result):
+                        await asyncio.to_thread(self._write_result, key, result)
+            finally:
+                self._release(lock_file)
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            return
+        self._finish(key, future, result=result)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counters, in_flight=len(self._calls))
+
+    @staticmethod
+    def _wait_budget():
+        """Seconds left of the caller's request deadline (None waits as long as the call runs)"""
+        budget = remaining()
+        return None if budget is None else max(0.0, budget)
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def _join(self, key):
+        """(future, True) for the first caller of a key, (its future, False) for the others"""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self._counters['coalesced'] += 1
+                return future, False
+            future = Future()
+            # Running futures cannot be cancelled by a waiter that gives up
+            future.set_running_or_notify_cancel()
+            self._calls[key] = future
+            return future, True
+
+    def _finish(self, key, future, result=None, error=None):
+        with self._lock:
+            self._calls.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def _run_locked(self, key, func, share):
+        lock_file, result = self._acquire(key)
+        try:
+            if result is None:
+                self._count('calls')
+                result = func()
+                if share(result):
+                    self._write_result(key, result)
+            return result
+        finally:
+            self._release(lock_file)
+
+    def _path(self, key, suffix):
+        return os.path.join(self.lock_dir, key[:2], f"{key}.{suffix}")
+
+    def _acquire(self, key):
+        """
+        Take the cross-process lock for the key, or find another process's result
+        Returns:
+            tuple: (open lock file or None, shared result or None)
+        """
+        self._maybe_sweep()
+        result = self._read_result(key)
+        if result is not None or fcntl is None:
+            return None, result
+
+        path = self._path(key, 'lock')
+        lock_file = self._open_lock(path)
+        if lock_file is None:
+            return None, None
+
+        deadline = time.monotonic() + self.wait
+        delay = 0.02
+        while True:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                if self._is_current(lock_file, path):
+                    break
+                # The sweep deleted this file while we waited; lock the one now at the path
+                lock_file.close()
+                lock_file = self._open_lock(path)
+                if lock_file is None:
+                    return None, None
+                continue
+            except BlockingIOError:
+                pass
+            if time.monotonic() >= deadline:
+                print(f"[WARNING] Waited {self.wait:g}s for the {self.name} call {key[:12]} in another process, "
+                      f"calling directly")
+                lock_file.close()
+                return None, None
+            time.sleep(delay)
+            delay = min(delay * 2, 0.25)
+            result = self._read_result(key)
+            if result is not None:
+                lock_file.close()
+                return None, result
+
+        # The process that held the lock may have just finished the call
+        result = self._read_result(key)
+        if result is not None:
+            self._release(lock_file)
+            return None, result
+        return lock_file, None
+
+    @staticmethod
+    def _open_lock(path):
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            lock_file = open(path, 'a')
+            # The mtime marks the lock as in use for the sweep
+            os.utime(path)
+            return lock_file
+        except OSError as e:
+            print(f"Single flight lock unavailable, calling directly: {e}")
+            return None
+
+    @staticmethod
+    def _is_current(lock_file, path):
+        """True if the open lock file is still the one at path (not deleted or replaced)"""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return False
+        opened = os.fstat(lock_file.fileno())
+        return (opened.st_dev, opened.st_ino) == (stat.st_dev, stat.st_ino)
+
+    @staticmethod
+    def _release(lock_file):
+        if lock_file is not None:
+            # Closing the file drops the flock
+            lock_file.close()
+
+    def _read_result(self, key):
+        path = self._path(key, 'json')
+        try:
+            if time.time() - os.path.getmtime(path) > self.result_ttl:
+                self._remove(path)
+                return None
+            with open(path, 'r', encoding='utf-8') as file:
+                entry = json.load(file)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Single flight result unreadable for {key[:12]}: {e}")
+            return None
+        if time.time() - entry.get('finished_at', 0) > self.result_ttl:
+            return None
+        self._count('shared')
+        print(f"[OK] Reused {self.name} result for {key[:12]} from another process")
+        return entry['result']
+
+    def _write_result(self, key, result):
+        path = self._path(key, 'json')
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename so readers never see a partial result
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as file:
+                json.dump({'finished_at': time.time(), 'result': result}, file)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Single flight result write failed for {key[:12]}: {e}")
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _maybe_sweep(self):
+        """Run a sweep if sweep_interval has passed since the last one in this process"""
+        with self._lock:
+            if self._last_sweep is not None and time.monotonic() - self._last_sweep < self.sweep_interval:
+                return
+            self._last_sweep = time.monotonic()
+        try:
+            self._sweep()
+        except Exception as e:
+            print(f"Single flight sweep failed for {self.name}: {e}")
+
+    def _sweep(self):
+        """Delete expired result files, leftover temp files and lock files nobody holds or used lately"""
+        now = time.time()
+        removed = 0
+        for bucket in os.scandir(self.lock_dir) if os.path.isdir(self.lock_dir) else ():
+            if not bucket.is_dir():
+                continue
+            for entry in os.scandir(bucket.path):
+                try:
+                    age = now - entry.stat().st_mtime
+                except OSError:
+                    continue
+                if entry.name.endswith('.json') and age > self.result_ttl:
+                    self._remove(entry.path)
+                    removed += 1
+                elif entry.name.endswith('.tmp') and age > self.sweep_interval:
+                    self._remove(entry.path)
+                    removed += 1
+                elif entry.name.endswith('.lock') and age > self.sweep_interval and self._remove_idle_lock(entry.path):
+                    removed += 1
+        if removed:
+            print(f"[OK] Swept {removed} old {self.name} single flight files")
+
+    def _remove_idle_lock(self, path):
+        """
+        Delete a lock file, unless a process holds it
+        The file is deleted while locked, and lockers check they hold the file still at the
+        path, so a process that locks the deleted file retries instead of becoming a second leader.
+        """
+        if fcntl is None:
+            return False
+        try:
+            with open(path, 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                if not self._is_current(lock_file, path):
+                    return False
+                os.remove(path)
+            return True
+        except OSError:
+            return False
@@ -0,0 +1,185 @@
+"""
+Skill Matcher - Finds every known skill in CV text in a single pass
+Uses an Aho-Corasick automaton built from a skill taxonomy (canonical name -> synonyms)
+"""
+import json
+import re
+import threading
+from collections import deque
+from django.conf import settings
+
+
+# Default taxonomy: canonical skill name -> extra synonyms (the name itself is always matched)
+DEFAULT_TECH_SKILLS = {
+    'Python': [], 'Java': [], 'JavaScript': ['JS', 'ECMAScript'], 'C++': ['CPP'],
+    'C#': ['CSharp'], 'SQL': [], 'HTML': ['HTML5'], 'CSS': ['CSS3'],
+    'React': ['ReactJS', 'React.js'], 'Angular': ['AngularJS'], 'Vue': ['Vue.js', 'VueJS'],
+    'Node.js': ['NodeJS'], 'Django': [], 'Flask': [], 'Spring': ['Spring Boot'],
+    'MongoDB': ['Mongo'], 'PostgreSQL': ['Postgres'], 'MySQL': [], 'AWS': ['Amazon Web Services'],
+    'Azure': ['Microsoft Azure'], 'GCP': ['Google Cloud', 'Google Cloud Platform'], 'Docker': [],
+    'Kubernetes': ['k8s'], 'Git': [], 'Jenkins': [], 'Agile': [], 'Scrum': [],
+    'REST API': ['REST APIs', 'RESTful', 'RESTful API', 'RESTful APIs'],
+    'Machine Learning': ['ML'], 'Data Analysis': ['Data Analytics'], 'Excel': ['MS Excel'],
+    'PowerPoint': [], 'Tableau': [], 'Power BI': ['PowerBI'], 'Pandas': [], 'NumPy': [],
+    'TensorFlow': [], 'Scikit-learn': ['sklearn', 'scikit learn'], 'PHP': [], 'Bootstrap': [],
+    'Cisco': [], 'OOP': ['Object Oriented Programming', 'Object-Oriented Programming'],
+    'Full Stack': ['Full-Stack', 'Fullstack'], 'Web Development': [], 'NoSQL': [], 'SQLite': [],
+    'Plotly': [], 'SMOTE': [], 'SVM': ['Support Vector Machine', 'Support Vector Machines'],
+    'Random Forest': [], 'K-Means': ['KMeans'], 'DBSCAN': [],
+}
+
+DEFAULT_SOFT_SKILLS = {
+    'Communication': [], 'Leadership': [], 'Teamwork': ['Team Work'],
+    'Problem Solving': ['Problem-Solving'], 'Critical Thinking': [],
+    'Time Management': [], 'Project Management': [],
+}
+
+
+class SkillMatcher:
+    """
+    Multi-pattern skill matcher (Aho-Corasick) with word-boundary rules.
+    Cost is one pass over the text regardless of how many skills are in the taxonomy.
+    """
+
+    def __init__(self, taxonomy):
+        """
+        Args:
+            taxonomy: Dict of canonical skill name -> list of synonyms
+        """
+        # Trie stored as parallel lists: goto transitions, failure links, outputs
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        self.skill_count = 0
+
+        for canonical, synonyms in taxonomy.items():
+            self.skill_count += 1
+            for pattern in [canonical] + list(synonyms or []):
+                self._add_pattern(self._normalize(pattern), canonical)
+
+        self._build_failure_links()
+
+    @staticmethod
+    def _normalize(text):
+        """Lowercase and collapse whitespace so line breaks inside a skill still match"""
+        return re.sub(r'\s+', ' ', text.lower()).strip()
+
+    def _add_pattern(self, pattern, canonical):
+        if not pattern:
+            return
+        state = 0
+        for ch in pattern:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][ch] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append((len(pattern), canonical))
+
+    def _build_failure_links(self):
+        """Breadth-first pass to compute failure links and merge outputs"""
+        queue = deque()
+        for next_state in self._goto[0].values():
+            queue.append(next_state)
+
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(ch, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    @staticmethod
+    def _is_boundary(text, index):
+        """True if the character at index cannot continue a word (or is outside the text)"""
+        if index < 0 or index >= len(text):
+            return True
+        return not text[index].isalnum()
+
+    @classmethod
+    def _is_left_boundary(cls, text, start):
+        """
+        True if a match can start at start: like _is_boundary, except that a '.' joining two
+        word characters continues the word, so "js" in "node.js" is not a match of its own
+        """
+        if not cls._is_boundary(text, start - 1):
+            return False
+        return not (text[start - 1:start] == '.' and start >= 2 and text[start - 2].isalnum()
+                    and start < len(text) and text[start].isalnum())
+
+    def find_skills(self, text):
+        """
+        Find every taxonomy skill mentioned in the text
+        Args:
+            text: CV text
+        Returns:
+            list: Canonical skill names in order of first appearance
+        """
+        text = self._normalize(text)
+        goto, fail, output = self._goto, self._fail, self._output
+        found = []
+        seen = set()
+        state = 0
+
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+
+            for length, canonical in output[state]:
+                if canonical in seen:
+                    continue
+                start = i - length + 1
+                # Reject partial words: "Java" inside "JavaScript", "Git" inside "GitHub"
+                if self._is_left_boundary(text, start) and self._is_boundary(text, i + 1):
+                    seen.add(canonical)
+                    found.append(canonical)
+
+        return found
+
+
+def load_taxonomy(path):
+    """
+    Load a skill taxonomy from a JSON file
+    Accepts {"Kubernetes": ["k8s"], ...} or a flat list of skill names
+    """
+    with open(path, 'r', encoding='utf-8') as file:
+        data = json.load(file)
+    if isinstance(data, list):
+        return {name: [] for name in data}
+    return {name: list(synonyms or []) for name, synonyms in data.items()}
+
+
+_default_matcher = None
+_default_matcher_lock = threading.Lock()
+
+
+def get_skill_matcher():
+    """
+    Return the process-wide matcher, compiled once on first use.
+    Built from the default taxonomy plus settings.SKILL_TAXONOMY_FILE when configured.
+    """
+    global _default_matcher
+    if _default_matcher is None:
+        with _default_matcher_lock:
+            if _default_matcher is None:
+                taxonomy = dict(DEFAULT_TECH_SKILLS)
+                taxonomy.update(DEFAULT_SOFT_SKILLS)
+
+                taxonomy_file = getattr(settings, 'SKILL_TAXONOMY_FILE', None)
+                if taxonomy_file:
+                    try:
+                        for name, synonyms in load_taxonomy(taxonomy_file).items():
+                            taxonomy[name] = list(taxonomy.get(name, [])) + synonyms
+                    except Exception as e:
+                        print(f"Could not load skill taxonomy from {taxonomy_file}: {e}")
+
+                _default_matcher = SkillMatcher(taxonomy)
+                print(f"[OK] Skill matcher compiled with {_default_matcher.skill_count} skills")
+    return _default_matcher
@@ -1,33 +1,44 @@
 from django.shortcuts import render, redirect
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
+from django.urls import reverse
 from django.views.decorators.csrf import csrf_exempt
 from django.conf import settings
+from django.core.files.base import ContentFile
 from django.core.files.storage import FileSystemStorage
+from asgiref.sync import sync_to_async
 from .forms import CVUploadForm, JobPreferenceForm, GovernmentJobSearchForm, CompanyJobSearchForm
-from .utils.cv_parser import CVParser
-from .utils.ai_matcher import AIJobMatcher
+from .utils.ai_matcher import AIJobMatcher, chat_memory, empty_match_results
+from .utils.ai_dispatcher import session_bucket, INTERACTIVE
+from .utils.ai_deadline import ai_deadline, remaining
+from .utils.mongo import get_collection
+from .utils.parse_cache import ParseCache
+from .utils.parse_pool import CVParsePool
+from .utils.parse_jobs import ParseJobQueue
+from .utils.match_cache import MatchCache
+from .utils.job_listings import (
+    government_filters, company_filters, government_listing_cache, company_listing_cache
+)
+import asyncio
 import json
-from pymongo import MongoClient
+import os
 from datetime import datetime
 import traceback
 
-# MongoDB connection
-try:
-    mongo_client = MongoClient(
-        host=settings.MONGODB_SETTINGS['host'],
-        port=settings.MONGODB_SETTINGS['port'],
-        serverSelectionTimeoutMS=2000
-    )
-    mongo_db = mongo_client[settings.MONGODB_SETTINGS['db']]
-    cv_collection = mongo_db['cv_data']
-    chat_collection = mongo_db['chat_history']
-    mongo_client.server_info()
-    print("MongoDB connected successfully")
-except Exception as e:
-    print(f"MongoDB connection error: {e}")
-    print("Application will continue without MongoDB")
-    cv_collection = None
-    chat_collection = None
+# MongoDB collections (None when MongoDB is not available)
+cv_collection = get_collection('cv_data')
+chat_collection = get_collection('chat_history')
+
+# Parsed CVs keyed by the SHA-256 of the uploaded bytes
+cv_parse_cache = ParseCache(get_collection('cv_parse_cache'))
+
+# Parsing runs in worker processes so a bad file cannot pin a web worker
+cv_parse_pool = CVParsePool()
+
+# Background CV processing for the asynchronous upload mode
+cv_parse_jobs = ParseJobQueue(get_collection('cv_parse_jobs'))
+
+# match_jobs results keyed on the CV profile and preferences (optional MongoDB tier)
+match_cache = MatchCache(get_collection('match_cache') if settings.MATCH_CACHE_SHARED else None)
 
 
 def home(request):
@@ -35,6 +46,91 @@ def home(request):
     return render(request, 'home.html')
 
 
+# The AI-bound views below are async so one ASGI worker can wait on many model
+# calls at once. Sessions, templates and pymongo are synchronous and run in threads.
+arender = sync_to_async(render)
+
+
+async def _asession_get(request, key, default=None):
+    """request.session.get for async views (the first access loads the session from the database)"""
+    return await sync_to_async(request.session.get)(key, default)
+
+
+async def _arate_limit(request, cost=1):
+    """Seconds this session must wait before making about `cost` more AI calls (0 when allowed)"""
+    return await sync_to_async(session_bucket.take)(request.session, cost)
+
+
+def _rate_limit_message(wait):
+    return f"You're sending requests faster than we can answer them. Please wait {wait} seconds and try again."
+
+
+def _store_cv_document(filename, file_path, content_hash, cv_data):
+    """Store a parsed CV in MongoDB and return its id (None when MongoDB is unavailable)"""
+    if cv_collection is None:
+        return None
+    
+    cv_document = {
+        'filename': filename,
+        'file_path': file_path,
+        'content_hash': content_hash,
+        'cv_data': cv_data,
+        'uploaded_at': datetime.now().isoformat()
+    }
+    try:
+        result = cv_collection.insert_one(cv_document)
+        cv_id = str(result.inserted_id)
+        print(f"CV stored in MongoDB with ID: {cv_id}")
+        return cv_id
+    except Exception as mongo_error:
+        print(f"MongoDB storage failed: {mongo_error}")
+        return None
+
+
+def _save_original_cv(name, data):
+    """Persist the original upload - deferred off the request's critical path"""
+    fs = FileSystemStorage(location=settings.MEDIA_ROOT / 'cvs')
+    if not fs.exists(name):
+        fs.save(name, ContentFile(data))
+
+
+def _process_cv_file(filename, source, content_hash):
+    """
+    Parse an uploaded CV straight from memory, cache and store the result
+    Runs inline or as a background job; source is the upload object or its bytes
+    """
+    cv_data = cv_parse_pool.parse(source, filename)
+    
+    # Originals are stored under their content hash, so the path is known before the write
+    file_path = None
+    if settings.CV_STORE_ORIGINALS and 'error' not in cv_data:
+        name = content_hash + os.path.splitext(filename)[1].lower()
+        file_path = str(settings.MEDIA_ROOT / 'cvs' / name)
+        if not isinstance(source, bytes):
+            source.seek(0)
+            source = source.read()
+        cv_parse_jobs.defer(_save_original_cv, name, source)
+    
+    cv_parse_cache.set(content_hash, cv_data, file_path)
+    
+    if 'error' in cv_data:
+        return cv_data
+    
+    return {
+        'cv_data': cv_data,
+        'cv_id': _store_cv_document(filename, file_path, content_hash, cv_data),
+        'filename': filename
+    }
+
+
+def _set_session_cv(request, result):
+    """Make a processed CV the session's current CV"""
+    request.session['cv_data'] = result['cv_data']
+    request.session['cv_id'] = result.get('cv_id')
+    request.session['filename'] = result.get('filename')
+    request.session.pop('cv_parse_job', None)
+
+
 def upload_cv(request):
     """CV upload and parsing view - Using MongoDB"""
     if request.method == 'POST':
@@ -59,41 +155,60 @@ def upload_cv(request):
                     'error': 'File size must be less than 10MB.'
                 })
             
-            fs = FileSystemStorage(location=settings.MEDIA_ROOT / 'cvs')
-            filename = fs.save(uploaded_file.name, uploaded_file)
-            file_path = fs.path(filename)
-            
-            parser = CVParser()
-            cv_data = parser.parse_cv(file_path)
+            # Re-uploads of the same CV skip saving and parsing
+            content_hash = cv_parse_cache.hash_file(uploaded_file)
+            cached = cv_parse_cache.get(content_hash)
+            async_mode = settings.CV_UPLOAD_ASYNC or request.POST.get('async') == '1'
+            wants_json = 'application/json' in request.headers.get('Accept', '')
             
-            if 'error' not in cv_data:
-                cv_document = {
-                    'filename': uploaded_file.name,
-                    'file_path': file_path,
-                    'cv_data': cv_data,
-                    'uploaded_at': datetime.now().isoformat()
+            if cached:
+                result = {
+                    'cv_data': cached['cv_data'],
+                    'cv_id': _store_cv_document(
+                        uploaded_file.name, cached.get('file_path'), content_hash, cached['cv_data']
+                    ),
+                    'filename': uploaded_file.name
                 }
+            elif async_mode:
+                # Return straight away; the preferences page polls cv_parse_status
+                uploaded_file.seek(0)
+                job_id = cv_parse_jobs.submit(
+                    _process_cv_file, uploaded_file.name, uploaded_file.read(), content_hash,
+                    filename=uploaded_file.name
+                )
+                request.session['cv_parse_job'] = job_id
+                request.session.pop('pending_job_preferences', None)
+                request.session.pop('cv_data', None)
+                request.session.pop('cv_id', None)
+                print(f"[OK] CV queued for background parsing, job {job_id}")
                 
-                if cv_collection is not None:
-                    try:
-                        result = cv_collection.insert_one(cv_document)
-                        cv_id = str(result.inserted_id)
-                        print(f"CV stored in MongoDB with ID: {cv_id}")
-                    except Exception as mongo_error:
-                        print(f"MongoDB storage failed: {mongo_error}")
-                        cv_id = None
-                else:
-                    cv_id = None
-                
-                request.session['cv_data'] = cv_data
-                request.session['cv_id'] = cv_id
-                request.session['filename'] = uploaded_file.name
+                if wants_json:
+                    return JsonResponse({
+                        'job_id': job_id,
+                        'status': ParseJobQueue.PENDING,
+                        'status_url': reverse('cv_parse_status', args=[job_id]),
+                        'success': True
+                    }, status=202)
+                return redirect('job_preferences')
+            else:
+                # Parsed straight from the upload buffer - no save-then-reopen round-trip
+                result = _process_cv_file(uploaded_file.name, uploaded_file, content_hash)
+            
+            if 'error' not in result:
+                _set_session_cv(request, result)
                 
+                if async_mode and wants_json:
+                    return JsonResponse({
+                        'job_id': None,
+                        'status': ParseJobQueue.DONE,
+                        'redirect': reverse('job_preferences'),
+                        'success': True
+                    })
                 return redirect('job_preferences')
             else:
                 return render(request, 'upload_cv.html', {
                     'form': CVUploadForm(),
-                    'error': cv_data['error']
+                    'error': result['error']
                 })
                 
         except Exception as e:
@@ -109,17 +224,172 @@ def upload_cv(request):
     return render(request, 'upload_cv.html', {'form': form})
 
 
-def job_preferences(request):
+def cv_parse_status(request, job_id):
+    """JSON status of a background CV parse job - polled by the preferences page"""
+    if request.session.get('cv_parse_job') != job_id:
+        return JsonResponse({'error': 'Unknown parse job', 'success': False}, status=404)
+    
+    job = cv_parse_jobs.get(job_id)
+    if job is None:
+        return JsonResponse({'error': 'Unknown parse job', 'success': False}, status=404)
+    
+    response = {'job_id': job_id, 'status': job['status'], 'success': True}
+    
+    if job['status'] == ParseJobQueue.DONE:
+        _set_session_cv(request, job)
+        response['redirect'] = reverse('job_preferences')
+    elif job['status'] == ParseJobQueue.FAILED:
+        request.session.pop('cv_parse_job', None)
+        response['error'] = job.get('error', 'Error processing CV')
+        response['success'] = False
+    
+    return JsonResponse(response)
+
+
+def _listing_title(job_preferences):
+    """
+    Job title for the listing searches that is known before matching finishes: the preferred one.
+    Without it (None) the listings wait for matching and use its top suggested title.
+    """
+    return job_preferences.get('job_title') or None
+
+
+def _matched_title(matching_results):
+    titles = matching_results.get('suitable_job_titles') if matching_results else None
+    return titles[0] if titles else 'General Position'
+
+
+async def _amatch(cv_data, job_preferences):
+    matching_results = await match_cache.aget(cv_data, job_preferences)
+    if matching_results is None:
+        matching_results = await AIJobMatcher().amatch_jobs(cv_data, job_preferences)
+        await match_cache.aset(cv_data, job_preferences, matching_results)
+    print(f"Match cache: {match_cache.stats()}")
+    return matching_results
+
+
+async def _acompany_listings(job_preferences, title, match_task):
+    if title is None:
+        # Nothing to search for until matching suggests a title
+        title = _matched_title(await match_task)
+    jobs = await company_listing_cache.aget({
+        'country': job_preferences.get('location', 'Global'),
+        'state': '',
+        'job_title': title,
+        'experience_level': job_preferences.get('experience_level', 'entry'),
+        'company': ''
+    })
+    for job in jobs:
+        job['source'] = 'LinkedIn'  # Mark as general job board source
+    return jobs
+
+
+async def _agovernment_listings(job_preferences, title, match_task):
+    if title is None:
+        title = _matched_title(await match_task)
+    filters = government_filters(job_title=title)
+    if job_preferences.get('location'):
+        filters['country'] = job_preferences['location']
+    jobs = await government_listing_cache.aget(filters)
+    for job in jobs:
+        # Shape government listings like the others for the results page
+        job.setdefault('company', job.get('organization', ''))
+        job.setdefault('link', job.get('official_link', ''))
+        job['source'] = job.get('organization') or 'Government'
+        job['category'] = 'government'
+    return jobs
+
+
+async def _agather_matches(cv_data, job_preferences):
+    """
+    Run matching and the listing generations concurrently under settings.JOB_MATCH_DEADLINE
+    Listings search the preferred job title so they need not wait for matching; without one
+    they start once matching has suggested a title.
+    Each OpenAI call only gets the part of the deadline that is left when it starts.
+    Returns:
+        tuple: (matching_results, job_listings); calls that fail or miss the deadline add nothing
+    """
+    with ai_deadline(settings.JOB_MATCH_DEADLINE):
+        title = _listing_title(job_preferences)
+
+        # Tasks copy the current context, so they inherit the deadline
+        match_task = asyncio.ensure_future(_amatch(cv_data, job_preferences))
+        tasks = {match_task: 'matching'}
+        tasks[asyncio.ensure_future(_acompany_listings(job_preferences, title, match_task))] = 'company listings'
+        if job_preferences.get('job_type', 'all') in ('all', 'government'):
+            tasks[asyncio.ensure_future(_agovernment_listings(job_preferences, title, match_task))] = 'government listings'
+
+        matching_results = None
+        job_listings = []
+        pending = set(tasks)
+        try:
+            while pending:
+                budget = remaining()
+                if budget <= 0:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=budget, return_when=asyncio.FIRST_COMPLETED)
+                # Merge results as each call finishes
+                for task in done:
+                    if task.exception() is not None:
+                        print(f"[ERROR] {tasks[task]} failed: {task.exception()}")
+                        continue
+                    if task is match_task:
+                        matching_results = task.result()
+                    else:
+                        job_listings.extend(task.result())
+                        print(f"[JOB MATCHING] {tasks[task]}: {len(task.result())} jobs")
+        finally:
+            for task in pending:
+                print(f"[WARNING] {tasks[task]} missed the {settings.JOB_MATCH_DEADLINE:g}s deadline, cancelling")
+                task.cancel()
+            if pending:
+                await asyncio.wait(pending)
+
+        return matching_results, job_listings
+
+
+async def job_preferences(request):
     """Job preferences and matching view with date filter"""
-    cv_data = request.session.get('cv_data')
+    cv_data = await _asession_get(request, 'cv_data')
     
     if not cv_data:
-        return redirect('upload_cv')
+        parse_job_id = request.session.get('cv_parse_job')
+        if not parse_job_id:
+            return redirect('upload_cv')
+        
+        # CV is still being parsed in the background - the page polls for the result.
+        # Preferences submitted meanwhile are kept and searched once the CV is ready.
+        queued = request.session.get('pending_job_preferences')
+        if request.method == 'POST':
+            pref_form = JobPreferenceForm(request.POST)
+            if pref_form.is_valid():
+                queued = request.session['pending_job_preferences'] = pref_form.cleaned_data
+        else:
+            pref_form = JobPreferenceForm(initial=queued)
+        
+        return await arender(request, 'job_preferences.html', {
+            'form': pref_form,
+            'cv_data': None,
+            'parse_job_id': parse_job_id,
+            'parse_status_url': reverse('cv_parse_status', args=[parse_job_id]),
+            'preferences_queued': bool(queued)
+        })
     
-    if request.method == 'POST':
-        pref_form = JobPreferenceForm(request.POST)
+    queued = request.session.pop('pending_job_preferences', None)
+    if request.method == 'POST' or queued:
+        pref_form = JobPreferenceForm(request.POST if request.method == 'POST' else queued)
         
         if pref_form.is_valid():
+            # Matching plus company (and government) listings
+            cost = 3 if pref_form.cleaned_data.get('job_type', 'all') in ('all', 'government') else 2
+            wait = await _arate_limit(request, cost)
+            if wait:
+                return await arender(request, 'job_preferences.html', {
+                    'form': pref_form,
+                    'cv_data': cv_data,
+                    'error': _rate_limit_message(wait)
+                }, status=429)
+
             try:
                 job_preferences = {
                     'job_type': pref_form.cleaned_data.get('job_type', 'all'),
@@ -132,27 +402,13 @@ def job_preferences(request):
                 print(f"Job preferences: {job_preferences}")
                 print(f"Date filter: {job_preferences['date_posted']}")
                 
-                matcher = AIJobMatcher()
-                matching_results = matcher.match_jobs(cv_data, job_preferences)
-
-                # Generate actual job listings using OpenAI based on CV and preferences
-                print("[JOB MATCHING] Generating job listings using OpenAI API...")
-
-                job_filters = {
-                    'country': job_preferences.get('location', 'Global'),
-                    'state': '',
-                    'job_title': matching_results.get('suitable_job_titles', ['General'])[0] if matching_results.get('suitable_job_titles') else 'General Position',
-                    'experience_level': job_preferences.get('experience_level', 'entry'),
-                    'company': ''
-                }
-
-                job_listings = matcher.generate_job_listings(job_filters)
+                # Matching and job listing generation (OpenAI API) run side by side
+                print("[JOB MATCHING] Matching CV and generating job listings using OpenAI API...")
+                matching_results, job_listings = await _agather_matches(cv_data, job_preferences)
+                if matching_results is None:
+                    matching_results = empty_match_results()
                 print(f"[JOB MATCHING] Generated {len(job_listings)} jobs using OpenAI")
 
-                # Add source field to each job for categorization
-                for job in job_listings:
-                    job['source'] = 'LinkedIn'  # Mark as general job board source
-
                 request.session['job_listings'] = job_listings
                 request.session['matching_results'] = matching_results
                 request.session['job_preferences'] = job_preferences
@@ -165,12 +421,7 @@ def job_preferences(request):
 
                 # No fallback - OpenAI API required
                 request.session['job_listings'] = []
-                request.session['matching_results'] = {
-                    'suitable_job_titles': [],
-                    'government_queries': [],
-                    'company_queries': [],
-                    'recommended_sectors': []
-                }
+                request.session['matching_results'] = empty_match_results()
                 request.session['job_preferences'] = job_preferences
 
                 return redirect('job_results')
@@ -182,7 +433,7 @@ def job_preferences(request):
         'cv_data': cv_data
     }
     
-    return render(request, 'job_preferences.html', context)
+    return await arender(request, 'job_preferences.html', context)
 
 
 def job_results(request):
@@ -223,7 +474,7 @@ def job_results(request):
         source = job.get('source', '')
         
         # Categorize each job
-        if any(keyword in source for keyword in gov_keywords):
+        if job.get('category') == 'government' or any(keyword in source for keyword in gov_keywords):
             government_jobs.append(job)
         elif any(keyword in source for keyword in company_keywords):
             company_jobs.append(job)
@@ -260,8 +511,67 @@ def chatbot(request):
     return render(request, 'chatbot.html', context)
 
 
+def _log_chat(user_message, ai_response, mode, cv_data):
+    """Store a chat exchange in MongoDB"""
+    try:
+        if chat_collection is not None:
+            chat_document = {
+                'user_message': user_message,
+                'ai_response': ai_response,
+                'mode': mode,
+                'cv_data_available': cv_data is not None,
+                'timestamp': datetime.now().isoformat()
+            }
+            chat_collection.insert_one(chat_document)
+    except Exception as mongo_error:
+        print(f"MongoDB logging failed: {mongo_error}")
+
+
+def _sse_event(data, event=None):
+    """One Server-Sent Events frame with a JSON payload"""
+    frame = f"event: {event}\n" if event else ""
+    return f"{frame}data: {json.dumps(data)}\n\n"
+
+
+async def _stream_chat(user_message, conversation_history, mode, cv_data, summarize_history=True):
+    """
+    Stream a chat reply as SSE frames: 'data' frames carry {"delta": ...},
+    then one 'done' frame with the full reply (or an 'error' frame)
+    """
+    matcher = AIJobMatcher(priority=INTERACTIVE, summarize_history=summarize_history)
+    deltas = None
+    parts = []
+    try:
+        with ai_deadline(settings.AI_REQUEST_DEADLINE):
+            # Building the prompt under the deadline also bounds a history summary it starts
+            if mode == 'job':
+                deltas = matcher.astream_chatbot_response(user_message, cv_data, conversation_history)
+            else:
+                deltas = matcher.astream_general_chat_response(user_message, conversation_history)
+            async for delta in deltas:
+                parts.append(delta)
+                yield _sse_event({'delta': delta})
+        if not ''.join(parts).strip():
+            raise Exception("Failed to generate response")
+    except Exception as ai_error:
+        print(f"AI Error: {ai_error}")
+        traceback.print_exc()
+        yield _sse_event({
+            'response': "I apologize for the error. Please try rephrasing your question!"
+        }, event='error')
+        return
+    finally:
+        # Also runs when the browser disconnects mid-reply, ending the upstream stream
+        if deltas is not None:
+            await deltas.aclose()
+
+    ai_response = ''.join(parts).strip()
+    await sync_to_async(_log_chat, thread_sensitive=False)(user_message, ai_response, mode, cv_data)
+    yield _sse_event({'response': ai_response}, event='done')
+
+
 @csrf_exempt
-def chat_api(request):
+async def chat_api(request):
     """API endpoint for chatbot with dual mode support"""
     if request.method == 'POST':
         try:
@@ -283,24 +593,50 @@ def chat_api(request):
                     'success': True
                 })
             
-            cv_data = request.session.get('cv_data')
+            wait = await _arate_limit(request)
+            if wait:
+                response = JsonResponse({
+                    'response': _rate_limit_message(wait),
+                    'success': False,
+                    'retry_after': wait
+                }, status=429)
+                response['Retry-After'] = str(wait)
+                return response
+            
+            cv_data = await _asession_get(request, 'cv_data')
+            
+            # A summary of older turns is one more model call; it is made only if the session can pay for it
+            summarize_history = (chat_memory.summary_due(conversation_history)
+                                 and not await _arate_limit(request))
+            
+            # Streaming mode: tokens are sent as Server-Sent Events while they are generated
+            if data.get('stream') and settings.CHAT_STREAMING_ENABLED:
+                response = StreamingHttpResponse(
+                    _stream_chat(user_message, conversation_history, mode, cv_data, summarize_history),
+                    content_type='text/event-stream'
+                )
+                response['Cache-Control'] = 'no-cache'
+                response['X-Accel-Buffering'] = 'no'  # Stop nginx from buffering the stream
+                return response
             
             try:
-                matcher = AIJobMatcher()
+                # Chat replies may use the slots reserved for interactive calls
+                matcher = AIJobMatcher(priority=INTERACTIVE, summarize_history=summarize_history)
                 
-                if mode == 'job':
-                    # Job Assistant mode
-                    ai_response = matcher.generate_chatbot_response(
-                        user_message, 
-                        cv_data, 
-                        conversation_history
-                    )
-                else:
-                    # AI Chat mode
-                    ai_response = matcher.generate_general_chat_response(
-                        user_message, 
-                        conversation_history
-                    )
+                with ai_deadline(settings.AI_REQUEST_DEADLINE):
+                    if mode == 'job':
+                        # Job Assistant mode
+                        ai_response = await matcher.agenerate_chatbot_response(
+                            user_message, 
+                            cv_data, 
+                            conversation_history
+                        )
+                    else:
+                        # AI Chat mode
+                        ai_response = await matcher.agenerate_general_chat_response(
+                            user_message, 
+                            conversation_history
+                        )
                 
                 if not ai_response or ai_response.startswith("Error:"):
                     raise Exception("Failed to generate response")
@@ -321,18 +657,7 @@ def chat_api(request):
                     })
             
             # Store in MongoDB
-            try:
-                if chat_collection is not None:
-                    chat_document = {
-                        'user_message': user_message,
-                        'ai_response': ai_response,
-                        'mode': mode,
-                        'cv_data_available': cv_data is not None,
-                        'timestamp': datetime.now().isoformat()
-                    }
-                    chat_collection.insert_one(chat_document)
-            except Exception as mongo_error:
-                print(f"MongoDB logging failed: {mongo_error}")
+            await sync_to_async(_log_chat, thread_sensitive=False)(user_message, ai_response, mode, cv_data)
             
             return JsonResponse({
                 'response': ai_response,
@@ -353,10 +678,8 @@ def chat_api(request):
     }, status=405)
 
 
-def government_jobs(request):
+async def government_jobs(request):
     """Government jobs portal - Uses OpenAI API for 100% real government job data"""
-    from core.utils.ai_matcher import AIJobMatcher
-
     form = GovernmentJobSearchForm(request.GET or None)
 
     # Get search parameters
@@ -364,33 +687,22 @@ def government_jobs(request):
     state = request.GET.get('state', '').strip()
     job_title = request.GET.get('job_title', '').strip()
 
-    # Map country codes to full names
-    country_names = {
-        'UK': 'United Kingdom',
-        'USA': 'United States',
-        'India': 'India',
-        'Canada': 'Canada',
-        'Australia': 'Australia',
-        'EU': 'European Union',
-        'Singapore': 'Singapore',
-        'UAE': 'United Arab Emirates',
-        'NewZealand': 'New Zealand',
-        'Ireland': 'Ireland',
-        'Germany': 'Germany',
-        'France': 'France',
-    }
+    filters = government_filters(country_code, state, job_title)
+
+    # Pages served fresh from the cache make no AI call, so they cost no tokens
+    wait = 0 if await government_listing_cache.ais_fresh(filters) else await _arate_limit(request)
+    if wait:
+        return await arender(request, 'government_jobs.html', {
+            'form': form,
+            'jobs': [],
+            'error': _rate_limit_message(wait)
+        }, status=429)
 
     # ALWAYS generate jobs when page loads or when searched
     try:
-        ai_matcher = AIJobMatcher()
-        filters = {
-            'country': country_names.get(country_code, 'United Kingdom') if country_code else 'United Kingdom',
-            'state': state,
-            'job_title': job_title if job_title else 'Government Jobs'
-        }
-
         print(f"[GOVERNMENT JOBS] Generating jobs using OpenAI API: {filters}")
-        api_jobs = ai_matcher.generate_government_jobs(filters)
+        with ai_deadline(settings.AI_REQUEST_DEADLINE):
+            api_jobs = await government_listing_cache.aget(filters)
 
         if api_jobs:
             print(f"[OK] Successfully generated {len(api_jobs)} government jobs from OpenAI")
@@ -398,14 +710,14 @@ def government_jobs(request):
                 'form': form,
                 'jobs': api_jobs
             }
-            return render(request, 'government_jobs.html', context)
+            return await arender(request, 'government_jobs.html', context)
         else:
             print("[WARNING] OpenAI returned no government jobs, showing empty results")
             context = {
                 'form': form,
                 'jobs': []
             }
-            return render(request, 'government_jobs.html', context)
+            return await arender(request, 'government_jobs.html', context)
     except Exception as e:
         print(f"[ERROR] Error using OpenAI for government jobs: {e}")
         import traceback
@@ -414,13 +726,11 @@ def government_jobs(request):
             'form': form,
             'jobs': []
         }
-        return render(request, 'government_jobs.html', context)
+        return await arender(request, 'government_jobs.html', context)
 
 
-def company_jobs(request):
+async def company_jobs(request):
     """Company jobs portal with search and filters - Uses OpenAI API for dynamic job generation"""
-    from core.utils.ai_matcher import AIJobMatcher
-
     form = CompanyJobSearchForm(request.GET or None)
 
     # Get filter parameters early
@@ -435,32 +745,20 @@ def company_jobs(request):
 
     # Try to use OpenAI API if user searched with filters
     if user_searched:
-        try:
-            # Map country code to full name
-            country_names = {
-                'UK': 'United Kingdom',
-                'USA': 'United States',
-                'India': 'India',
-                'Canada': 'Canada',
-                'Australia': 'Australia',
-                'Singapore': 'Singapore',
-                'UAE': 'United Arab Emirates',
-                'Germany': 'Germany',
-                'Ireland': 'Ireland',
-            }
-
-            ai_matcher = AIJobMatcher()
-            filters = {
-                'country': country_names.get(country_code, country_code) if country_code else 'Global',
-                'state': state,
-                'job_title': job_title_param if job_title_param else 'General/Any Position',
-                'experience_level': experience_level,
-                'company': company_filter
-            }
+        filters = company_filters(country_code, state, job_title_param, experience_level, company_filter)
+        wait = 0 if await company_listing_cache.ais_fresh(filters) else await _arate_limit(request)
+        if wait:
+            return await arender(request, 'company_jobs.html', {
+                'form': form,
+                'jobs': [],
+                'error': _rate_limit_message(wait)
+            }, status=429)
 
+        try:
             # Generate jobs using OpenAI API
             print(f"[COMPANY JOBS] Generating jobs using OpenAI API with filters: {filters}")
-            api_jobs = ai_matcher.generate_job_listings(filters)
+            with ai_deadline(settings.AI_REQUEST_DEADLINE):
+                api_jobs = await company_listing_cache.aget(filters)
 
             if api_jobs:
                 print(f"[OK] Successfully generated {len(api_jobs)} jobs from OpenAI")
@@ -468,14 +766,14 @@ def company_jobs(request):
                     'form': form,
                     'jobs': api_jobs
                 }
-                return render(request, 'company_jobs.html', context)
+                return await arender(request, 'company_jobs.html', context)
             else:
                 print("[WARNING] OpenAI returned no jobs, showing empty results")
                 context = {
                     'form': form,
                     'jobs': []
                 }
-                return render(request, 'company_jobs.html', context)
+                return await arender(request, 'company_jobs.html', context)
         except Exception as e:
             print(f"[ERROR] Error using OpenAI API: {e}")
             import traceback
@@ -484,14 +782,14 @@ def company_jobs(request):
                 'form': form,
                 'jobs': []
             }
-            return render(request, 'company_jobs.html', context)
+            return await arender(request, 'company_jobs.html', context)
 
     # If no search was performed, show empty results (user must search to get OpenAI data)
     context = {
         'form': form,
         'jobs': []
     }
-    return render(request, 'company_jobs.html', context)
+    return await arender(request, 'company_jobs.html', context)
 
 
 def reset_session(request):
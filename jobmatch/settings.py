@@ -79,6 +79,125 @@ MONGODB_SETTINGS = {
 
 # OpenAI Configuration
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
+# One pooled client per process; connections are kept alive and reused across requests
+OPENAI_TIMEOUT = float(os.getenv('OPENAI_TIMEOUT', 30))  # seconds
+OPENAI_MAX_RETRIES = int(os.getenv('OPENAI_MAX_RETRIES', 2))
+OPENAI_MAX_CONNECTIONS = int(os.getenv('OPENAI_MAX_CONNECTIONS', 20))
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv('OPENAI_MAX_KEEPALIVE_CONNECTIONS', 10))
+OPENAI_KEEPALIVE_EXPIRY = float(os.getenv('OPENAI_KEEPALIVE_EXPIRY', 30))  # seconds idle before closing
+# Local OpenAI stand-in for load tests, benchmarks and CI (core/utils/fake_openai.py):
+# 'fake' = canned replies, 'record' = call OpenAI and save replies, 'replay' = serve saved replies
+OPENAI_FAKE_MODE = os.getenv('OPENAI_FAKE_MODE', '')
+# fixed:S, uniform:MIN,MAX, normal:MEAN,SD, lognormal:MEDIAN,SIGMA or recorded
+OPENAI_FAKE_LATENCY = os.getenv('OPENAI_FAKE_LATENCY', 'lognormal:1.5,0.5')  # seconds
+# Per-model overrides, e.g. "gpt-4=lognormal:6,0.5;gpt-3.5-turbo=lognormal:1.5,0.4"
+OPENAI_FAKE_MODEL_LATENCY = os.getenv('OPENAI_FAKE_MODEL_LATENCY', '')
+OPENAI_FAKE_CHUNK_DELAY = float(os.getenv('OPENAI_FAKE_CHUNK_DELAY', 0.02))  # seconds between streamed chunks
+OPENAI_FAKE_ERROR_RATE = float(os.getenv('OPENAI_FAKE_ERROR_RATE', 0))  # share of requests failing with 500
+OPENAI_FAKE_RATE_LIMIT_RATE = float(os.getenv('OPENAI_FAKE_RATE_LIMIT_RATE', 0))  # share failing with 429
+OPENAI_FAKE_SEED = int(os.getenv('OPENAI_FAKE_SEED', 0))
+OPENAI_RECORDINGS_DIR = Path(os.getenv('OPENAI_RECORDINGS_DIR', BASE_DIR / 'cache' / 'openai_recordings'))
+# At most AI_MAX_CONCURRENCY OpenAI calls in flight across all worker processes on this host
+AI_MAX_CONCURRENCY = int(os.getenv('AI_MAX_CONCURRENCY', 16))
+AI_INTERACTIVE_RESERVED = int(os.getenv('AI_INTERACTIVE_RESERVED', 4))  # slots only chat replies may use
+AI_SLOT_WAIT = float(os.getenv('AI_SLOT_WAIT', 60))  # seconds a call waits for a free slot
+AI_SLOT_DIR = Path(os.getenv('AI_SLOT_DIR', BASE_DIR / 'cache' / 'ai_slots'))  # slot lock files
+# Per-session token bucket on AI requests (chat messages, job matching, job searches)
+AI_SESSION_RATE_LIMIT_ENABLED = os.getenv('AI_SESSION_RATE_LIMIT_ENABLED', 'True') == 'True'
+AI_SESSION_BURST = int(os.getenv('AI_SESSION_BURST', 20))
+AI_SESSION_REFILL_PER_MINUTE = float(os.getenv('AI_SESSION_REFILL_PER_MINUTE', 10))
+# Chat replies are streamed to the browser token by token when the page asks for it
+CHAT_STREAMING_ENABLED = os.getenv('CHAT_STREAMING_ENABLED', 'True') == 'True'
+# Chat history in each prompt: recent turns verbatim up to CHAT_HISTORY_TOKENS, older turns folded
+# into a summary of at most CHAT_SUMMARY_TOKENS (tokens are counted with tiktoken when it is installed)
+CHAT_HISTORY_TOKENS = int(os.getenv('CHAT_HISTORY_TOKENS', 1500))
+CHAT_SUMMARY_TOKENS = int(os.getenv('CHAT_SUMMARY_TOKENS', 300))
+CHAT_MESSAGE_TOKENS = int(os.getenv('CHAT_MESSAGE_TOKENS', 600))  # longer history messages are trimmed
+# Summaries are written by the model in the background; until then (or when disabled) the opening
+# sentence of each older turn is used
+CHAT_MODEL_SUMMARIES_ENABLED = os.getenv('CHAT_MODEL_SUMMARIES_ENABLED', 'True') == 'True'
+CHAT_SUMMARY_CACHE_ENTRIES = int(os.getenv('CHAT_SUMMARY_CACHE_ENTRIES', 2000))  # per process
+CHAT_SUMMARY_THREADS = int(os.getenv('CHAT_SUMMARY_THREADS', 2))
+
+# Job matching results are reused for the same CV profile and preferences
+MATCH_CACHE_ENABLED = os.getenv('MATCH_CACHE_ENABLED', 'True') == 'True'
+MATCH_CACHE_TTL = int(os.getenv('MATCH_CACHE_TTL', 6 * 60 * 60))  # seconds
+MATCH_CACHE_MAX_ENTRIES = int(os.getenv('MATCH_CACHE_MAX_ENTRIES', 1000))  # per process
+MATCH_CACHE_SHARED = os.getenv('MATCH_CACHE_SHARED', 'True') == 'True'  # MongoDB tier across processes
+
+# The AI calls behind one job preferences submission run concurrently under this shared deadline
+JOB_MATCH_DEADLINE = float(os.getenv('JOB_MATCH_DEADLINE', 60))  # seconds
+# Budget for the AI calls of one chat message or job search; each call gets only what is left
+AI_REQUEST_DEADLINE = float(os.getenv('AI_REQUEST_DEADLINE', 45))  # seconds
+# After AI_BREAKER_FAILURES consecutive upstream failures a model's calls fail fast (cached or
+# empty results) for AI_BREAKER_RESET seconds, then one probe call checks for recovery
+AI_BREAKER_ENABLED = os.getenv('AI_BREAKER_ENABLED', 'True') == 'True'
+AI_BREAKER_FAILURES = int(os.getenv('AI_BREAKER_FAILURES', 5))
+AI_BREAKER_RESET = float(os.getenv('AI_BREAKER_RESET', 30))  # seconds
+# Models per call type, preferred first. A call uses the first model whose p95 latency over the
+# last AI_LATENCY_WINDOW seconds fits the call type's budget and whose breaker is closed
+AI_MATCH_MODELS = os.getenv('AI_MATCH_MODELS', 'gpt-4,gpt-3.5-turbo')
+AI_LISTINGS_MODELS = os.getenv('AI_LISTINGS_MODELS', 'gpt-4,gpt-3.5-turbo')
+AI_CHAT_MODELS = os.getenv('AI_CHAT_MODELS', 'gpt-3.5-turbo')
+AI_CHAT_STREAM_MODELS = os.getenv('AI_CHAT_STREAM_MODELS', AI_CHAT_MODELS)  # streamed chat replies
+AI_SUMMARY_MODELS = os.getenv('AI_SUMMARY_MODELS', 'gpt-3.5-turbo')  # chat history summaries
+AI_MATCH_P95_BUDGET = float(os.getenv('AI_MATCH_P95_BUDGET', 20))  # seconds
+AI_LISTINGS_P95_BUDGET = float(os.getenv('AI_LISTINGS_P95_BUDGET', 30))  # seconds
+AI_CHAT_P95_BUDGET = float(os.getenv('AI_CHAT_P95_BUDGET', 10))  # seconds
+AI_CHAT_STREAM_P95_BUDGET = float(os.getenv('AI_CHAT_STREAM_P95_BUDGET', 5))  # seconds to the first chunk
+AI_SUMMARY_P95_BUDGET = float(os.getenv('AI_SUMMARY_P95_BUDGET', 20))  # seconds
+AI_LATENCY_WINDOW = float(os.getenv('AI_LATENCY_WINDOW', 300))  # seconds
+AI_LATENCY_MIN_SAMPLES = int(os.getenv('AI_LATENCY_MIN_SAMPLES', 20))  # before a p95 is trusted
+# Hedged call types (comma-separated, e.g. "chat,match"): when the first request has not answered
+# within the model's p95, an identical second one is sent and the first reply wins (extra tokens)
+AI_HEDGED_CALLS = os.getenv('AI_HEDGED_CALLS', '')
+AI_HEDGE_MIN_DELAY = float(os.getenv('AI_HEDGE_MIN_DELAY', 1))  # seconds
+
+# Generated government/company listings: served fresh, then stale while a background refresh runs
+LISTING_CACHE_ENABLED = os.getenv('LISTING_CACHE_ENABLED', 'True') == 'True'
+LISTING_CACHE_FRESH_TTL = int(os.getenv('LISTING_CACHE_FRESH_TTL', 30 * 60))  # seconds
+LISTING_CACHE_STALE_TTL = int(os.getenv('LISTING_CACHE_STALE_TTL', 24 * 60 * 60))  # seconds
+LISTING_CACHE_MAX_ENTRIES = int(os.getenv('LISTING_CACHE_MAX_ENTRIES', 500))  # per process and listing type
+LISTING_CACHE_REFRESH_THREADS = int(os.getenv('LISTING_CACHE_REFRESH_THREADS', 2))
+LISTING_CACHE_SHARED = os.getenv('LISTING_CACHE_SHARED', 'True') == 'True'  # MongoDB tier across processes
+# Identical listing generations running at the same time share one OpenAI call, across processes too
+SINGLE_FLIGHT_ENABLED = os.getenv('SINGLE_FLIGHT_ENABLED', 'True') == 'True'
+SINGLE_FLIGHT_DIR = Path(os.getenv('SINGLE_FLIGHT_DIR', BASE_DIR / 'cache' / 'single_flight'))  # lock and result files
+SINGLE_FLIGHT_WAIT = float(os.getenv('SINGLE_FLIGHT_WAIT', 120))  # seconds to wait on another process's call
+SINGLE_FLIGHT_RESULT_TTL = float(os.getenv('SINGLE_FLIGHT_RESULT_TTL', 30))  # seconds a finished result is reused
+SINGLE_FLIGHT_SWEEP_INTERVAL = float(os.getenv('SINGLE_FLIGHT_SWEEP_INTERVAL', LISTING_CACHE_FRESH_TTL))  # seconds between deletes of old lock/result files
+
+# CV Parsing
+# Optional JSON skill taxonomy ({"Kubernetes": ["k8s"], ...}) merged into the built-in skill list
+SKILL_TAXONOMY_FILE = os.getenv('SKILL_TAXONOMY_FILE')
+
+# PDF extraction budget - long portfolios stop early (0 = no limit)
+CV_PDF_MAX_PAGES = int(os.getenv('CV_PDF_MAX_PAGES', 30))
+CV_PDF_MAX_CHARS = int(os.getenv('CV_PDF_MAX_CHARS', 100000))
+
+# Split page extraction of long PDFs across processes (workers: 0 = one per CPU core)
+CV_PDF_PARALLEL_PAGES = os.getenv('CV_PDF_PARALLEL_PAGES', 'False') == 'True'
+CV_PDF_PARALLEL_THRESHOLD = int(os.getenv('CV_PDF_PARALLEL_THRESHOLD', 20))
+CV_PDF_PARALLEL_WORKERS = int(os.getenv('CV_PDF_PARALLEL_WORKERS', 0))
+
+# Parse results are cached by file content hash (MongoDB, or this directory when MongoDB is down)
+CV_PARSE_CACHE_ENABLED = os.getenv('CV_PARSE_CACHE_ENABLED', 'True') == 'True'
+CV_PARSE_CACHE_DIR = Path(os.getenv('CV_PARSE_CACHE_DIR', BASE_DIR / 'cache' / 'cv_parse'))
+
+# CVs are parsed in a bounded pool of worker processes with per-job limits
+CV_PARSE_ISOLATED = os.getenv('CV_PARSE_ISOLATED', 'True') == 'True'
+CV_PARSE_WORKERS = int(os.getenv('CV_PARSE_WORKERS', 2))
+CV_PARSE_TIMEOUT = float(os.getenv('CV_PARSE_TIMEOUT', 20))  # seconds, wall clock per CV
+CV_PARSE_MEMORY_LIMIT_MB = int(os.getenv('CV_PARSE_MEMORY_LIMIT_MB', 1024))  # per worker, 0 = unlimited
+CV_PARSE_MAX_JOBS_PER_WORKER = int(os.getenv('CV_PARSE_MAX_JOBS_PER_WORKER', 100))
+
+# Keep a copy of each uploaded CV (written in the background, named by content hash)
+CV_STORE_ORIGINALS = os.getenv('CV_STORE_ORIGINALS', 'True') == 'True'
+
+# Asynchronous upload: return right away and parse in the background (also per request with async=1)
+CV_UPLOAD_ASYNC = os.getenv('CV_UPLOAD_ASYNC', 'False') == 'True'
+CV_PARSE_JOB_THREADS = int(os.getenv('CV_PARSE_JOB_THREADS', 4))
+CV_PARSE_JOB_TTL = int(os.getenv('CV_PARSE_JOB_TTL', 24 * 60 * 60))  # seconds job status records are kept in MongoDB
 
 # LinkedIn OAuth Configuration
 LINKEDIN_CLIENT_ID = os.getenv('LINKEDIN_CLIENT_ID')